@@ -29,6 +29,7 @@ mcp_datas, mcp_binaries, mcp_hiddenimports = collect_all('mcp')
 # Combine all collections
 datas = matlab_datas + mcp_datas + [
     ('.env.example', '.'),
+    ('src/matlab_mcp_server/matlab_helpers', 'matlab_mcp_server/matlab_helpers'),
 ]
 binaries = matlab_binaries + mcp_binaries
 hiddenimports = matlab_hiddenimports + mcp_hiddenimports + [
@@ -0,0 +1,146 @@
+"""Dependency graph of named code cells for incremental, notebook-style execution."""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, Optional
+
+
+class CellGraph:
+    """Ordered named cells with the variables each reads and writes.
+
+    Cells run in registration order, so a cell can only depend on earlier cells: B
+    depends on A when B reads a variable A writes. A cell is stale when it has never run
+    successfully, its code changed, or a variable it reads (or one it wrote) changed since
+    its last run. Running the stale cells in order re-executes exactly the edited cells
+    and their transitive dependents; every other cell keeps its outputs in the workspace.
+    """
+
+    def __init__(self):
+        """Initialize an empty graph."""
+        self._cells: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._cells
+
+    def names(self) -> list:
+        """Cell names in execution order."""
+        return list(self._cells)
+
+    def get(self, name: str) -> Dict[str, Any]:
+        """The record of a cell (code, reads, writes, stale, last run information)."""
+        return self._cells[name]
+
+    def set_cell(self, name: str, code: str, reads: Iterable[str], writes: Iterable[str]) -> bool:
+        """Register a new cell or update an existing one.
+
+        Args:
+            name: Cell name
+            code: MATLAB code of the cell
+            reads: Identifiers the code may read (static scan)
+            writes: Variables the code assigns (static scan)
+
+        Returns:
+            True if the cell is new or its code changed (it is then stale)
+        """
+        digest = hashlib.sha1(code.encode("utf-8")).hexdigest()
+        cell = self._cells.get(name)
+        if cell is not None and cell["hash"] == digest:
+            return False
+
+        self._cells[name] = {
+            "code": code,
+            "hash": digest,
+            "reads": set(reads),
+            # Outputs observed in earlier runs stay: dependents still read them
+            "writes": set(writes) | (cell["writes"] if cell else set()),
+            "stale": True,
+            "status": cell["status"] if cell else "new",
+            "last_run": cell["last_run"] if cell else None,
+            "duration_ms": cell["duration_ms"] if cell else None,
+            "output": cell["output"] if cell else ""
+        }
+        return True
+
+    def remove(self, name: str) -> None:
+        """Remove a cell; cells that read its outputs become stale."""
+        cell = self._cells.pop(name, None)
+        if cell is not None:
+            self._mark_readers(cell["writes"], after=None)
+
+    def dependencies(self, name: str) -> list:
+        """Earlier cells that write a variable this cell reads."""
+        reads = self._cells[name]["reads"]
+        deps = []
+        for other in self._cells:
+            if other == name:
+                break
+            if reads & self._cells[other]["writes"]:
+                deps.append(other)
+        return deps
+
+    def stale(self) -> list:
+        """Names of stale cells in execution order."""
+        return [name for name, cell in self._cells.items() if cell["stale"]]
+
+    def record_run(
+        self,
+        name: str,
+        success: bool,
+        changed: Optional[Iterable[str]],
+        duration_ms: Optional[float],
+        output: str
+    ) -> None:
+        """Record a cell run; later cells reading a variable it changed become stale.
+
+        Args:
+            name: Cell that ran
+            success: Whether the run succeeded
+            changed: Variables the run created or modified (workspace delta), or None
+                when the workspace was not tracked (all its writes count as changed)
+            duration_ms: Run time
+            output: Captured output of the run
+        """
+        cell = self._cells[name]
+        if changed is None:
+            changed = set(cell["writes"])
+        else:
+            changed = set(changed)
+            cell["writes"] |= changed
+        cell["stale"] = not success
+        cell["status"] = "ok" if success else "error"
+        cell["last_run"] = time.time()
+        cell["duration_ms"] = duration_ms
+        cell["output"] = output
+        if success:
+            # Outputs that came out identical leave their readers up to date
+            self._mark_readers(changed, after=name)
+
+    def workspace_changed(self, modified: Iterable[str], deleted: Iterable[str]) -> None:
+        """Invalidate cells affected by a change made outside the cells.
+
+        Args:
+            modified: Variables created or modified by other code
+            deleted: Variables deleted by other code (their writers must run again)
+        """
+        deleted = set(deleted)
+        self._mark_readers(set(modified) | deleted, after=None)
+        for cell in self._cells.values():
+            if cell["writes"] & deleted:
+                cell["stale"] = True
+
+    def invalidate_all(self) -> None:
+        """Mark every cell stale (e.g. after the engine was restarted)."""
+        for cell in self._cells.values():
+            cell["stale"] = True
+
+    def _mark_readers(self, names: set, after: Optional[str]) -> None:
+        """Mark cells reading any of names stale (only cells after `after`, if given)."""
+        if not names:
+            return
+        active = after is None
+        for name, cell in self._cells.items():
+            if active and cell["reads"] & names:
+                cell["stale"] = True
+            if name == after:
+                active = True
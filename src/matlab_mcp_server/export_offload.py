@@ -0,0 +1,145 @@
+"""Background figure export on dedicated MATLAB engines."""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+import matlab.engine
+
+logger = logging.getLogger(__name__)
+
+
+class ExportOffloader:
+    """Pool of export-only MATLAB engines that render saved .fig snapshots.
+
+    The interactive engine only saves a compact .fig snapshot (mcp_save_snapshot), which is
+    fast; loading and rendering it (mcp_render_snapshot) happens on a worker thread with its
+    own engine, so high-DPI exports do not block the session the user is computing on.
+    Each worker thread starts its engine on first use and keeps it for later jobs.
+    """
+
+    # Finished jobs kept for status queries
+    max_finished_jobs = 100
+
+    def __init__(self, workers: int, helpers_dir: str):
+        """Initialize the pool (engines are started lazily by the worker threads).
+
+        Args:
+            workers: Number of worker threads, each with its own MATLAB engine
+            helpers_dir: Directory with the mcp_*.m helpers to add to each engine's path
+        """
+        self.workers = max(workers, 1)
+        self.helpers_dir = helpers_dir
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._engines: list = []
+        self._lock = threading.Lock()
+
+    def submit(self, snapshot: str, path: str, format: str, dpi: int, max_points: int,
+               figure: float) -> Dict[str, Any]:
+        """Queue an export of a saved snapshot.
+
+        Args:
+            snapshot: Path of the .fig snapshot (deleted when the job finishes)
+            path: Output file path
+            format: Export format
+            dpi: Resolution in DPI
+            max_points: Point cap for line/scatter data (0 = off)
+            figure: Number of the figure the snapshot was taken from
+
+        Returns:
+            The job record (job_id, status, figure, path, format, dpi, submitted)
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="matlab-export"
+                )
+            job = {
+                "job_id": uuid.uuid4().hex[:12],
+                "status": "queued",
+                "figure": figure,
+                "path": path,
+                "format": format,
+                "dpi": dpi,
+                "submitted": time.time()
+            }
+            self.jobs[job["job_id"]] = job
+            self._prune()
+
+        self._executor.submit(self._run, job, snapshot, max_points)
+        return dict(job)
+
+    def status(self, job_id: Optional[str] = None) -> Optional[Any]:
+        """Get a copy of one job record, or of all records if job_id is None."""
+        with self._lock:
+            if job_id is None:
+                return [dict(job) for job in self.jobs.values()]
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def shutdown(self) -> None:
+        """Cancel queued jobs and stop the export engines."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            engines, self._engines = self._engines, []
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+        for engine in engines:
+            try:
+                engine.quit()
+            except Exception as e:
+                logger.warning(f"Failed to stop export engine: {e}")
+
+    def _engine(self):
+        """Get this worker thread's engine, starting it on first use."""
+        engine = getattr(self._local, "engine", None)
+        if engine is None:
+            logger.info("Starting export engine...")
+            engine = matlab.engine.start_matlab()
+            engine.addpath(self.helpers_dir, nargout=0)
+            engine.eval("set(groot, 'DefaultFigureVisible', 'off');", nargout=0)
+            self._local.engine = engine
+            with self._lock:
+                self._engines.append(engine)
+        return engine
+
+    def _run(self, job: Dict[str, Any], snapshot: str, max_points: int) -> None:
+        """Render one snapshot on this worker's engine and record the outcome."""
+        with self._lock:
+            job["status"] = "running"
+            job["started"] = time.time()
+        try:
+            info = self._engine().mcp_render_snapshot(
+                snapshot, job["path"], job["format"], float(job["dpi"]),
+                {"max_points": float(max_points)}, nargout=1
+            )
+            with self._lock:
+                job["status"] = "done"
+                job["bytes"] = int(info["bytes"])
+                if info["kept"] < info["points"]:
+                    job["points"] = int(info["points"])
+                    job["points_kept"] = int(info["kept"])
+        except Exception as e:
+            logger.warning(f"Background export {job['job_id']} failed: {e}")
+            with self._lock:
+                job["status"] = "failed"
+                job["error"] = str(e)
+        finally:
+            with self._lock:
+                job["finished"] = time.time()
+            try:
+                os.remove(snapshot)
+            except OSError:
+                pass
+
+    def _prune(self) -> None:
+        """Drop the oldest finished jobs beyond max_finished_jobs (caller holds the lock)."""
+        finished = [job for job in self.jobs.values() if job["status"] in ("done", "failed")]
+        for job in sorted(finished, key=lambda j: j["submitted"])[:-self.max_finished_jobs]:
+            del self.jobs[job["job_id"]]
@@ -0,0 +1,125 @@
+"""On-disk cache of figure exports keyed by a MATLAB-side content fingerprint."""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class FigureExportCache:
+    """LRU cache of exported figure files.
+
+    Entries are keyed by (fingerprint, format, dpi, point cap). The fingerprint is
+    computed in MATLAB (mcp_figure_fingerprint) from the figure's objects and data, so a
+    figure that has not changed since its last export can be served by copying the
+    cached file instead of re-rendering it.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        """Initialize the cache, loading its index if one exists.
+
+        Args:
+            cache_dir: Directory holding cached files and index.json
+            max_bytes: Total size above which least recently used entries are evicted
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._index_path = os.path.join(cache_dir, "index.json")
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+        try:
+            with open(self._index_path) as f:
+                self._entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable figure cache index: {e}")
+
+    @staticmethod
+    def make_key(fingerprint: str, format: str, dpi: int, max_points: int = 0) -> str:
+        """Build the cache key for a fingerprint rendered with a format, DPI and point cap."""
+        key = f"{fingerprint}|{format}|{dpi}"
+        return f"{key}|{max_points}" if max_points else key
+
+    def known_fingerprints(self, format: str, dpi: int, max_points: int = 0) -> list:
+        """List fingerprints with a cached export for this format, DPI and point cap."""
+        suffix = FigureExportCache.make_key("", format, dpi, max_points)
+        return [key[:-len(suffix)] for key in self._entries if key.endswith(suffix)]
+
+    def fetch(self, key: str, destination: str) -> Optional[int]:
+        """Copy a cached export to destination.
+
+        Args:
+            key: Cache key (see make_key)
+            destination: Path to write the cached file to
+
+        Returns:
+            File size in bytes, or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        cached_path = os.path.join(self.cache_dir, entry["file"])
+        try:
+            if os.path.abspath(cached_path) != os.path.abspath(destination):
+                shutil.copyfile(cached_path, destination)
+        except OSError:
+            # File vanished from disk - forget the entry
+            self._entries.pop(key, None)
+            self._save_index()
+            return None
+
+        entry["last_used"] = time.time()
+        self._save_index()
+        return entry["bytes"]
+
+    def store(self, key: str, source: str) -> None:
+        """Add an exported file to the cache and evict old entries if over budget.
+
+        Args:
+            key: Cache key (see make_key)
+            source: Path of the freshly exported file
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            extension = os.path.splitext(source)[1]
+            filename = hashlib.sha1(key.encode("utf-8")).hexdigest() + extension
+            shutil.copyfile(source, os.path.join(self.cache_dir, filename))
+
+            self._entries[key] = {
+                "file": filename,
+                "bytes": os.path.getsize(source),
+                "last_used": time.time()
+            }
+            self._evict()
+            self._save_index()
+        except OSError as e:
+            logger.warning(f"Failed to cache figure export {source}: {e}")
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits max_bytes."""
+        total = sum(entry["bytes"] for entry in self._entries.values())
+        for key, entry in sorted(self._entries.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, entry["file"]))
+            except OSError:
+                pass
+            total -= entry["bytes"]
+            del self._entries[key]
+
+    def _save_index(self) -> None:
+        """Persist the index so cached exports survive a server restart."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._index_path, "w") as f:
+                json.dump(self._entries, f)
+        except OSError as e:
+            logger.warning(f"Failed to save figure cache index: {e}")
@@ -0,0 +1,427 @@
+"""SQLite index of executed code, written in the background and searchable by text and filters."""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scripts (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    code TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    session TEXT NOT NULL,
+    project TEXT,
+    code_hash TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    error TEXT,
+    messages TEXT,
+    duration_ms REAL,
+    code_ms REAL,
+    figures_created INTEGER,
+    warning_count INTEGER,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_time ON runs(time);
+CREATE INDEX IF NOT EXISTS runs_code_hash ON runs(code_hash, time);
+CREATE INDEX IF NOT EXISTS runs_project ON runs(project, time);
+CREATE INDEX IF NOT EXISTS runs_success ON runs(success, time);
+CREATE TABLE IF NOT EXISTS run_variables (
+    run_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    change TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS run_variables_name ON run_variables(name, run_id);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    session TEXT NOT NULL,
+    project TEXT,
+    after_run INTEGER,
+    path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_session ON runs(session, id);
+"""
+
+# Full-text indexes over script code and run errors/warnings (external content tables)
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS scripts_fts
+    USING fts5(code, content='scripts', content_rowid='id');
+CREATE VIRTUAL TABLE IF NOT EXISTS runs_fts
+    USING fts5(messages, content='runs', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS scripts_fts_insert AFTER INSERT ON scripts BEGIN
+    INSERT INTO scripts_fts(rowid, code) VALUES (new.id, new.code);
+END;
+CREATE TRIGGER IF NOT EXISTS runs_fts_insert AFTER INSERT ON runs BEGIN
+    INSERT INTO runs_fts(rowid, messages) VALUES (new.id, new.messages);
+END;
+"""
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class ExecutionHistory:
+    """Persistent, indexed record of every execute call.
+
+    Records are queued by the caller and inserted in batches by a background writer
+    thread with its own connection, so recording adds no latency to execution. Code is
+    stored once per hash. Text queries go through FTS5 indexes over the code and the
+    error/warning messages (with a LIKE fallback where SQLite lacks FTS5); filters use
+    plain indexes, so searches stay fast on large histories.
+    """
+
+    def __init__(self, db_path: str):
+        """Open (or create) the history database.
+
+        Args:
+            db_path: Path of the SQLite file
+        """
+        self.db_path = db_path
+        self.session = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        self._queue: queue.Queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._read_connection: Optional[sqlite3.Connection] = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        connection = self._connect()
+        connection.executescript(_SCHEMA)
+        try:
+            connection.executescript(_FTS_SCHEMA)
+            self.full_text = True
+        except sqlite3.OperationalError:
+            logger.info("SQLite has no FTS5; history text search falls back to LIKE")
+            self.full_text = False
+        connection.close()
+
+    def record(
+        self,
+        code: str,
+        result: Dict[str, Any],
+        project: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Queue an execute result for recording.
+
+        Args:
+            code: Executed MATLAB code
+            result: Result dict returned by execute
+            project: Current project name
+            extra: Additional fields for the run's details (e.g. replay information)
+        """
+        timings = (result.get("instrumentation") or {}).get("timings_ms", {})
+        warnings = result.get("warnings") or []
+        delta = result.get("workspace_delta") or {}
+        error = result.get("error")
+
+        details = {
+            "error_identifier": result.get("error_identifier"),
+            "error_type": result.get("error_type"),
+            "timings_ms": timings,
+            "warnings": [{"message": w["message"], "id": w.get("id")} for w in warnings],
+            "workspace_delta": {
+                kind: [record["name"] for record in delta.get(kind, [])]
+                for kind in ("created", "modified", "deleted")
+            },
+            "new_figure_handles": result.get("new_figure_handles", []),
+            "script_saved": result.get("script_saved"),
+            **(extra or {})
+        }
+        messages = "\n".join(filter(None, [error] + [w["message"] for w in warnings]))
+
+        self._ensure_writer()
+        self._queue.put({
+            "kind": "run",
+            "code": code,
+            "hash": hashlib.sha1(code.encode("utf-8")).hexdigest(),
+            "time": time.time(),
+            "project": project,
+            "success": bool(result.get("success")),
+            "error": error,
+            "messages": messages,
+            "duration_ms": timings.get("total"),
+            "code_ms": timings.get("code"),
+            "figures_created": result.get("figures_created", 0),
+            "warning_count": len(warnings),
+            "details": details
+        })
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        variable: Optional[str] = None,
+        success: Optional[bool] = None,
+        project: Optional[str] = None,
+        code: Optional[str] = None,
+        since: Optional[float] = None,
+        min_duration_ms: Optional[float] = None,
+        limit: int = 20
+    ) -> Dict[str, Any]:
+        """Find recorded runs, newest first.
+
+        Args:
+            query: Words that must all appear in the code or in the run's error/warnings
+            variable: Only runs that created or modified this variable
+            success: Only successful (True) or failed (False) runs
+            project: Only runs in this project
+            code: Only runs of exactly this code
+            since: Only runs after this Unix time
+            min_duration_ms: Only runs that took at least this long
+            limit: Maximum number of runs to return
+
+        Returns:
+            Dict with runs (list of records with code and details) and total_runs
+        """
+        self.flush()
+
+        clauses = []
+        params: list = []
+        if query:
+            tokens = _TOKEN_RE.findall(query)
+            if tokens and self.full_text:
+                match = " ".join(f'"{token}"' for token in tokens)
+                clauses.append(
+                    "(s.id IN (SELECT rowid FROM scripts_fts WHERE scripts_fts MATCH ?)"
+                    " OR r.id IN (SELECT rowid FROM runs_fts WHERE runs_fts MATCH ?))"
+                )
+                params += [match, match]
+            for token in tokens if not self.full_text else []:
+                clauses.append("(s.code LIKE ? OR r.messages LIKE ?)")
+                params += [f"%{token}%", f"%{token}%"]
+        if variable:
+            clauses.append(
+                "r.id IN (SELECT run_id FROM run_variables WHERE name = ? AND change != 'deleted')"
+            )
+            params.append(variable)
+        if success is not None:
+            clauses.append("r.success = ?")
+            params.append(int(success))
+        if project:
+            clauses.append("r.project = ?")
+            params.append(project)
+        if code is not None:
+            clauses.append("r.code_hash = ?")
+            params.append(hashlib.sha1(code.encode("utf-8")).hexdigest())
+        if since is not None:
+            clauses.append("r.time >= ?")
+            params.append(since)
+        if min_duration_ms is not None:
+            clauses.append("r.duration_ms >= ?")
+            params.append(min_duration_ms)
+
+        sql = (
+            "SELECT r.id, r.time, r.session, r.project, r.code_hash, r.success, r.error,"
+            " r.duration_ms, r.code_ms, r.figures_created, r.warning_count, r.details, s.code"
+            " FROM runs r JOIN scripts s ON s.hash = r.code_hash"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY r.id DESC LIMIT ?"
+        params.append(int(limit))
+
+        with self._lock:
+            connection = self._reader()
+            rows = connection.execute(sql, params).fetchall()
+            total = connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+        runs = []
+        for row in rows:
+            runs.append({
+                "id": row[0],
+                "time": row[1],
+                "session": row[2],
+                "project": row[3],
+                "code_hash": row[4],
+                "success": bool(row[5]),
+                "error": row[6],
+                "duration_ms": row[7],
+                "code_ms": row[8],
+                "figures_created": row[9],
+                "warning_count": row[10],
+                "details": json.loads(row[11]) if row[11] else {},
+                "code": row[12]
+            })
+        return {"runs": runs, "total_runs": total}
+
+    def record_checkpoint(self, path: str, project: Optional[str] = None) -> None:
+        """Queue a workspace checkpoint taken after the most recently recorded run.
+
+        Args:
+            path: MAT-file holding the whole workspace
+            project: Current project name
+        """
+        self._ensure_writer()
+        self._queue.put(
+            {"kind": "checkpoint", "time": time.time(), "path": path, "project": project}
+        )
+
+    def replay_plan(
+        self, session: Optional[str] = None, project: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Collect the runs of a session or project and the session's latest usable checkpoint.
+
+        A checkpoint holds the workspace of the session it was taken in, so it is only
+        used to replay that session; project replays run every recorded run.
+
+        Args:
+            session: Session id (default: the most recent session with runs)
+            project: Replay all runs of this project instead of one session
+
+        Returns:
+            Dict with session, project, runs (id, code, success, figures_created, details
+            in execution order) and checkpoint (path, after_run) or None
+        """
+        self.flush()
+        with self._lock:
+            connection = self._reader()
+            if project is None and session is None:
+                row = connection.execute(
+                    "SELECT session FROM runs ORDER BY id DESC LIMIT 1"
+                ).fetchone()
+                session = row[0] if row else self.session
+
+            column, value = ("project", project) if project is not None else ("session", session)
+            rows = connection.execute(
+                "SELECT r.id, s.code, r.success, r.figures_created, r.details"
+                " FROM runs r JOIN scripts s ON s.hash = r.code_hash"
+                f" WHERE r.{column} = ? ORDER BY r.id",
+                (value,)
+            ).fetchall()
+            checkpoints = [] if project is not None else connection.execute(
+                "SELECT path, after_run FROM checkpoints WHERE session = ?"
+                " AND after_run IS NOT NULL ORDER BY after_run DESC, id DESC",
+                (session,)
+            ).fetchall()
+
+        runs = [
+            {
+                "id": row[0],
+                "code": row[1],
+                "success": bool(row[2]),
+                "figures_created": row[3],
+                "details": json.loads(row[4]) if row[4] else {}
+            }
+            for row in rows
+        ]
+        # Checkpoint files may have been pruned since they were recorded
+        checkpoint = next(
+            ({"path": path, "after_run": after_run}
+             for path, after_run in checkpoints if os.path.exists(path)),
+            None
+        )
+        return {"session": session, "project": project, "runs": runs, "checkpoint": checkpoint}
+
+    def flush(self) -> None:
+        """Block until every queued record has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write pending records and stop the writer thread.
+
+        The history stays usable: the next record starts a new writer thread.
+        """
+        with self._lock:
+            writer = self._writer
+            self._writer = None
+        if writer is not None and writer.is_alive():
+            self._queue.put(None)
+            writer.join()
+        with self._lock:
+            if self._read_connection is not None:
+                self._read_connection.close()
+                self._read_connection = None
+
+    def _ensure_writer(self) -> None:
+        """Start the writer thread if it is not running."""
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="matlab-history", daemon=True
+                )
+                self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection in WAL mode so searches do not wait for the writer."""
+        connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _reader(self) -> sqlite3.Connection:
+        """Shared read connection (callers hold self._lock)."""
+        if self._read_connection is None:
+            self._read_connection = self._connect()
+        return self._read_connection
+
+    def _write_loop(self) -> None:
+        """Insert queued records in batches until a None sentinel arrives."""
+        connection = self._connect()
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    self._insert(connection, [item for item in batch if item is not None])
+                except Exception as e:
+                    logger.warning(f"Failed to record execution history: {e}")
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if None in batch:
+                    return
+        finally:
+            connection.close()
+
+    def _insert(self, connection: sqlite3.Connection, records: list) -> None:
+        """Insert a batch of records in one transaction."""
+        if not records:
+            return
+        with connection:
+            for item in records:
+                if item["kind"] == "checkpoint":
+                    after_run = connection.execute(
+                        "SELECT MAX(id) FROM runs WHERE session = ?", (self.session,)
+                    ).fetchone()[0]
+                    connection.execute(
+                        "INSERT INTO checkpoints(time, session, project, after_run, path)"
+                        " VALUES (?, ?, ?, ?, ?)",
+                        (item["time"], self.session, item["project"], after_run, item["path"])
+                    )
+                    continue
+                connection.execute(
+                    "INSERT OR IGNORE INTO scripts(hash, code) VALUES (?, ?)",
+                    (item["hash"], item["code"])
+                )
+                cursor = connection.execute(
+                    "INSERT INTO runs(time, session, project, code_hash, success, error, messages,"
+                    " duration_ms, code_ms, figures_created, warning_count, details)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        item["time"], self.session, item["project"], item["hash"],
+                        int(item["success"]), item["error"], item["messages"],
+                        item["duration_ms"], item["code_ms"], item["figures_created"],
+                        item["warning_count"], json.dumps(item["details"])
+                    )
+                )
+                delta = item["details"]["workspace_delta"]
+                connection.executemany(
+                    "INSERT INTO run_variables(run_id, name, change) VALUES (?, ?, ?)",
+                    [(cursor.lastrowid, name, kind) for kind in delta for name in delta[kind]]
+                )
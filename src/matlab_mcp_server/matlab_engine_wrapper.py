@@ -4,13 +4,303 @@ import io
 import logging
 import math
 import os
+import re
+import shutil
+import struct
+import subprocess
+import sys
+import time
 import traceback
-from typing import Dict, Any, Optional
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional
 import matlab.engine
 
+from matlab_mcp_server.cells import CellGraph
+from matlab_mcp_server.export_offload import ExportOffloader
+from matlab_mcp_server.figure_cache import FigureExportCache
+from matlab_mcp_server.history import ExecutionHistory
+from matlab_mcp_server.matlab_values import matlab_bytes, matlab_floats, to_list
+from matlab_mcp_server.preflight import CodePreflight
+from matlab_mcp_server.project_index import ProjectIndex, filter_files
+from matlab_mcp_server.script_store import ScriptStore
+
 # Get logger for this module (configured in server.py)
 logger = logging.getLogger(__name__)
 
+# MATLAB-side helper functions (mcp_*.m) shipped with the package
+MATLAB_HELPERS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "matlab_helpers")
+
+# Warning output as printed with verbose and backtrace on (see mcp_execute)
+_WARNING_ID_RE = re.compile(r'\s*\(Type "warning off ([\w:.\-]+)" to suppress this warning\.\)')
+_WARNING_FRAME_RE = re.compile(r"^\s*>?\s*In\s+(.+)$")
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+# Severity rules for MATLAB warnings (see _classify_warning_severity)
+_CRITICAL_WARNING_RE = re.compile(
+    r"singular|rank deficient|badly scaled|ill-conditioned|not positive definite"
+)
+_CRITICAL_WARNING_IDS = frozenset({
+    "MATLAB:singularMatrix",
+    "MATLAB:nearlySingularMatrix",
+    "MATLAB:illConditionedMatrix",
+    "MATLAB:rankDeficientMatrix"
+})
+_WARNING_RE = re.compile(r"divide by zero|imaginary parts|negative|overflow|underflow")
+
+# Static analysis of submitted code (see _analyze_code)
+_BLOCK_COMMENT_RE = re.compile(r"^\s*%\{.*?^\s*%\}", re.MULTILINE | re.DOTALL)
+_STRING_RE = re.compile(r'"[^"\n]*"|(?<![\w)\]}.\'])\'[^\'\n]*\'')
+_COMMENT_RE = re.compile(r"%.*$", re.MULTILINE)
+_GRAPHICS_RE = re.compile(
+    r"\b(?:figure|uifigure|plot|plot3|line|scatter|scatter3|bar|barh|bar3|bar3h|histogram|"
+    r"histogram2|hist|area|pie|pie3|stem|stairs|errorbar|fill|fill3|patch|surf|surfc|surfl|"
+    r"mesh|meshc|meshz|contour|contourf|contour3|quiver|quiver3|image|imagesc|imshow|pcolor|"
+    r"waterfall|ribbon|polarplot|polarscatter|semilogx|semilogy|loglog|fplot|fplot3|fsurf|"
+    r"fmesh|fcontour|fimplicit|ezplot|ezsurf|heatmap|boxplot|geoplot|geoscatter|subplot|"
+    r"tiledlayout|nexttile|axes|hold|title|subtitle|xlabel|ylabel|zlabel|legend|colorbar|"
+    r"colormap|axis|grid|view|xlim|ylim|zlim|text|annotation|clf|cla|close|gcf|gca|drawnow|"
+    r"shading|camlight|animatedline|comet|spy|plotmatrix|stackedplot|bubblechart|swarmchart|"
+    r"trisurf|trimesh|triplot|slice|isosurface|streamline|saveas|exportgraphics|linkaxes|set)\b"
+)
+_ASSIGNMENT_RE = re.compile(r"(?<![=~<>])=(?!=)")
+_MUTATING_RE = re.compile(r"\b(?:clear|clearvars|load|global|syms|import)\b")
+_DYNAMIC_RE = re.compile(r"\b(?:eval|evalc|evalin|feval|assignin|run|builtin)\b")
+_COMMAND_SYNTAX_RE = re.compile(r"^\s*([A-Za-z]\w*)\s+[A-Za-z0-9_\-./\\*:][^=]*$")
+# Functions without graphics or workspace side effects; any other call (user functions,
+# scripts, toolbox functions) may plot or assign variables
+_SAFE_FUNCTIONS = frozenset({
+    "clc", "tic", "toc", "pwd", "who", "whos", "ver", "version", "beep", "more", "format",
+    "diary", "help", "doc", "disp", "display", "fprintf", "sprintf", "num2str", "int2str",
+    "mat2str", "str2double", "strcat", "strcmp", "strcmpi", "strncmp", "strrep", "strsplit",
+    "strjoin", "strtrim", "upper", "lower", "regexp", "regexprep", "contains", "startsWith",
+    "endsWith", "string", "char", "double", "single", "logical", "int8", "int16", "int32",
+    "int64", "uint8", "uint16", "uint32", "uint64", "cell", "struct", "fieldnames", "isfield",
+    "cellfun", "arrayfun", "num2cell", "cell2mat", "isempty", "isnan", "isinf", "isreal",
+    "isnumeric", "ischar", "iscell", "isstruct", "islogical", "isa", "class", "size", "numel",
+    "length", "ndims", "zeros", "ones", "eye", "rand", "randn", "randi", "linspace", "colon",
+    "repmat", "reshape", "squeeze", "cat", "horzcat", "vertcat", "transpose", "abs", "sign",
+    "sqrt", "exp", "log", "log2", "log10", "sin", "cos", "tan", "asin", "acos", "atan",
+    "atan2", "sinh", "cosh", "tanh", "floor", "ceil", "round", "fix", "mod", "rem", "real",
+    "imag", "conj", "angle", "sum", "prod", "cumsum", "cumprod", "diff", "mean", "median",
+    "mode", "std", "var", "max", "min", "sort", "unique", "find", "any", "all", "nnz",
+    "norm", "det", "inv", "pinv", "rank", "trace", "eig", "svd", "kron", "dot", "cross",
+    "interp1", "polyfit", "polyval", "pi", "eps", "Inf", "inf", "NaN", "nan", "i",
+    "j", "true", "false", "ans", "datestr", "now", "clock", "datetime"
+})
+_IDENTIFIER_RE = re.compile(r"(?<![.\w])[A-Za-z]\w*")
+_ASSIGNED_RE = re.compile(
+    r"^\s*(?:(?:par)?for\s+)?(\[[^\]]*\]|[A-Za-z]\w*)\s*(?:[.({][^=]*?)?=(?!=)"
+)
+_MATLAB_KEYWORDS = frozenset({
+    "if", "elseif", "else", "end", "for", "parfor", "while", "do", "switch", "case",
+    "otherwise", "try", "catch", "function", "return", "break", "continue", "global",
+    "persistent", "spmd", "classdef", "properties", "methods", "events", "enumeration"
+})
+
+
+def _strip_code(code: str) -> str:
+    """Remove comments and the contents of string literals from MATLAB code."""
+    text = _BLOCK_COMMENT_RE.sub("", code)
+    text = _STRING_RE.sub("''", text)
+    return _COMMENT_RE.sub("", text)
+
+
+def _split_statements(text: str) -> list:
+    """Split stripped code into statements at newlines, ';' and ',' outside brackets."""
+    statements = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(text):
+        if char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth = max(depth - 1, 0)
+        elif char == "\n" or (char in ";," and depth == 0):
+            statements.append(text[start:i])
+            start = i + 1
+            depth = 0 if char == "\n" else depth
+    statements.append(text[start:])
+    return statements
+
+
+def _scan_variables(code: str):
+    """Statically list the identifiers code may read and the variables it assigns.
+
+    Plain assignment targets (x = ..., [a, b] = ...) are not reads; indexed and field
+    assignments (x(2) = ..., s.f = ...) are, since they update an existing value.
+
+    Args:
+        code: MATLAB code
+
+    Returns:
+        Tuple (reads, writes) of name sets. Reads include function names; callers
+        intersect them with known variables.
+    """
+    reads = set()
+    writes = set()
+    for statement in _split_statements(_strip_code(code)):
+        match = _ASSIGNED_RE.match(statement)
+        if match:
+            target = match.group(1)
+            names = _IDENTIFIER_RE.findall(target) if target.startswith("[") else [target]
+            writes.update(names)
+            if statement[match.end(1):].lstrip().startswith("="):
+                # Plain target: only the right-hand side (and a for range) is read
+                statement = statement[match.end():]
+        reads.update(_IDENTIFIER_RE.findall(statement))
+    return reads - _MATLAB_KEYWORDS, writes - _MATLAB_KEYWORDS
+
+
+def _analyze_code(code: str, known_variables) -> Dict[str, Any]:
+    """Cheaply decide whether code can create figures or change workspace variables.
+
+    Comments and string literals are stripped, then the code is scanned for graphics
+    calls, assignments and workspace-changing commands. Dynamic evaluation (eval, feval,
+    run, ...) and any identifier that is neither a known variable nor a side-effect-free
+    function (a user function, a script, a command-syntax call) count as both, since
+    they may plot or assign anything. The analysis errs on the side of True.
+
+    Args:
+        code: MATLAB code to analyze
+        known_variables: Names of variables known to exist in the workspace
+
+    Returns:
+        Dict with graphics and mutates_workspace flags, the unknown names found and
+        writes: the variables the code assigns, or None when it may assign others too
+    """
+    text = _strip_code(code)
+    _, writes = _scan_variables(text)
+    known = set(known_variables) | writes
+
+    def is_unknown(name: str) -> bool:
+        return not (
+            name in known or name in _SAFE_FUNCTIONS or name in _MATLAB_KEYWORDS
+            or _GRAPHICS_RE.fullmatch(name) or _MUTATING_RE.fullmatch(name)
+            or _DYNAMIC_RE.fullmatch(name)
+        )
+
+    unknown = set()
+    for statement in _split_statements(text):
+        command = _COMMAND_SYNTAX_RE.match(statement)
+        if command and command.group(1) not in known:
+            # Command syntax: the arguments are text, only the command name matters
+            names = [command.group(1)]
+        else:
+            names = _IDENTIFIER_RE.findall(statement)
+        unknown.update(name for name in names if is_unknown(name))
+
+    dynamic = bool(_DYNAMIC_RE.search(text))
+    commands = bool(_MUTATING_RE.search(text))
+    return {
+        "graphics": dynamic or bool(unknown) or bool(_GRAPHICS_RE.search(text)),
+        "mutates_workspace": (
+            dynamic or bool(unknown) or commands or bool(_ASSIGNMENT_RE.search(text))
+        ),
+        "unknown_names": sorted(unknown),
+        "writes": None if dynamic or unknown or commands else sorted(writes)
+    }
+
+
+def _matlab_quote(text: str) -> str:
+    """Escape text for use inside a single-quoted MATLAB character vector."""
+    return text.replace("'", "''")
+
+
+def _reshape(flat: list, shape: list):
+    """Nest a row-major flat list according to shape (vectors stay flat)."""
+    if sum(1 for n in shape if n != 1) <= 1:
+        return flat
+    size = len(flat) // shape[0] if shape[0] else 0
+    return [_reshape(flat[i * size:(i + 1) * size], shape[1:]) for i in range(shape[0])]
+
+
+def _encode_png(rgb: bytes, width: int, height: int) -> bytes:
+    """Encode interleaved row-major RGB bytes as a PNG image (stdlib only)."""
+    stride = width * 3
+    raw = bytearray()
+    for row in range(height):
+        raw.append(0)  # filter type: none
+        raw.extend(rgb[row * stride:(row + 1) * stride])
+
+    def chunk(tag: bytes, payload: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(payload)) + tag + payload
+            + struct.pack(">I", zlib.crc32(tag + payload) & 0xFFFFFFFF)
+        )
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(bytes(raw), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _process_rss_bytes(pid: int) -> Optional[int]:
+    """Sample the resident set size of a process from the OS.
+
+    Args:
+        pid: Process id
+
+    Returns:
+        RSS in bytes, or None if it could not be determined
+    """
+    try:
+        if sys.platform.startswith("linux"):
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+            return None
+
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+            handle = ctypes.windll.kernel32.OpenProcess(
+                PROCESS_QUERY_LIMITED_INFORMATION, False, pid
+            )
+            if not handle:
+                return None
+            try:
+                counters = PROCESS_MEMORY_COUNTERS()
+                counters.cb = ctypes.sizeof(counters)
+                if ctypes.windll.psapi.GetProcessMemoryInfo(
+                    handle, ctypes.byref(counters), counters.cb
+                ):
+                    return int(counters.WorkingSetSize)
+                return None
+            finally:
+                ctypes.windll.kernel32.CloseHandle(handle)
+
+        # macOS and other POSIX systems
+        output = subprocess.run(
+            ["ps", "-o", "rss=", "-p", str(pid)],
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+        return int(output) * 1024 if output else None
+
+    except Exception as e:
+        logger.warning(f"Failed to sample RSS for process {pid}: {e}")
+        return None
+
 
 class MATLABEngineWrapper:
     """Wrapper for MATLAB Engine that captures all output and provides utility functions."""
@@ -25,6 +315,8 @@ class MATLABEngineWrapper:
         self.engine: Optional[matlab.engine.MatlabEngine] = None
         self.workspace_dir = os.getenv("MATLAB_WORKSPACE_DIR", "./matlab_workspace")
         self.figure_dpi = int(os.getenv("MATLAB_FIGURE_DPI", "300"))
+        self.inline_image_dpi = int(os.getenv("MATLAB_INLINE_IMAGE_DPI", "150"))
+        self.inline_image_max_bytes = int(os.getenv("MATLAB_INLINE_IMAGE_MAX_BYTES", "1000000"))
         self.current_project: Optional[str] = None
         self.current_project_dir: Optional[str] = None
 
@@ -32,15 +324,121 @@ class MATLABEngineWrapper:
         self.auto_position_figures = os.getenv("MATLAB_AUTO_POSITION", "true").lower() == "true"
         self.positioning_strategy = os.getenv("MATLAB_POSITION_STRATEGY", "cascade")  # cascade, tile, center
 
+        # Offscreen mode: figures are invisible by default and never positioned
+        self.offscreen_figures = os.getenv("MATLAB_OFFSCREEN_FIGURES", "false").lower() == "true"
+
         # Auto-save script configuration
         self.auto_save_scripts = os.getenv("MATLAB_AUTO_SAVE_SCRIPTS", "true").lower() == "true"
         self.auto_save_mode = os.getenv("MATLAB_AUTO_SAVE_MODE", "on_figures")  # always, on_figures, never
 
+        # Execution history index (SQLite, written in the background)
+        self.history: Optional[ExecutionHistory] = None
+        if os.getenv("MATLAB_HISTORY", "true").lower() == "true":
+            try:
+                self.history = ExecutionHistory(os.path.join(self.workspace_dir, ".history.sqlite"))
+            except Exception as e:
+                logger.warning(f"Execution history disabled: {e}")
+
+        # Replay support, both opt-in since they add engine work to execute: whole-workspace
+        # checkpoints every N changing runs (0 = never) and MAT-files of small run outputs
+        # that replay loads instead of re-running the code (0 = off), pruned by total size
+        self.checkpoint_every = int(os.getenv("MATLAB_CHECKPOINT_EVERY", "0"))
+        self.result_cache_max_bytes = int(os.getenv("MATLAB_RESULT_CACHE_MAX_BYTES", "0"))
+        self.result_cache_total_bytes = int(
+            os.getenv("MATLAB_RESULT_CACHE_TOTAL_BYTES", "268435456")
+        )
+        self._runs_since_checkpoint = 0
+        self._checkpoint_files: list = []
+        self._result_cache_files: Optional[list] = None
+
+        # Cached scandir index of the project directories (list_projects, project file tools)
+        self.project_index = ProjectIndex(self._projects_dir())
+
+        # Named cells for incremental execution (run_cells)
+        self.cells = CellGraph()
+        self._running_cell = False
+
+        # Deduplicated script stores (one per workspace/project directory),
+        # written in the background
+        self._script_stores: Dict[str, ScriptStore] = {}
+
         # Validation configuration
         self.validate_results = os.getenv("MATLAB_VALIDATE_RESULTS", "true").lower() == "true"
-        self.check_workspace_health = os.getenv("MATLAB_CHECK_WORKSPACE_HEALTH", "false").lower() == "true"
+        self.check_workspace_health = (
+            os.getenv("MATLAB_CHECK_WORKSPACE_HEALTH", "true").lower() == "true"
+        )
+        # modified, all
+        self.health_check_scope = os.getenv("MATLAB_HEALTH_CHECK_SCOPE", "modified")
+        self.health_max_elements = int(os.getenv("MATLAB_HEALTH_MAX_ELEMENTS", "100000"))
         self.strict_validation = os.getenv("MATLAB_STRICT_VALIDATION", "false").lower() == "true"
 
+        # Workspace change tracking configuration
+        self.track_workspace = os.getenv("MATLAB_TRACK_WORKSPACE", "true").lower() == "true"
+        self.diff_compare_bytes = int(os.getenv("MATLAB_DIFF_COMPARE_BYTES", "65536"))
+        self.diff_compare_max_vars = int(os.getenv("MATLAB_DIFF_COMPARE_MAX_VARS", "256"))
+
+        # Static analysis: skip figure/workspace bookkeeping the code cannot affect
+        self.static_analysis = os.getenv("MATLAB_STATIC_ANALYSIS", "true").lower() == "true"
+
+        # Moving average of each bookkeeping stage's cost in ms (estimates time saved by skips)
+        self._stage_cost_ms: Dict[str, float] = {}
+
+        # Variable metadata cache, kept current by the per-execution workspace delta
+        self._variable_info_cache: Dict[str, Dict[str, Any]] = {}
+
+        # Execution counter at which each variable was last created/modified (for LRU eviction)
+        self._execution_count = 0
+        self._variable_touched: Dict[str, int] = {}
+
+        # Figure export cache configuration (keyed by MATLAB-side content fingerprint)
+        self.figure_cache_enabled = os.getenv("MATLAB_FIGURE_CACHE", "true").lower() == "true"
+        self.figure_cache = FigureExportCache(
+            os.path.join(self.workspace_dir, ".figure_cache"),
+            int(os.getenv("MATLAB_FIGURE_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+        )
+        self._inline_image_cache: OrderedDict = OrderedDict()
+        self._inline_image_cache_size = 32
+
+        # Preview tier: low-DPI thumbnails rendered right after execution, full resolution on demand
+        self.figure_previews = os.getenv("MATLAB_FIGURE_PREVIEWS", "true").lower() == "true"
+        self.thumbnail_dpi = int(os.getenv("MATLAB_THUMBNAIL_DPI", "50"))
+        self.thumbnail_max_bytes = int(os.getenv("MATLAB_THUMBNAIL_MAX_BYTES", "60000"))
+
+        # Point cap for line/scatter objects during file export (0 = export data as is)
+        self.export_max_points = int(os.getenv("MATLAB_EXPORT_MAX_POINTS", "0"))
+
+        # Background exports: .fig snapshots rendered by a pool of export-only engines
+        self.export_offloader = ExportOffloader(
+            int(os.getenv("MATLAB_EXPORT_WORKERS", "1")), MATLAB_HELPERS_DIR
+        )
+
+        # Preflight: checkcode on a helper engine before code reaches this one
+        self.preflight: Optional[CodePreflight] = None
+        if os.getenv("MATLAB_PREFLIGHT", "false").lower() == "true":
+            self.preflight = CodePreflight(
+                MATLAB_HELPERS_DIR, timeout=float(os.getenv("MATLAB_PREFLIGHT_TIMEOUT", "5"))
+            )
+
+        # Per-object point cap for get_figure_data (0 = no downsampling)
+        self.figure_data_max_points = int(os.getenv("MATLAB_FIGURE_DATA_MAX_POINTS", "2000"))
+
+        # Per-figure tiers: {figure number: {"preview": {...}, "full": {...}}}
+        self._figure_tiers: Dict[float, Dict[str, Any]] = {}
+        self._current_figure: Optional[float] = None
+
+        # Figure retention: close least recently used figures beyond this many (0 = no limit)
+        self.max_open_figures = int(os.getenv("MATLAB_MAX_OPEN_FIGURES", "0"))
+        self.export_before_close = (
+            os.getenv("MATLAB_EXPORT_BEFORE_CLOSE", "false").lower() == "true"
+        )
+
+        # Execution counter at which each open figure was last created, current or exported
+        self._figure_last_used: Dict[float, int] = {}
+
+        # Open figures and screen geometry as of the last execute (refreshed by mcp_execute)
+        self._open_figures: Optional[list] = None
+        self._screen_geometry: Optional[Dict[str, Any]] = None
+
         # Create workspace directory if it doesn't exist
         os.makedirs(self.workspace_dir, exist_ok=True)
 
@@ -62,6 +460,12 @@ class MATLABEngineWrapper:
 
             # Set up initial configuration
             self.engine.eval("format long;", nargout=0)  # Better numeric precision
+            self.engine.addpath(MATLAB_HELPERS_DIR, nargout=0)
+
+            if self.offscreen_figures:
+                # No windows are created; export and inline rendering work on invisible figures
+                self.engine.eval("set(groot, 'DefaultFigureVisible', 'off');", nargout=0)
+                logger.info("Offscreen figure mode enabled")
 
             matlab_version = self._get_matlab_version()
             logger.info(f"MATLAB version: {matlab_version}")
@@ -87,6 +491,14 @@ class MATLABEngineWrapper:
             Dict with status and message
         """
         try:
+            self.export_offloader.shutdown()
+            if self.preflight:
+                self.preflight.shutdown()
+            for store in self._script_stores.values():
+                store.close()
+            if self.history:
+                # Stops the writer only; the next record after start() restarts it
+                self.history.close()
             if self.engine:
                 logger.info("Stopping MATLAB Engine...")
                 self.engine.quit()
@@ -134,9 +546,60 @@ class MATLABEngineWrapper:
                 - figures_validated: validation results for each figure
                 - new_figure_handles: list of new figure handles
                 - figures_positioned: number of figures positioned (if auto_position_figures=True)
-                - script_saved: path if script was saved
+                - script_saved: path if script was saved (content-addressed, may be shared
+                  by earlier runs of the same code)
+                - script_hash: hash of the saved code, as recorded in the session log
+                - workspace_delta: created/modified/deleted variable records
+                  (omitted when nothing changed)
+                - workspace_unverified: variables the code assigns that were too large
+                  to compare by value, so in-place edits of them are not in the delta
+                - figure_previews: new figures with a preview thumbnail ready
+                - lint: Code Analyzer messages from the preflight (omitted when none)
+                - syntax_errors: preflight syntax errors (the code was not run)
+                - instrumentation: static analysis decision, whether the workspace
+                  was tracked, skipped stages, stage timings and the estimated time
+                  saved by the skips
         """
+        result = self._execute(
+            code, capture_output, auto_position_figures, validate_results, auto_save_script
+        )
+        # Calls rejected before reaching the engine (engine not running) are not recorded
+        if self.history and "stdout" in result:
+            # Replay decides from these whether a run can be skipped or loaded from cache
+            instrumentation = result.get("instrumentation") or {}
+            extra = {
+                "workspace_tracked": instrumentation.get("workspace_tracked", False),
+                "analysis": instrumentation.get("analysis")
+            }
+            if result["success"]:
+                extra.update(self._cache_run_outputs(result))
+            self.history.record(code, result, self.current_project, extra)
+            if result["success"] and result.get("workspace_delta"):
+                self._runs_since_checkpoint += 1
+                if (self.checkpoint_every > 0
+                        and self._runs_since_checkpoint >= self.checkpoint_every):
+                    self._checkpoint_workspace()
+
+        # Code run outside the cells can change what the cells read
+        delta = result.get("workspace_delta")
+        if delta and not self._running_cell:
+            self.cells.workspace_changed(
+                [record["name"] for record in delta["created"] + delta["modified"]],
+                [record["name"] for record in delta["deleted"]]
+            )
+        return result
+
+    def _execute(
+        self,
+        code: str,
+        capture_output: bool,
+        auto_position_figures: bool,
+        validate_results: bool,
+        auto_save_script: Optional[bool]
+    ) -> Dict[str, Any]:
+        """Run code and build the result dict documented on execute."""
         logger.info(f"execute() called with code: {code[:50]}")
+        started = time.perf_counter()
 
         if not self.is_running():
             logger.info("Engine not running, returning error")
@@ -145,38 +608,148 @@ class MATLABEngineWrapper:
                 "error": "MATLAB Engine is not running. Call start() first."
             }
 
-        # Skip pre-execution MATLAB calls to avoid thread blocking issues
-        # We'll detect new figures after execution instead
-        previous_figures = []
+        # Lint on the helper engine first; code with syntax errors never reaches this engine
+        preflight = self.preflight.check(code) if self.preflight else None
+        lint = {"lint": preflight["lint"]} if preflight and preflight["lint"] else {}
+        if preflight and preflight["syntax_errors"]:
+            first = preflight["syntax_errors"][0]
+            return dict(
+                lint,
+                success=False,
+                stdout="",
+                stderr="",
+                error=(f"Syntax error at line {first['line']}, column {first['column']}: "
+                       f"{first['message']}"),
+                error_type="MatlabSyntaxError",
+                syntax_errors=preflight["syntax_errors"]
+            )
 
-        # Skip clearing warnings to avoid thread blocking
+        preflight_ms = (time.perf_counter() - started) * 1000
 
         stdout_buffer = io.StringIO()
         stderr_buffer = io.StringIO()
+        self._execution_count += 1
+
+        validate_results = validate_results and self.validate_results
+
+        # Code that cannot touch graphics or variables skips that bookkeeping entirely
+        analysis = _analyze_code(code, self._variable_touched) if self.static_analysis else None
+        track_figures = analysis is None or analysis["graphics"] or self._open_figures is None
+        track_workspace = self.track_workspace and (
+            analysis is None or analysis["mutates_workspace"]
+        )
+        check_health = validate_results and self.check_workspace_health and (
+            analysis is None or analysis["mutates_workspace"]
+        )
+
+        # Bookkeeping (workspace and figure snapshots) runs inside the same engine call as the code
+        exec_opts = {
+            "track_workspace": track_workspace,
+            "compare_max_bytes": float(self.diff_compare_bytes),
+            # Only variables the code can assign need a by-value comparison
+            "compare_names": (
+                analysis["writes"] if analysis is not None and analysis["writes"] is not None
+                else "all"
+            ),
+            "compare_max_vars": float(self.diff_compare_max_vars),
+            "track_figures": track_figures,
+            "validate_figures": validate_results,
+            "thumbnail_dpi": float(self.thumbnail_dpi if self.figure_previews else 0),
+            "thumbnail_max_pixels": float(self.thumbnail_max_bytes),
+            "report_screen": not self.offscreen_figures,
+            "capture_warnings": True,
+            "health_check": self.health_check_scope if check_health else "off",
+            "health_max_elements": float(self.health_max_elements)
+        }
+        if not track_figures:
+            # Lets mcp_execute fall back to tracking if figures appear after all
+            exec_opts["known_figures"] = matlab.double(self._open_figures)
+            exec_opts["known_current"] = matlab.double(
+                [self._current_figure] if self._current_figure is not None else []
+            )
+        if self.max_open_figures > 0:
+            exec_opts["max_open_figures"] = float(self.max_open_figures)
+            exec_opts["figure_lru"] = matlab.double(self._figure_lru())
+            if self.export_before_close:
+                exec_opts["close_export"] = self._close_export_opts()
 
         try:
             logger.info(f"Executing MATLAB code ({len(code)} characters): {code[:100]}")
+            engine_started = time.perf_counter()
 
             # Execute with output capture
             if capture_output:
-                logger.info("About to call engine.eval WITH capture...")
-                self.engine.eval(
+                logger.info("About to call mcp_execute WITH capture...")
+                exec_result = self.engine.mcp_execute(
                     code,
-                    nargout=0,
+                    exec_opts,
+                    nargout=1,
                     stdout=stdout_buffer,
                     stderr=stderr_buffer
                 )
-                logger.info("engine.eval completed successfully")
+                logger.info("mcp_execute completed")
             else:
-                logger.info("About to call engine.eval WITHOUT capture...")
-                self.engine.eval(code, nargout=0)
-                logger.info("engine.eval completed successfully")
+                logger.info("About to call mcp_execute WITHOUT capture...")
+                exec_result = self.engine.mcp_execute(code, exec_opts, nargout=1)
+                logger.info("mcp_execute completed")
 
+            engine_ms = (time.perf_counter() - engine_started) * 1000
             stdout_content = stdout_buffer.getvalue()
             stderr_content = stderr_buffer.getvalue()
 
-            # Skip figure detection to avoid blocking
-            new_figures = []
+            if track_workspace or not self.track_workspace:
+                workspace_delta = self._apply_workspace_delta(exec_result.get("delta"))
+                delta = exec_result.get("delta") or {}
+                unverified = [str(n) for n in to_list(delta.get("unverified"))]
+            else:
+                # No assignments in the code; only ans can have changed
+                workspace_delta = None
+                unverified = []
+                self._variable_info_cache.pop("ans", None)
+            figures = exec_result.get("figures") or {}
+            self._apply_figure_snapshot(figures)
+            closed = self._apply_closed_figures(figures.get("closed"))
+
+            skipped = []
+            if analysis is not None and self.track_workspace and not track_workspace:
+                skipped.append("workspace")
+            if not track_figures and not exec_result.get("figures_fallback"):
+                skipped.append("figures")
+            instrumentation = self._execution_instrumentation(
+                analysis, skipped, exec_result.get("timings"), preflight_ms, engine_ms, started
+            )
+            instrumentation["workspace_tracked"] = track_workspace
+
+            if not exec_result["ok"]:
+                logger.error(f"MATLAB execution error: {exec_result['error_message']}")
+                result = {
+                    "success": False,
+                    "stdout": stdout_content,
+                    "stderr": stderr_content,
+                    "error": exec_result["error_message"],
+                    "error_identifier": exec_result["error_identifier"],
+                    "error_report": exec_result.get("error_report", ""),
+                    "error_stack": self._decode_error_stack(exec_result.get("error_stack")),
+                    "error_type": "MatlabExecutionError"
+                }
+                if workspace_delta:
+                    result["workspace_delta"] = workspace_delta
+                if unverified:
+                    result["workspace_unverified"] = unverified
+                result.update(closed)
+                result.update(lint)
+                result["instrumentation"] = instrumentation
+                return result
+
+            # New figures were recorded by the mcp_execute epilogue - no extra engine call
+            new_figures = [float(n) for n in to_list(figures.get("new"))]
+            if new_figures:
+                logger.info(f"Detected {len(new_figures)} new figure(s): {new_figures}")
+
+            # Warnings were printed with identifier and stack during the same call
+            warning_check = self._check_matlab_warnings(
+                stderr_content, exec_result.get("last_warning")
+            )
 
             result = {
                 "success": True,
@@ -184,14 +757,43 @@ class MATLABEngineWrapper:
                 "stderr": stderr_content,
                 "output": stdout_content,  # Alias for convenience
                 "figures_created": len(new_figures),
-                "new_figure_handles": new_figures
+                "new_figure_handles": new_figures,
+                "warnings": warning_check["warnings"],
+                "has_warnings": bool(warning_check["warnings"])
             }
 
-            # Skip validation to avoid blocking MATLAB calls
+            if workspace_delta:
+                result["workspace_delta"] = workspace_delta
+            if unverified:
+                result["workspace_unverified"] = unverified
+            result.update(closed)
+            result.update(lint)
+
+            previews = [n for n in new_figures if "preview" in self._figure_tiers.get(n, {})]
+            if previews:
+                result["figure_previews"] = previews
+
+            # Figure content was summarized by the same engine call (mcp_figure_summary)
             if validate_results:
-                validation = {"has_errors": False, "has_warnings": False, "warnings": [], "figures": [], "issues": []}
+                figure_validations = self._decode_figure_summary(figures.get("summary"))
+                validation = {
+                    "has_errors": warning_check["has_critical"],
+                    "has_warnings": bool(warning_check["warnings"]),
+                    "warnings": warning_check["warnings"],
+                    "figures": figure_validations,
+                    "issues": list(warning_check["issues"])
+                }
+                if exec_result.get("health") is not None:
+                    health = self._check_workspace_health(exec_result["health"])
+                    validation["issues"].extend(health["issues"])
+                    validation["variables_checked"] = health["variables_checked"]
                 result["validation"] = validation
-                result["figures_validated"] = []
+                result["figures_validated"] = figure_validations
+
+                if warning_check["has_critical"] and self.strict_validation:
+                    critical = [w for w in warning_check["warnings"] if w["severity"] == "critical"]
+                    result["success"] = False
+                    result["error"] = f"Critical MATLAB warning: {critical[0]['message']}"
 
             # Auto-save script if configured
             save_script = auto_save_script if auto_save_script is not None else self.auto_save_scripts
@@ -210,14 +812,26 @@ class MATLABEngineWrapper:
                 )
                 if script_result.get("success"):
                     result["script_saved"] = script_result.get("path")
+                    result["script_hash"] = script_result.get("hash")
 
-            # Skip auto-positioning to avoid blocking
+            # Position figures only when this run created some
             result["figures_positioned"] = 0
-
+            if (new_figures and auto_position_figures and self.auto_position_figures
+                    and not self.offscreen_figures):
+                if self.positioning_strategy == "tile":
+                    position_result = self._position_figures_tile()
+                else:
+                    position_result = self._position_figures_cascade()
+                if position_result.get("success"):
+                    result["figures_positioned"] = position_result.get("figures_positioned", 0)
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            instrumentation["timings_ms"]["total"] = round(elapsed_ms, 1)
+            result["instrumentation"] = instrumentation
             return result
 
         except matlab.engine.MatlabExecutionError as e:
-            # MATLAB execution error - code ran but had an error
+            # MATLAB execution error outside the user code (e.g. helper not on path)
             logger.error(f"MATLAB execution error: {e}", exc_info=True)
             return {
                 "success": False,
@@ -242,6 +856,375 @@ class MATLABEngineWrapper:
             stdout_buffer.close()
             stderr_buffer.close()
 
+    def run_cells(
+        self,
+        cells: Optional[list] = None,
+        remove: Optional[list] = None,
+        run: bool = True
+    ) -> Dict[str, Any]:
+        """Register or edit named cells and run only the ones that are out of date.
+
+        Cells run in registration order. What each cell reads and writes is inferred from
+        a static scan of its code and from the workspace delta of its runs. A cell is re-run
+        when it is new, its code changed, it failed last time, or something it reads changed
+        (an upstream cell re-ran, or other code modified the variable). All other cells are
+        reused: their outputs are still in the workspace.
+
+        Args:
+            cells: List of {"name": ..., "code": ...} to add (appended) or replace
+            remove: Names of cells to remove
+            run: Run the stale cells (default True)
+
+        Returns:
+            Dict with cells (name, status, inputs, dependencies, writes, timing, output of
+            cells that ran), executed, reused and edited counts
+        """
+        if run and not self.is_running():
+            return {"success": False, "error": "MATLAB Engine not running"}
+
+        for name in remove or []:
+            self.cells.remove(name)
+        edited = []
+        for cell in cells or []:
+            reads, writes = _scan_variables(cell["code"])
+            if self.cells.set_cell(cell["name"], cell["code"], reads, writes):
+                edited.append(cell["name"])
+
+        report = []
+        executed = 0
+        failed = None
+        for name in self.cells.names():
+            cell = self.cells.get(name)
+            entry = {"name": name, "dependencies": self.cells.dependencies(name)}
+
+            if not cell["stale"]:
+                entry["status"] = "reused"
+            elif not run or failed is not None:
+                entry["status"] = "stale"
+            else:
+                self._running_cell = True
+                try:
+                    result = self.execute(cell["code"], auto_save_script=False)
+                finally:
+                    self._running_cell = False
+                instrumentation = result.get("instrumentation") or {}
+                analysis = instrumentation.get("analysis")
+                if (instrumentation.get("workspace_tracked")
+                        or (analysis and not analysis["mutates_workspace"])):
+                    delta = result.get("workspace_delta") or {}
+                    records = delta.get("created", []) + delta.get("modified", [])
+                    changed = [record["name"] for record in records]
+                    changed += [
+                        n for n in result.get("workspace_unverified", []) if n in cell["writes"]
+                    ]
+                else:
+                    # Not tracked: every variable the cell writes may have changed
+                    changed = None
+                duration = (result.get("instrumentation") or {}).get("timings_ms", {}).get("total")
+                self.cells.record_run(
+                    name, result["success"], changed, duration, result.get("stdout", "")
+                )
+                executed += 1
+
+                entry["status"] = "ran" if result["success"] else "failed"
+                entry["output"] = result.get("stdout", "")
+                entry["figures_created"] = result.get("figures_created", 0)
+                if not result["success"]:
+                    entry["error"] = result.get("error")
+                    failed = name
+
+            written = set()
+            for dependency in entry["dependencies"]:
+                written |= self.cells.get(dependency)["writes"]
+            entry["inputs"] = sorted(cell["reads"] & written)
+            entry["writes"] = sorted(cell["writes"])
+            entry["duration_ms"] = cell["duration_ms"]
+            report.append(entry)
+
+        return {
+            "success": failed is None,
+            "cells": report,
+            "edited": edited,
+            "executed": executed,
+            "reused": sum(1 for entry in report if entry["status"] == "reused"),
+            **({"error": f"Cell '{failed}' failed; out-of-date cells after it were not run"}
+               if failed else {})
+        }
+
+    def replay_session(
+        self,
+        session: Optional[str] = None,
+        project: Optional[str] = None,
+        restart: bool = True,
+        progress: Optional[Callable[[int, int, str], None]] = None
+    ) -> Dict[str, Any]:
+        """Rebuild a workspace by replaying recorded executions in order.
+
+        Replay of a session starts from its latest workspace checkpoint and only handles
+        the runs after it; replay of a project runs all its runs, since checkpoints hold
+        the workspace of a single session. Runs that static analysis showed cannot assign
+        variables or touch graphics are skipped; successful runs whose outputs are in the
+        result cache are loaded from it, and every other run (including runs that failed
+        part-way, which may have had effects) is executed. Figures created before the
+        checkpoint are not recreated. Replayed runs are not recorded in the history again.
+
+        Args:
+            session: Session id to replay (default: the most recent session with runs)
+            project: Replay every run of this project instead of a single session
+            restart: Start from a fresh engine (otherwise replay into the current workspace)
+            progress: Called with (done, total, message) after each step
+
+        Returns:
+            Dict with session, project, checkpoint, counts of runs executed, loaded from
+            cache and skipped, failures and elapsed seconds
+        """
+        if not self.history:
+            return {
+                "success": False,
+                "error": "Execution history is disabled (MATLAB_HISTORY=false)"
+            }
+
+        started = time.perf_counter()
+        plan = self.history.replay_plan(session=session, project=project)
+        if not plan["runs"]:
+            return {"success": False, "error": "No recorded runs to replay"}
+        checkpoint = plan["checkpoint"]
+        runs = plan["runs"]
+        if checkpoint:
+            runs = [run for run in runs if run["id"] > checkpoint["after_run"]]
+
+        if restart or not self.is_running():
+            if self.engine:
+                try:
+                    self.engine.quit()
+                except Exception as e:
+                    logger.warning(f"Failed to stop engine before replay: {e}")
+                self.engine = None
+            started_engine = self.start()
+            if not started_engine["success"]:
+                return {"success": False, "error": started_engine["message"]}
+            self._reset_engine_state()
+
+        total = len(runs) + (1 if checkpoint else 0)
+        done = 0
+        counts = {"executed": 0, "loaded": 0, "skipped": 0}
+        failures = []
+
+        if checkpoint:
+            self.engine.eval(f"load('{_matlab_quote(checkpoint['path'])}');", nargout=0)
+            self._variable_info_cache.clear()
+            done += 1
+            if progress:
+                progress(done, total, f"Loaded checkpoint after run #{checkpoint['after_run']}")
+
+        for run in runs:
+            details = run["details"]
+            delta = details.get("workspace_delta", {})
+            analysis = details.get("analysis")
+            result_cache = details.get("result_cache")
+
+            # An empty delta is no proof: large variables edited in place and drawing into
+            # existing figures do not show up in it, so only the static analysis decides
+            if analysis and not analysis["graphics"] and not analysis["mutates_workspace"]:
+                counts["skipped"] += 1
+                message = f"Skipped run #{run['id']} (no assignments or graphics)"
+            elif run["success"] and result_cache and os.path.exists(result_cache):
+                self.engine.eval(f"load('{_matlab_quote(result_cache)}');", nargout=0)
+                if delta.get("deleted"):
+                    self.engine.eval(f"clear {' '.join(delta['deleted'])}", nargout=0)
+                self._variable_info_cache.clear()
+                counts["loaded"] += 1
+                message = f"Loaded outputs of run #{run['id']} from cache"
+            else:
+                replayed = self._execute(
+                    run["code"],
+                    capture_output=True,
+                    auto_position_figures=True,
+                    validate_results=False,
+                    auto_save_script=False
+                )
+                counts["executed"] += 1
+                message = f"Executed run #{run['id']}"
+                if not replayed["success"] and run["success"]:
+                    failures.append({"run": run["id"], "error": replayed.get("error")})
+                    message += " (failed)"
+                elif not replayed["success"]:
+                    message += " (failed, as when recorded)"
+
+            done += 1
+            if progress:
+                progress(done, total, message)
+
+        return {
+            "success": not failures,
+            "session": plan["session"],
+            "project": plan["project"],
+            "runs_recorded": len(plan["runs"]),
+            "checkpoint": checkpoint,
+            "runs_before_checkpoint": len(plan["runs"]) - len(runs),
+            **counts,
+            "failures": failures,
+            "elapsed": round(time.perf_counter() - started, 2)
+        }
+
+    def _reset_engine_state(self) -> None:
+        """Forget cached workspace and figure state after a fresh engine was started."""
+        self._variable_info_cache.clear()
+        self._variable_touched.clear()
+        self._figure_tiers.clear()
+        self._figure_last_used.clear()
+        self._current_figure = None
+        self._open_figures = None
+        self._runs_since_checkpoint = 0
+        self.cells.invalidate_all()
+
+    def _cache_run_outputs(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Save the variables a run assigned when they are small enough.
+
+        Only runs whose sole effect, by static analysis, is assigning the variables named
+        in the code are cached; anything that may draw or have other effects (unknown
+        functions, eval, workspace commands) must be executed by replay. The saved names
+        are the static writes together with the delta, so variables edited in place
+        without showing up in the delta are included.
+
+        Args:
+            result: Successful execute result
+
+        Returns:
+            Dict with result_cache (MAT-file path), or empty if nothing was cached
+        """
+        analysis = (result.get("instrumentation") or {}).get("analysis")
+        if (
+            self.result_cache_max_bytes <= 0 or not analysis or analysis["graphics"]
+            or analysis["writes"] is None or result.get("figures_created")
+        ):
+            return {}
+        delta = result.get("workspace_delta") or {}
+        names = set(analysis["writes"]) | {
+            record["name"] for record in delta.get("created", []) + delta.get("modified", [])
+        }
+        if not names:
+            return {}
+
+        try:
+            cache_dir = os.path.abspath(os.path.join(self.workspace_dir, ".result_cache"))
+            os.makedirs(cache_dir, exist_ok=True)
+            path = os.path.join(cache_dir, f"{self.history.session}_{self._execution_count}.mat")
+            saved_bytes = self.engine.mcp_save_outputs(
+                path, sorted(names), float(self.result_cache_max_bytes), nargout=1
+            )
+            if not saved_bytes:
+                return {}
+            self._prune_result_cache(cache_dir, path, int(saved_bytes))
+            return {"result_cache": path}
+        except Exception as e:
+            logger.warning(f"Failed to cache run outputs: {e}")
+            return {}
+
+    def _prune_result_cache(self, cache_dir: str, path: str, size: int) -> None:
+        """Register a new result cache file and delete the oldest ones above the total size.
+
+        Replay executes runs whose cache file was pruned.
+
+        Args:
+            cache_dir: Result cache directory
+            path: File just written
+            size: Its size in bytes
+        """
+        if self._result_cache_files is None:
+            # Files left by earlier sessions, oldest first
+            existing = []
+            with os.scandir(cache_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.path != path:
+                        st = entry.stat()
+                        existing.append((st.st_mtime, entry.path, st.st_size))
+            self._result_cache_files = [(p, n) for _, p, n in sorted(existing)]
+        self._result_cache_files.append((path, size))
+
+        total = sum(n for _, n in self._result_cache_files)
+        while total > self.result_cache_total_bytes and len(self._result_cache_files) > 1:
+            old_path, old_size = self._result_cache_files.pop(0)
+            total -= old_size
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+    def _checkpoint_workspace(self) -> None:
+        """Save the whole workspace for replay and keep only the two newest checkpoints.
+
+        The save runs in the engine and blocks the execute that triggered it, which is
+        why checkpoints are off unless MATLAB_CHECKPOINT_EVERY is set.
+        """
+        try:
+            checkpoint_dir = os.path.abspath(os.path.join(self.workspace_dir, "checkpoints"))
+            os.makedirs(checkpoint_dir, exist_ok=True)
+            path = os.path.join(
+                checkpoint_dir, f"replay_{self.history.session}_{self._execution_count}.mat"
+            )
+            self.engine.eval(f"save('{_matlab_quote(path)}', '-v7.3');", nargout=0)
+            self.history.record_checkpoint(path, self.current_project)
+            self._runs_since_checkpoint = 0
+            logger.info(f"Workspace checkpoint saved to {path}")
+
+            self._checkpoint_files.append(path)
+            while len(self._checkpoint_files) > 2:
+                try:
+                    os.remove(self._checkpoint_files.pop(0))
+                except OSError:
+                    pass
+        except Exception as e:
+            logger.warning(f"Failed to checkpoint workspace: {e}")
+
+    def search_history(
+        self,
+        query: Optional[str] = None,
+        variable: Optional[str] = None,
+        success: Optional[bool] = None,
+        project: Optional[str] = None,
+        code: Optional[str] = None,
+        since_hours: Optional[float] = None,
+        min_duration_ms: Optional[float] = None,
+        limit: int = 20
+    ) -> Dict[str, Any]:
+        """Search the execution history, newest runs first.
+
+        Args:
+            query: Words that must all appear in the code or in the run's error/warnings
+            variable: Only runs that created or modified this variable
+            success: Only successful (True) or failed (False) runs
+            project: Only runs in this project
+            code: Only runs of exactly this code
+            since_hours: Only runs from the last this many hours
+            min_duration_ms: Only runs that took at least this long
+            limit: Maximum number of runs to return
+
+        Returns:
+            Dict with runs (code, timings, success, warnings, workspace delta, figures)
+            and total_runs
+        """
+        if not self.history:
+            return {
+                "success": False,
+                "error": "Execution history is disabled (MATLAB_HISTORY=false)"
+            }
+
+        try:
+            found = self.history.search(
+                query=query,
+                variable=variable,
+                success=success,
+                project=project,
+                code=code,
+                since=time.time() - since_hours * 3600 if since_hours else None,
+                min_duration_ms=min_duration_ms,
+                limit=limit
+            )
+            return {"success": True, **found}
+        except Exception as e:
+            return {"success": False, "error": f"Failed to search history: {str(e)}"}
+
     def get_variable(self, var_name: str) -> Dict[str, Any]:
         """Get a variable from MATLAB workspace.
 
@@ -281,29 +1264,54 @@ class MATLABEngineWrapper:
                 "error": f"Failed to get variable: {str(e)}"
             }
 
-    def list_workspace(self) -> Dict[str, Any]:
-        """List all variables in MATLAB workspace.
+    def list_workspace(
+        self,
+        pattern: Optional[str] = None,
+        class_name: Optional[str] = None,
+        min_bytes: Optional[int] = None,
+        sort_by: str = "name",
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """List variables in MATLAB workspace with a single whos evaluation.
+
+        Filtering, sorting and truncation happen inside MATLAB (mcp_whos), so only
+        the requested records cross the engine boundary.
+
+        Args:
+            pattern: Wildcard pattern on variable names (e.g. 'x*')
+            class_name: Only include variables of this MATLAB class
+            min_bytes: Only include variables of at least this many bytes
+            sort_by: 'name' (default) or 'bytes' (largest first)
+            limit: Maximum number of variables to return
 
         Returns:
-            Dict with list of variables and their properties
+            Dict with variable names, structured records and a formatted table
         """
         if not self.is_running():
             return {"success": False, "error": "MATLAB Engine not running"}
 
-        try:
-            # Get workspace info using 'whos'
-            result = self.execute("whos;", capture_output=True)
+        opts = {"sort_by": sort_by}
+        if pattern:
+            opts["pattern"] = pattern
+        if class_name:
+            opts["class_name"] = class_name
+        if min_bytes:
+            opts["min_bytes"] = float(min_bytes)
+        if limit:
+            opts["limit"] = float(limit)
 
-            if not result["success"]:
-                return result
-
-            # Also get variable names as a list
-            var_names_result = self.engine.eval("who()", nargout=1)
+        try:
+            info = self.engine.mcp_whos(opts, nargout=1)
+            records = self._whos_records(info)
 
             return {
                 "success": True,
-                "variables": list(var_names_result) if var_names_result else [],
-                "details": result["stdout"]
+                "variables": [r["name"] for r in records],
+                "records": records,
+                "total_count": int(info["total_count"]),
+                "total_bytes": int(info["total_bytes"]),
+                "matched_count": int(info["matched_count"]),
+                "details": self._format_whos_table(records)
             }
         except Exception as e:
             return {
@@ -311,6 +1319,127 @@ class MATLABEngineWrapper:
                 "error": f"Failed to list workspace: {str(e)}"
             }
 
+    def workspace_memory(
+        self,
+        mode: str = "report",
+        top_n: int = 10,
+        target_bytes: Optional[int] = None,
+        policy: str = "largest",
+        checkpoint: bool = False,
+        min_duplicate_bytes: int = 1024 * 1024
+    ) -> Dict[str, Any]:
+        """Report workspace memory usage and optionally evict variables.
+
+        Args:
+            mode: 'report' or 'evict'
+            top_n: Number of largest variables to report
+            target_bytes: For 'evict', clear variables until the workspace total is at or
+                below this many bytes
+            policy: Eviction order - 'largest' first, or 'lru' (least recently created or
+                modified by an execution; variables never seen changing count as oldest)
+            checkpoint: Save evicted variables to a MAT-file before clearing them
+            min_duplicate_bytes: Only consider arrays at least this large as duplicates
+
+        Returns:
+            Dict with totals, top variables, duplicate groups, figure count, engine RSS
+            and (for 'evict') the variables cleared
+        """
+        if not self.is_running():
+            return {"success": False, "error": "MATLAB Engine not running"}
+
+        if mode == "evict" and target_bytes is None:
+            return {"success": False, "error": "target_bytes is required for evict mode"}
+
+        try:
+            info = self.engine.mcp_workspace_memory(nargout=1)
+            records = self._whos_records(info)
+            pid = int(info["pid"])
+            total_bytes = sum(r["bytes"] for r in records)
+
+            by_size = sorted(records, key=lambda r: r["bytes"], reverse=True)
+
+            # Same class, size and byte count looks like an accidental copy
+            groups: Dict[tuple, list] = {}
+            for r in records:
+                if r["bytes"] >= min_duplicate_bytes:
+                    key = (r["class"], tuple(r["size"]), r["bytes"])
+                    groups.setdefault(key, []).append(r["name"])
+            duplicates = [
+                {"class": key[0], "size": list(key[1]), "bytes": key[2], "variables": names}
+                for key, names in groups.items() if len(names) > 1
+            ]
+
+            result = {
+                "success": True,
+                "total_bytes": total_bytes,
+                "variable_count": len(records),
+                "top_variables": by_size[:top_n],
+                "duplicates": duplicates,
+                "figure_count": int(info["figure_count"]),
+                "engine_pid": pid,
+                "engine_rss_bytes": _process_rss_bytes(pid)
+            }
+
+            if mode != "evict":
+                return result
+
+            if policy == "lru":
+                order = sorted(
+                    records,
+                    key=lambda r: (self._variable_touched.get(r["name"], 0), -r["bytes"])
+                )
+            else:
+                order = by_size
+
+            to_evict = []
+            remaining = total_bytes
+            for r in order:
+                if remaining <= target_bytes:
+                    break
+                to_evict.append(r)
+                remaining -= r["bytes"]
+
+            result["evicted"] = to_evict
+            result["bytes_after"] = remaining
+
+            if not to_evict:
+                return result
+
+            checkpoint_file = ""
+            if checkpoint:
+                from datetime import datetime
+                # Absolute path - MATLAB's working directory differs from ours
+                checkpoint_dir = os.path.abspath(os.path.join(self.workspace_dir, "checkpoints"))
+                os.makedirs(checkpoint_dir, exist_ok=True)
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                checkpoint_file = os.path.join(checkpoint_dir, f"evicted_{timestamp}.mat")
+
+            names = [r["name"] for r in to_evict]
+            evict_result = self.engine.mcp_evict(names, checkpoint_file, nargout=1)
+
+            if not evict_result["ok"]:
+                return {
+                    "success": False,
+                    "error": f"Failed to evict variables: {evict_result['error_message']}"
+                }
+
+            for name in names:
+                self._variable_info_cache.pop(name, None)
+                self._variable_touched.pop(name, None)
+            # Cells that wrote the cleared variables must run again to recreate them
+            self.cells.workspace_changed([], names)
+
+            if evict_result["checkpoint_file"]:
+                result["checkpoint_file"] = evict_result["checkpoint_file"]
+
+            return result
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to account workspace memory: {str(e)}"
+            }
+
     def clear_workspace(self, variables: Optional[list] = None) -> Dict[str, Any]:
         """Clear variables from MATLAB workspace.
 
@@ -323,95 +1452,727 @@ class MATLABEngineWrapper:
         if not self.is_running():
             return {"success": False, "error": "MATLAB Engine not running"}
 
-        try:
-            if variables:
-                # Clear specific variables
-                vars_str = " ".join(variables)
-                result = self.execute(f"clear {vars_str};")
-            else:
-                # Clear all variables
-                result = self.execute("clear all;")
+        try:
+            if variables:
+                # Clear specific variables
+                vars_str = " ".join(variables)
+                result = self.execute(f"clear {vars_str};")
+            else:
+                # Clear all variables
+                result = self.execute("clear all;")
+
+            return result
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to clear workspace: {str(e)}"
+            }
+
+    def close_figures(
+        self,
+        figure_handles: Optional[list] = None,
+        keep: Optional[int] = None,
+        export: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """Close figures in a single engine call, optionally exporting them first.
+
+        Args:
+            figure_handles: Figure numbers to close
+            keep: If figure_handles is None, close least recently used figures until
+                this many remain (the current figure is kept); if both are None, close all
+            export: Export figures to PNG before closing (uses MATLAB_EXPORT_BEFORE_CLOSE
+                if None); figures whose export fails stay open
+
+        Returns:
+            Dict with closed figure numbers, exported paths and the figures left open
+        """
+        if not self.is_running():
+            return {"success": False, "error": "MATLAB Engine not running"}
+
+        opts = {}
+        if figure_handles:
+            numbers = matlab.double([float(h) for h in figure_handles])
+        elif keep is not None:
+            numbers = "lru"
+            opts["keep"] = float(keep)
+            opts["lru"] = matlab.double(self._figure_lru())
+            opts["protect"] = matlab.double(
+                [self._current_figure] if self._current_figure is not None else []
+            )
+        else:
+            numbers = "all"
+
+        if export if export is not None else self.export_before_close:
+            opts.update(self._close_export_opts())
+
+        try:
+            res = self.engine.mcp_close_figures(numbers, opts, nargout=1)
+            self._open_figures = [float(n) for n in to_list(res.get("open"))]
+            closed = self._apply_closed_figures(res)
+
+            return {
+                "success": True,
+                "closed": closed.get("figures_closed", []),
+                "exported": closed.get("closed_figure_exports", []),
+                "open": self._open_figures
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to close figures: {str(e)}"
+            }
+
+    def export_figure(
+        self,
+        figure_handle: Optional[int] = None,
+        filename: Optional[str] = None,
+        format: str = "png",
+        dpi: Optional[int] = None,
+        max_points: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Export MATLAB figure to file.
+
+        If the figure was exported with the same settings and no execution has happened
+        since, the full-resolution tier is copied without touching the engine.
+
+        Args:
+            figure_handle: Figure handle number (None for current figure)
+            filename: Output filename (auto-generated if None)
+            format: Export format ('png', 'svg', 'pdf', 'eps')
+            dpi: Resolution in DPI (uses default if None)
+            max_points: Point cap for line/scatter data during export (see export_figures)
+
+        Returns:
+            Dict with export status and file path
+        """
+        if not self.is_running():
+            return {"success": False, "error": "MATLAB Engine not running"}
+
+        # Generate filename if not provided
+        if not filename:
+            import time
+            timestamp = int(time.time())
+            filename = f"figure_{timestamp}.{format}"
+
+        cached = self._copy_full_tier(figure_handle, filename, format, dpi, max_points)
+        if cached is not None:
+            return cached
+
+        result = self.export_figures(
+            figure_handles=[figure_handle] if figure_handle is not None else None,
+            format=format,
+            dpi=dpi,
+            filename=filename,
+            current_only=figure_handle is None,
+            max_points=max_points
+        )
+
+        if not result["success"]:
+            return result
+        if not result["exports"]:
+            target = f"figure {figure_handle}" if figure_handle is not None else "current figure"
+            return {"success": False, "error": f"Nothing exported: no {target} is open"}
+
+        export = result["exports"][0]
+        if export["error"] or not os.path.exists(export["path"]):
+            return {
+                "success": False,
+                "error": export["error"] or "Export command executed but file not found",
+                "details": export
+            }
+
+        return {
+            "success": True,
+            "message": f"Figure exported to {export['path']}",
+            "path": export["path"],
+            "format": format,
+            "bytes": export["bytes"],
+            "cached": export["cached"],
+            "points": export.get("points"),
+            "points_kept": export.get("points_kept")
+        }
+
+    def _copy_full_tier(
+        self,
+        figure_handle: Optional[int],
+        filename: str,
+        format: str,
+        dpi: Optional[int],
+        max_points: Optional[int]
+    ) -> Optional[Dict[str, Any]]:
+        """Serve an export from the stored full-resolution tier of an unchanged figure.
+
+        Returns:
+            export_figure result, or None if the figure must be rendered
+        """
+        number = float(figure_handle) if figure_handle is not None else self._current_figure
+        full = self._figure_tiers.get(number, {}).get("full") if number is not None else None
+        if (
+            not full or full["execution"] != self._execution_count
+            or (full["format"], full["dpi"], full["max_points"]) != (
+                format,
+                dpi or self.figure_dpi,
+                self.export_max_points if max_points is None else max_points
+            )
+            or not os.path.exists(full["path"])
+        ):
+            return None
+
+        if not os.path.isabs(filename):
+            filename = os.path.join(self.workspace_dir, filename)
+        path = os.path.abspath(filename.replace("{n}", str(int(number))))
+        try:
+            if path != full["path"]:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                shutil.copyfile(full["path"], path)
+        except OSError as e:
+            logger.warning(f"Failed to copy stored export: {e}")
+            return None
+
+        return {
+            "success": True,
+            "message": f"Figure exported to {path}",
+            "path": path,
+            "format": format,
+            "bytes": full["bytes"],
+            "cached": True,
+            "points": full["points"],
+            "points_kept": full["points_kept"]
+        }
+
+    def export_figure_background(
+        self,
+        figure_handle: Optional[int] = None,
+        filename: Optional[str] = None,
+        format: str = "png",
+        dpi: Optional[int] = None,
+        max_points: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Export a figure on a background export engine.
+
+        Only a compact .fig snapshot is saved on this engine; an export engine from the pool
+        (MATLAB_EXPORT_WORKERS) loads and renders it, so this returns right away. Poll the
+        job with export_job_status.
+
+        Args:
+            figure_handle: Figure number (None for current figure)
+            filename: Output filename (auto-generated if None)
+            format: Export format ('png', 'svg', 'pdf', 'eps', 'jpg', 'tiff')
+            dpi: Resolution in DPI (uses default if None)
+            max_points: Point cap for line/scatter data during export (see export_figures)
+
+        Returns:
+            Dict with the job record (job_id, status, figure, path, format, dpi)
+        """
+        if not self.is_running():
+            return {"success": False, "error": "MATLAB Engine not running"}
+
+        dpi = dpi or self.figure_dpi
+        if max_points is None:
+            max_points = self.export_max_points
+
+        from datetime import datetime
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        if not filename:
+            filename = f"figure_{timestamp}.{format}"
+        if not os.path.isabs(filename):
+            filename = os.path.join(self.workspace_dir, filename)
+        filename = os.path.abspath(filename)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+        snapshot_dir = os.path.abspath(os.path.join(self.workspace_dir, ".export_snapshots"))
+        os.makedirs(snapshot_dir, exist_ok=True)
+        snapshot = os.path.join(snapshot_dir, f"snapshot_{timestamp}.fig")
+
+        number = matlab.double([]) if figure_handle is None else float(figure_handle)
+
+        try:
+            figure = float(self.engine.mcp_save_snapshot(number, snapshot, nargout=1))
+            self._touch_figure(figure)
+            job = self.export_offloader.submit(snapshot, filename, format, dpi, max_points, figure)
+            return dict(job, success=True)
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to start background export: {str(e)}"
+            }
+
+    def export_job_status(self, job_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get the status of background exports.
+
+        Args:
+            job_id: Job to look up (None lists all known jobs)
+
+        Returns:
+            Dict with the job record, or "jobs" with all records
+        """
+        if job_id is None:
+            return {"success": True, "jobs": self.export_offloader.status()}
+
+        job = self.export_offloader.status(job_id)
+        if job is None:
+            return {"success": False, "error": f"Unknown export job '{job_id}'"}
+        return dict(job, success=True)
+
+    def export_figure_formats(
+        self,
+        figure_handle: Optional[int] = None,
+        formats: Optional[list] = None,
+        dpis: Optional[list] = None,
+        filename: Optional[str] = None,
+        max_points: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Export one figure to several formats and resolutions with a single engine call.
+
+        Raster formats are written once per DPI in dpis; outputs that share a DPI are
+        encoded from one render. Every output goes through the same exportgraphics path
+        as export_figure, so the files match its cropping. Vector formats are written once.
+
+        Args:
+            figure_handle: Figure number (None for current figure)
+            formats: Export formats, e.g. ['png', 'pdf', 'svg'] (default ['png'])
+            dpis: Resolutions for the raster formats (default [MATLAB_FIGURE_DPI])
+            filename: Output path without extension (auto-generated if None); raster
+                files get a _<dpi>dpi suffix when several DPIs are requested
+            max_points: Point cap for line/scatter data during export (see export_figures)
+
+        Returns:
+            Dict with one export record (format, dpi, path, bytes, error) per output
+        """
+        if not self.is_running():
+            return {"success": False, "error": "MATLAB Engine not running"}
+
+        formats = formats or ["png"]
+        dpis = dpis or [self.figure_dpi]
+        if max_points is None:
+            max_points = self.export_max_points
+
+        if not filename:
+            from datetime import datetime
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"figure_{timestamp}"
+        base = os.path.splitext(filename)[0]
+        if not os.path.isabs(base):
+            base = os.path.join(self.workspace_dir, base)
+        base = os.path.abspath(base)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+
+        outputs = []
+        for fmt in dict.fromkeys(formats):
+            if fmt in ("png", "jpg", "tiff"):
+                for dpi in dict.fromkeys(dpis):
+                    suffix = f"_{dpi}dpi" if len(dpis) > 1 else ""
+                    outputs.append((f"{base}{suffix}.{fmt}", fmt, dpi))
+            else:
+                outputs.append((f"{base}.{fmt}", fmt, max(dpis)))
+
+        number = matlab.double([]) if figure_handle is None else float(figure_handle)
+
+        try:
+            info = self.engine.mcp_export_formats(
+                number,
+                [path for path, _, _ in outputs],
+                [fmt for _, fmt, _ in outputs],
+                matlab.double([float(dpi) for _, _, dpi in outputs]),
+                {"max_points": float(max_points)},
+                nargout=1
+            )
+
+            sizes = to_list(info.get("bytes"))
+            errors = to_list(info.get("error"))
+            exports = [
+                {
+                    "format": fmt,
+                    "dpi": dpi,
+                    "path": path,
+                    "bytes": int(sizes[i]),
+                    "error": errors[i]
+                }
+                for i, (path, fmt, dpi) in enumerate(outputs)
+            ]
+            figure = float(info["number"])
+            self._touch_figure(figure)
+
+            result = {
+                "success": True,
+                "figure": figure,
+                "exports": exports,
+                "exported": sum(1 for e in exports if not e["error"]),
+                "failed": sum(1 for e in exports if e["error"])
+            }
+            if info["kept"] < info["points"]:
+                result["points"] = int(info["points"])
+                result["points_kept"] = int(info["kept"])
+            return result
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to export figure: {str(e)}"
+            }
+
+    def list_figure_numbers(self) -> Dict[str, Any]:
+        """List the numbers of the open figures with a single helper call.
+
+        The result also refreshes the open-figure snapshot kept between executions.
+
+        Returns:
+            Dict with figures (sorted figure numbers as floats) and current (number of
+            the current figure, or None)
+        """
+        if not self.is_running():
+            return {"success": False, "error": "MATLAB Engine not running"}
+
+        try:
+            info = self.engine.mcp_figure_numbers(nargout=1)
+        except Exception as e:
+            logger.warning(f"Failed to list figures: {e}")
+            return {"success": False, "error": f"Failed to list figures: {str(e)}"}
+
+        figures = [float(n) for n in to_list(info.get("numbers"))]
+        current = to_list(info.get("current"))
+        self._apply_figure_snapshot({"open": info.get("numbers"), "current": info.get("current")})
+        return {
+            "success": True,
+            "figures": figures,
+            "current": float(current[0]) if current else None
+        }
+
+    def export_figures(
+        self,
+        figure_handles: Optional[list] = None,
+        format: str = "png",
+        dpi: Optional[int] = None,
+        filename: Optional[str] = None,
+        current_only: bool = False,
+        use_cache: bool = True,
+        max_points: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Export several figures with a single engine call.
+
+        The loop over figures runs inside MATLAB (mcp_export_figures), so exporting N
+        figures costs one round trip instead of one execute per figure. Figures whose
+        content fingerprint matches a cached export with the same format and DPI are not
+        re-rendered; the cached file is copied to the requested path instead.
+
+        Args:
+            figure_handles: Figure numbers to export (None for all open figures)
+            format: Export format ('png', 'svg', 'pdf', 'eps', 'jpg', 'tiff')
+            dpi: Resolution in DPI (uses default if None)
+            filename: Output filename; '{n}' is replaced by the figure number
+                (default: figure_{n}_<timestamp>.<format>)
+            current_only: Export only the current figure (figure_handles is ignored)
+            use_cache: Whether to consult and update the figure export cache
+            max_points: Decimate line and scatter objects with more points for the export
+                (min/max per bucket; data is restored afterwards). Uses
+                MATLAB_EXPORT_MAX_POINTS if None, 0 disables
+
+        Returns:
+            Dict with one export record (figure, path, bytes, error, cached, and
+            points/points_kept when data was reduced) per figure
+        """
+        if not self.is_running():
+            return {"success": False, "error": "MATLAB Engine not running"}
+
+        dpi = dpi or self.figure_dpi
+        if max_points is None:
+            max_points = self.export_max_points
+
+        if not filename:
+            from datetime import datetime
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"figure_{{n}}_{timestamp}.{format}"
+
+        # Absolute path - MATLAB's working directory differs from ours
+        if not os.path.isabs(filename):
+            filename = os.path.join(self.workspace_dir, filename)
+        filename = os.path.abspath(filename)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+        if current_only:
+            numbers = "current"
+        else:
+            numbers = matlab.double([float(h) for h in figure_handles] if figure_handles else [])
+
+        use_cache = use_cache and self.figure_cache_enabled
+        export_opts = {"fingerprint": use_cache, "max_points": float(max_points)}
+        if use_cache:
+            export_opts["known_fingerprints"] = self.figure_cache.known_fingerprints(
+                format, dpi, max_points
+            )
+
+        try:
+            info = self.engine.mcp_export_figures(
+                numbers, filename, format, float(dpi), export_opts, nargout=1
+            )
+
+            paths = to_list(info.get("path"))
+            sizes = to_list(info.get("bytes"))
+            errors = to_list(info.get("error"))
+            fingerprints = to_list(info.get("fingerprint"))
+            cached_flags = to_list(info.get("cached"))
+            points = to_list(info.get("points"))
+            kept = to_list(info.get("kept"))
+
+            exports = []
+            stale = []
+            for i, number in enumerate(to_list(info.get("number"))):
+                export = {
+                    "figure": float(number),
+                    "path": paths[i],
+                    "bytes": int(sizes[i]),
+                    "error": errors[i],
+                    "cached": bool(cached_flags[i])
+                }
+                if kept and kept[i] < points[i]:
+                    export["points"] = int(points[i])
+                    export["points_kept"] = int(kept[i])
+                if use_cache and fingerprints[i]:
+                    key = FigureExportCache.make_key(fingerprints[i], format, dpi, max_points)
+                    if export["cached"]:
+                        cached_bytes = self.figure_cache.fetch(key, export["path"])
+                        if cached_bytes is None:
+                            stale.append(export)
+                            continue
+                        export["bytes"] = cached_bytes
+                    elif not export["error"]:
+                        self.figure_cache.store(key, export["path"])
+                if not export["error"]:
+                    self._touch_figure(export["figure"])
+                    self._figure_tiers.setdefault(export["figure"], {})["full"] = {
+                        "path": export["path"],
+                        "format": format,
+                        "dpi": dpi,
+                        "max_points": max_points,
+                        "bytes": export["bytes"],
+                        "points": export.get("points"),
+                        "points_kept": export.get("points_kept"),
+                        "execution": self._execution_count
+                    }
+                exports.append(export)
+
+            # Cache entries whose files disappeared are rendered after all
+            if stale:
+                retry = self.export_figures(
+                    figure_handles=[e["figure"] for e in stale],
+                    format=format,
+                    dpi=dpi,
+                    filename=filename,
+                    use_cache=False,
+                    max_points=max_points
+                )
+                if not retry["success"]:
+                    return retry
+                exports.extend(retry["exports"])
+
+            return {
+                "success": True,
+                "exports": exports,
+                "exported": sum(1 for e in exports if not e["error"]),
+                "failed": sum(1 for e in exports if e["error"]),
+                "cache_hits": sum(1 for e in exports if e["cached"]),
+                "format": format
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to export figures: {str(e)}"
+            }
+
+    def render_figure_preview(self, figure_handle: Optional[int] = None) -> Dict[str, Any]:
+        """Return the low-resolution preview tier of a figure.
+
+        Previews of new figures are rendered inside the execute call that created them.
+        If no execution has happened since, the stored preview is returned without touching
+        the engine; otherwise the figure is fingerprinted and only re-rendered if it changed.
+
+        Args:
+            figure_handle: Figure number (None for current figure)
+
+        Returns:
+            Dict in the render_figure_image format, plus "tier": "preview"
+        """
+        number = float(figure_handle) if figure_handle is not None else self._current_figure
+        preview = self._figure_tiers.get(number, {}).get("preview") if number is not None else None
+
+        if preview and preview["execution"] == self._execution_count:
+            return dict(preview["image"], cached=True, tier="preview")
+
+        result = self.render_figure_image(
+            figure_handle=figure_handle,
+            dpi=self.thumbnail_dpi,
+            max_bytes=self.thumbnail_max_bytes
+        )
+        if result["success"] and number is not None:
+            self._figure_tiers.setdefault(number, {})["preview"] = {
+                "image": {k: v for k, v in result.items() if k != "cached"},
+                "execution": self._execution_count
+            }
+        return dict(result, tier="preview")
+
+    def render_figure_image(
+        self,
+        figure_handle: Optional[int] = None,
+        dpi: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Render a figure to PNG bytes in memory, without writing a file.
+
+        The figure is rasterized with print('-RGBImage') and transferred as a single uint8
+        buffer. The resolution is chosen so the encoded PNG fits the byte budget; if the
+        first render still overshoots, it is re-rendered once at a proportionally lower
+        resolution.
+
+        Args:
+            figure_handle: Figure number (None for current figure)
+            dpi: Maximum resolution in DPI (uses MATLAB_INLINE_IMAGE_DPI if None)
+            max_bytes: Byte budget for the PNG (uses MATLAB_INLINE_IMAGE_MAX_BYTES if None)
+
+        Returns:
+            Dict with PNG data, mime type, pixel dimensions and effective DPI
+        """
+        if not self.is_running():
+            return {"success": False, "error": "MATLAB Engine not running"}
+
+        dpi = dpi or self.inline_image_dpi
+        max_bytes = max_bytes or self.inline_image_max_bytes
+        number = matlab.double([]) if figure_handle is None else float(figure_handle)
+
+        render_opts = {"fingerprint": self.figure_cache_enabled}
+        if self.figure_cache_enabled:
+            render_opts["known_fingerprints"] = [
+                fp for (fp, key_dpi, key_bytes) in self._inline_image_cache
+                if key_dpi == dpi and key_bytes == max_bytes
+            ]
+
+        try:
+            # Rendered plots typically compress well below 1 byte/pixel; allow 1 pixel per byte
+            max_pixels = float(max_bytes)
+            cache_key = None
+            for _ in range(2):
+                img = self.engine.mcp_render_rgb(
+                    number, float(dpi), max_pixels, render_opts, nargout=1
+                )
+
+                if img["fingerprint"]:
+                    cache_key = (img["fingerprint"], dpi, max_bytes)
+                if img["cached"]:
+                    self._inline_image_cache.move_to_end(cache_key)
+                    return dict(self._inline_image_cache[cache_key], cached=True)
+
+                # A re-render at lower resolution needs no second fingerprint
+                render_opts = {"fingerprint": False}
+
+                width = int(img["width"])
+                height = int(img["height"])
+                png = _encode_png(matlab_bytes(img["data"]), width, height)
+                if len(png) <= max_bytes:
+                    break
+                max_pixels = width * height * (max_bytes / len(png)) * 0.9
+            else:
+                return {
+                    "success": False,
+                    "error": (f"Rendered image ({len(png)} bytes) exceeds the "
+                              f"{max_bytes} byte budget")
+                }
+
+            result = {
+                "success": True,
+                "data": png,
+                "mime_type": "image/png",
+                "width": width,
+                "height": height,
+                "dpi": int(img["dpi"]),
+                "bytes": len(png),
+                "cached": False
+            }
+
+            if cache_key:
+                self._inline_image_cache[cache_key] = result
+                while len(self._inline_image_cache) > self._inline_image_cache_size:
+                    self._inline_image_cache.popitem(last=False)
 
             return result
+
         except Exception as e:
             return {
                 "success": False,
-                "error": f"Failed to clear workspace: {str(e)}"
+                "error": f"Failed to render figure: {str(e)}"
             }
 
-    def export_figure(
+    def get_figure_data(
         self,
         figure_handle: Optional[int] = None,
-        filename: Optional[str] = None,
-        format: str = "png",
-        dpi: Optional[int] = None
+        max_points: Optional[int] = None
     ) -> Dict[str, Any]:
-        """Export MATLAB figure to file.
+        """Extract the numeric data plotted in a figure.
+
+        Axes labels and limits and the data of line, scatter, bar, surface and image
+        objects are collected by mcp_figure_data in a single engine call. Each array
+        arrives as one double buffer and is reshaped here.
 
         Args:
-            figure_handle: Figure handle number (None for current figure)
-            filename: Output filename (auto-generated if None)
-            format: Export format ('png', 'svg', 'pdf', 'eps')
-            dpi: Resolution in DPI (uses default if None)
+            figure_handle: Figure number (None for current figure)
+            max_points: Downsample each object to at most this many points
+                (uses MATLAB_FIGURE_DATA_MAX_POINTS if None, 0 = keep all)
 
         Returns:
-            Dict with export status and file path
+            Dict with figure number, name and a list of axes, each with labels, limits
+            and objects (type, display_name, points, kept, x, y, z, c)
         """
         if not self.is_running():
             return {"success": False, "error": "MATLAB Engine not running"}
 
-        dpi = dpi or self.figure_dpi
-
-        # Generate filename if not provided
-        if not filename:
-            import time
-            timestamp = int(time.time())
-            filename = f"figure_{timestamp}.{format}"
-
-        # Ensure full path
-        if not os.path.isabs(filename):
-            filename = os.path.join(self.workspace_dir, filename)
+        if max_points is None:
+            max_points = self.figure_data_max_points
+        number = matlab.double([]) if figure_handle is None else float(figure_handle)
 
         try:
-            # Determine figure handle
-            fig_ref = "gcf" if figure_handle is None else f"figure({figure_handle})"
-
-            # Use exportgraphics (modern MATLAB) or fallback to print
-            export_code = f"""
-            try
-                % Try using exportgraphics (R2020a+)
-                if strcmp('{format}', 'png') || strcmp('{format}', 'jpg') || strcmp('{format}', 'tiff')
-                    exportgraphics({fig_ref}, '{filename}', 'Resolution', {dpi});
-                else
-                    % For vector formats
-                    exportgraphics({fig_ref}, '{filename}', 'ContentType', 'vector');
-                end
-            catch
-                % Fallback to print command for older MATLAB versions
-                print({fig_ref}, '-d{format}', '-r{dpi}', '{filename}');
-            end
-            """
-
-            result = self.execute(export_code)
+            data = self.engine.mcp_figure_data(number, float(max_points), nargout=1)
+            self._touch_figure(float(data["number"]))
+
+            axes = []
+            for ax in data["axes"] or []:
+                objects = []
+                for obj in ax["objects"] or []:
+                    entry = {
+                        "type": obj["type"],
+                        "display_name": obj["display_name"],
+                        "points": int(obj["points"]),
+                        "kept": int(obj["kept"])
+                    }
+                    for key in ("x", "y", "z", "c"):
+                        values = matlab_floats(obj[key])
+                        if values:
+                            shape = [int(n) for n in to_list(obj[f"{key}_size"])]
+                            entry[key] = _reshape(values, shape)
+                    objects.append(entry)
+
+                axes.append({
+                    "title": ax["title"],
+                    "xlabel": ax["xlabel"],
+                    "ylabel": ax["ylabel"],
+                    "zlabel": ax["zlabel"],
+                    "xlim": matlab_floats(ax["xlim"]),
+                    "ylim": matlab_floats(ax["ylim"]),
+                    "zlim": matlab_floats(ax["zlim"]),
+                    "objects": objects
+                })
 
-            if result["success"] and os.path.exists(filename):
-                return {
-                    "success": True,
-                    "message": f"Figure exported to {filename}",
-                    "path": filename,
-                    "format": format
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": "Export command executed but file not found",
-                    "details": result
-                }
+            return {
+                "success": True,
+                "figure": int(data["number"]),
+                "name": data["name"],
+                "axes": axes
+            }
 
         except Exception as e:
             return {
                 "success": False,
-                "error": f"Failed to export figure: {str(e)}"
+                "error": f"Failed to get figure data: {str(e)}"
             }
 
     def get_symbolic_latex(self, expression: str) -> Dict[str, Any]:
@@ -504,6 +2265,10 @@ class MATLABEngineWrapper:
         Returns:
             Dict with variable metadata
         """
+        # Metadata recorded from the last execution's workspace delta is still current
+        if var_name in self._variable_info_cache:
+            return dict(self._variable_info_cache[var_name])
+
         try:
             # Get class/type
             var_class = self.engine.eval(f"class({var_name})", nargout=1)
@@ -511,110 +2276,360 @@ class MATLABEngineWrapper:
             # Get size
             size_result = self.engine.eval(f"size({var_name})", nargout=1)
 
-            return {
+            var_info = {
                 "class": var_class,
                 "size": list(size_result[0]) if hasattr(size_result, '__iter__') else [size_result]
             }
+            self._variable_info_cache[var_name] = var_info
+            return dict(var_info)
         except Exception as e:
             logger.warning(f"Failed to get variable info for '{var_name}': {e}", exc_info=True)
             return {}
 
-    def _get_figure_handles(self) -> list:
-        """Get list of current figure handles.
+    def _whos_records(self, info: Dict[str, Any]) -> list:
+        """Convert the column struct returned by mcp_whos into per-variable records.
+
+        Args:
+            info: Struct (dict) with name/size/bytes/class/complex/sparse/global columns
 
         Returns:
-            List of figure handles as floats (empty list if none or error)
+            List of dicts, one per variable
         """
-        try:
-            # Get figure handles and convert to numeric array IN MATLAB
-            # This avoids matlab.object conversion issues in Python
-            # The Number property of graphics handles gives the figure number
-            self.engine.eval("""
-                temp_figs = get(groot, 'Children');
-                if isempty(temp_figs)
-                    temp_fig_numbers = [];
-                else
-                    % Get Number property from each figure (works for all MATLAB versions)
-                    temp_fig_numbers = arrayfun(@(f) f.Number, temp_figs);
-                end
-            """, nargout=0)
-
-            # Now retrieve the numeric array
-            fig_numbers = self.engine.workspace["temp_fig_numbers"]
-
-            if fig_numbers is None:
-                return []
-
-            # Convert to Python list
-            if hasattr(fig_numbers, '_data'):
-                # matlab.double with _data attribute
-                import numpy as np
-                handles = [float(x) for x in np.array(fig_numbers._data).flatten()]
-            elif hasattr(fig_numbers, '__iter__'):
-                # Iterable (list or array)
-                handles = [float(x) for x in fig_numbers]
-            elif fig_numbers == 0 or (hasattr(fig_numbers, '__len__') and len(fig_numbers) == 0):
-                # Empty
-                return []
-            else:
-                # Single number
-                handles = [float(fig_numbers)]
+        names = to_list(info.get("name"))
+        columns = {
+            key: to_list(info.get(key))
+            for key in ("size", "bytes", "class", "complex", "sparse", "global")
+        }
+
+        records = []
+        for i, name in enumerate(names):
+            records.append({
+                "name": name,
+                "size": [int(d) for d in columns["size"][i].split("x")],
+                "bytes": int(columns["bytes"][i]),
+                "class": columns["class"][i],
+                "complex": bool(columns["complex"][i]),
+                "sparse": bool(columns["sparse"][i]),
+                "global": bool(columns["global"][i])
+            })
+        return records
+
+    def _apply_figure_snapshot(self, figures: Dict[str, Any]) -> None:
+        """Update per-figure bookkeeping from the figure snapshot reported by mcp_execute.
+
+        Drops tiers of figures that were closed, remembers the open and current figures
+        and the screen geometry, and stores the preview thumbnails rendered for new figures.
 
-            logger.debug(f"Retrieved {len(handles)} figure handle(s): {handles}")
-            return handles
+        Args:
+            figures: Struct (dict) with open/new/current figure numbers and optional thumbnails
+        """
+        if not figures:
+            return
+
+        self._open_figures = [float(n) for n in to_list(figures.get("open"))]
+        if figures.get("screen"):
+            self._update_screen_geometry(figures["screen"])
+
+        open_figures = set(self._open_figures)
+        for number in list(self._figure_tiers):
+            if number not in open_figures:
+                del self._figure_tiers[number]
+        self._figure_last_used = {
+            n: self._figure_last_used.get(n, 0) for n in self._open_figures
+        }
+        for number in to_list(figures.get("new")):
+            self._figure_last_used[float(number)] = self._execution_count
+
+        current = to_list(figures.get("current"))
+        self._current_figure = float(current[0]) if current else None
+        self._touch_figure(self._current_figure)
+
+        thumbnails = figures.get("thumbnails")
+        if not thumbnails:
+            return
+
+        widths = to_list(thumbnails.get("width"))
+        heights = to_list(thumbnails.get("height"))
+        dpis = to_list(thumbnails.get("dpi"))
+        fingerprints = to_list(thumbnails.get("fingerprint"))
+        data = thumbnails.get("data") or []
+
+        for i, number in enumerate(to_list(thumbnails.get("number"))):
+            width, height = int(widths[i]), int(heights[i])
+            png = _encode_png(matlab_bytes(data[i]), width, height)
+            image = {
+                "success": True,
+                "data": png,
+                "mime_type": "image/png",
+                "width": width,
+                "height": height,
+                "dpi": int(dpis[i]),
+                "bytes": len(png)
+            }
+            self._figure_tiers.setdefault(float(number), {})["preview"] = {
+                "image": image,
+                "execution": self._execution_count
+            }
 
-        except Exception as e:
-            logger.exception(f"Failed to get figure handles: {e}")
-            return []
+            # Also serve later fingerprint-checked preview requests from memory
+            key = (fingerprints[i], self.thumbnail_dpi, self.thumbnail_max_bytes)
+            self._inline_image_cache[key] = dict(image, cached=False)
+            while len(self._inline_image_cache) > self._inline_image_cache_size:
+                self._inline_image_cache.popitem(last=False)
 
-    def _detect_new_figures(self, previous_handles: list) -> list:
-        """Detect newly created figures by comparing handle lists.
+    def _apply_closed_figures(self, closed: Optional[Dict[str, Any]]) -> Dict[str, list]:
+        """Forget figures closed by the retention policy or close_figures.
 
         Args:
-            previous_handles: List of figure handles before code execution
+            closed: Struct (dict) from mcp_close_figures, or None if nothing was closed
 
         Returns:
-            List of new figure handles
+            Dict with figures_closed and closed_figure_exports (empty if nothing was closed)
         """
-        try:
-            current_handles = self._get_figure_handles()
+        if not closed:
+            return {}
+
+        numbers = [float(n) for n in to_list(closed.get("closed"))]
+        for number in numbers:
+            self._figure_tiers.pop(number, None)
+            self._figure_last_used.pop(number, None)
+            if self._open_figures is not None and number in self._open_figures:
+                self._open_figures.remove(number)
+        if not numbers:
+            return {}
+        logger.info(f"Closed {len(numbers)} figure(s): {numbers}")
+
+        result = {"figures_closed": numbers}
+        exports = closed.get("exports")
+        if exports:
+            paths = to_list(exports.get("path"))
+            errors = to_list(exports.get("error"))
+            result["closed_figure_exports"] = [
+                path for path, error in zip(paths, errors) if not error
+            ]
+        return result
 
-            logger.debug(f"Figure detection - Previous: {previous_handles}, Current: {current_handles}")
+    def _figure_lru(self) -> list:
+        """Open figure numbers ordered least recently used first."""
+        return sorted(self._figure_last_used, key=self._figure_last_used.get)
 
-            # Convert to sets for comparison (now that handles are floats, they're hashable)
-            prev_set = set(previous_handles) if previous_handles else set()
-            curr_set = set(current_handles)
+    def _touch_figure(self, number: Optional[float]) -> None:
+        """Mark a figure as used now for the retention policy."""
+        if number is not None and number in self._figure_last_used:
+            self._figure_last_used[number] = self._execution_count
 
-            # Find new handles
-            new_handles = list(curr_set - prev_set)
+    def _close_export_opts(self) -> Dict[str, Any]:
+        """Export options for mcp_close_figures: PNG files under closed_figures/."""
+        from datetime import datetime
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        directory = os.path.abspath(os.path.join(self.workspace_dir, "closed_figures"))
+        os.makedirs(directory, exist_ok=True)
+        return {
+            "export_pattern": os.path.join(directory, f"figure_{{n}}_{timestamp}.png"),
+            "format": "png",
+            "dpi": float(self.figure_dpi)
+        }
+
+    def _execution_instrumentation(
+        self,
+        analysis: Optional[Dict[str, bool]],
+        skipped: list,
+        timings: Optional[Dict[str, Any]],
+        preflight_ms: float,
+        engine_ms: float,
+        started: float
+    ) -> Dict[str, Any]:
+        """Record stage timings of one execute call and estimate what skipping stages saved.
 
-            if new_handles:
-                logger.info(f"Detected {len(new_handles)} new figure(s): {new_handles}")
+        Stages that ran update a moving average of their cost; skipped stages are
+        credited with that average as the estimated saving.
 
-            return new_handles
+        Args:
+            analysis: Result of _analyze_code, or None when static analysis is disabled
+            skipped: Bookkeeping stages ("workspace", "figures") that were skipped
+            timings: Seconds per stage reported by mcp_execute (code, workspace, figures)
+            preflight_ms: Time spent in the preflight check
+            engine_ms: Wall time of the mcp_execute call
+            started: perf_counter value at the start of execute
 
-        except Exception as e:
-            logger.warning(f"Failed to detect new figures: {e}", exc_info=True)
-            return []
+        Returns:
+            Dict with analysis, skipped, timings_ms and estimated_saved_ms
+        """
+        timings = timings or {}
+        timings_ms = {"preflight": round(preflight_ms, 1), "engine": round(engine_ms, 1)}
+        for stage in ("code", "workspace", "figures"):
+            if stage in timings:
+                timings_ms[stage] = round(float(timings[stage]) * 1000, 1)
+
+        for stage in ("workspace", "figures"):
+            if stage in timings_ms and stage not in skipped:
+                previous = self._stage_cost_ms.get(stage)
+                cost = timings_ms[stage]
+                if previous is not None:
+                    cost = 0.8 * previous + 0.2 * cost
+                self._stage_cost_ms[stage] = cost
+
+        saved = sum(self._stage_cost_ms.get(stage, 0.0) for stage in skipped)
+        if skipped:
+            logger.info(
+                f"Static analysis skipped {', '.join(skipped)} bookkeeping (~{saved:.1f} ms)"
+            )
+        timings_ms["total"] = round((time.perf_counter() - started) * 1000, 1)
+
+        return {
+            "analysis": analysis,
+            "skipped": skipped,
+            "timings_ms": timings_ms,
+            "estimated_saved_ms": round(saved, 1)
+        }
+
+    def _apply_workspace_delta(self, delta: Optional[Dict[str, Any]]) -> Optional[Dict[str, list]]:
+        """Decode the workspace delta reported by mcp_execute and refresh cached metadata.
+
+        Created and modified variables have their class and size recorded directly, deleted
+        ones are dropped, so the cache never needs a workspace re-scan.
+
+        Args:
+            delta: Struct (dict) with created/modified/deleted column structs, or None
+                when workspace tracking is disabled
+
+        Returns:
+            Dict of created/modified/deleted record lists, or None if nothing changed
+        """
+        if delta is None:
+            # No tracking information - nothing cached can be trusted
+            self._variable_info_cache.clear()
+            return None
+
+        decoded = {
+            kind: self._whos_records(delta[kind])
+            for kind in ("created", "modified", "deleted")
+        }
+
+        for record in decoded["deleted"]:
+            self._variable_info_cache.pop(record["name"], None)
+            self._variable_touched.pop(record["name"], None)
+        for record in decoded["created"] + decoded["modified"]:
+            self._variable_info_cache[record["name"]] = {
+                "class": record["class"],
+                "size": record["size"]
+            }
+            self._variable_touched[record["name"]] = self._execution_count
+
+        if not any(decoded.values()):
+            return None
+        return decoded
+
+    def _format_whos_table(self, records: list) -> str:
+        """Render workspace records as a whos-style text table."""
+        if not records:
+            return ""
+
+        rows = [("Name", "Size", "Bytes", "Class", "Attributes")]
+        for r in records:
+            attributes = [a for a in ("complex", "sparse", "global") if r[a]]
+            rows.append((
+                r["name"],
+                "x".join(str(d) for d in r["size"]),
+                str(r["bytes"]),
+                r["class"],
+                ", ".join(attributes)
+            ))
+
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        lines = [
+            "  ".join(cell.ljust(widths[i]) for i, cell in enumerate(row)).rstrip()
+            for row in rows
+        ]
+        return "\n".join(lines)
+
+    def _get_figure_handles(self) -> list:
+        """Get list of current figure handles.
+
+        Returns:
+            List of figure handles as floats (empty list if none or error)
+        """
+        result = self.list_figure_numbers()
+        return result["figures"] if result["success"] else []
+
+    def _update_screen_geometry(self, screen: Dict[str, Any]) -> None:
+        """Cache the screen geometry reported by MATLAB.
+
+        A change (monitor plugged in or out, resolution change) simply replaces the cached
+        value, so layouts are always computed against the current display setup.
+
+        Args:
+            screen: Struct (dict) from mcp_screen_geometry with screen_size and monitors
+        """
+        screen_size = [int(v) for v in to_list(screen.get("screen_size"))]
+        rows = [int(v) for v in to_list(screen.get("monitors"))]
+        # MonitorPositions is N-by-4; the engine hands it back row by row
+        monitors = [rows[i:i + 4] for i in range(0, len(rows) - 3, 4)] or [screen_size]
+
+        geometry = {"screen_size": screen_size, "monitors": monitors}
+        if self._screen_geometry is not None and geometry != self._screen_geometry:
+            logger.info(f"Display configuration changed: {monitors}")
+        self._screen_geometry = geometry
+
+    def _get_screen_geometry(self, refresh: bool = False) -> Dict[str, Any]:
+        """Get the cached screen geometry, querying MATLAB only if needed.
+
+        Args:
+            refresh: Query MATLAB even if a cached value exists
+
+        Returns:
+            Dict with screen_size [left, bottom, width, height] and monitors (list of same)
+        """
+        if refresh or self._screen_geometry is None:
+            self._update_screen_geometry(self.engine.mcp_screen_geometry(nargout=1))
+        return self._screen_geometry
 
-    def _position_figures_cascade(self) -> Dict[str, Any]:
+    def _set_figure_positions(self, fig_handles: list, positions: list) -> int:
+        """Apply positions to several figures in a single engine call.
+
+        Args:
+            fig_handles: Figure numbers
+            positions: One [left, bottom, width, height] list per figure
+
+        Returns:
+            Number of figures positioned (figures closed in the meantime are skipped)
+        """
+        count = self.engine.mcp_set_positions(
+            matlab.double([float(h) for h in fig_handles]),
+            matlab.double([[float(v) for v in p] for p in positions]),
+            nargout=1
+        )
+        return int(count)
+
+    def _positioning_targets(self, refresh: bool) -> list:
+        """Figures to lay out: the last execute's snapshot, or a fresh query."""
+        if refresh or self._open_figures is None:
+            self._open_figures = self._get_figure_handles()
+        return self._open_figures
+
+    def _position_figures_cascade(self, refresh: bool = False) -> Dict[str, Any]:
         """Position all open figures in a cascade pattern on the primary screen.
 
+        Args:
+            refresh: Re-query open figures and screen geometry instead of using the
+                values recorded by the last execute
+
         Returns:
             Dict with success status and number of figures positioned
         """
         if not self.is_running():
             return {"success": False, "error": "Engine not running"}
 
+        if self.offscreen_figures:
+            return {"success": True, "figures_positioned": 0, "skipped": "offscreen mode"}
+
         try:
-            # Get screen dimensions
-            screen_size = self.engine.eval("get(0, 'ScreenSize')", nargout=1)
             # screen_size = [left, bottom, width, height]
-            screen_width = int(screen_size[2])
-            screen_height = int(screen_size[3])
+            screen_size = self._get_screen_geometry(refresh)["screen_size"]
+            screen_width = screen_size[2]
+            screen_height = screen_size[3]
 
-            # Get all figure handles
-            fig_handles = self._get_figure_handles()
+            fig_handles = self._positioning_targets(refresh)
 
             if not fig_handles:
                 return {"success": True, "figures_positioned": 0}
@@ -630,8 +2645,8 @@ class MATLABEngineWrapper:
             start_x = 50
             start_y = screen_height - fig_height - 100  # From top of screen
 
-            positioned_count = 0
-            for i, fig_handle in enumerate(fig_handles):
+            positions = []
+            for i in range(len(fig_handles)):
                 # Calculate cascade position
                 x = start_x + (i * cascade_offset)
                 y = start_y - (i * cascade_offset)
@@ -641,11 +2656,10 @@ class MATLABEngineWrapper:
                     x = start_x
                     y = start_y
 
-                # Set figure position
                 # Note: MATLAB Position is [left, bottom, width, height]
-                position_cmd = f"set({fig_handle}, 'Position', [{x}, {y}, {fig_width}, {fig_height}]);"
-                self.engine.eval(position_cmd, nargout=0)
-                positioned_count += 1
+                positions.append([x, y, fig_width, fig_height])
+
+            positioned_count = self._set_figure_positions(fig_handles, positions)
 
             return {
                 "success": True,
@@ -659,37 +2673,27 @@ class MATLABEngineWrapper:
                 "error": f"Failed to position figures: {str(e)}"
             }
 
-    def _get_monitor_info(self) -> Dict[str, Any]:
+    def _get_monitor_info(self, refresh: bool = False) -> Dict[str, Any]:
         """Get information about all monitors.
 
+        Args:
+            refresh: Re-query MATLAB instead of using the cached screen geometry
+
         Returns:
             Dict with monitor information
         """
         try:
-            # Get monitor positions
-            monitor_pos = self.engine.eval("get(0, 'MonitorPositions')", nargout=1)
-
-            # Convert to list of monitor info
-            if len(monitor_pos.shape) == 1:
-                # Single monitor
-                monitors = [{
-                    "left": int(monitor_pos[0]),
-                    "bottom": int(monitor_pos[1]),
-                    "width": int(monitor_pos[2]),
-                    "height": int(monitor_pos[3]),
-                    "is_primary": True
-                }]
-            else:
-                # Multiple monitors
-                monitors = []
-                for i in range(monitor_pos.shape[0]):
-                    monitors.append({
-                        "left": int(monitor_pos[i][0]),
-                        "bottom": int(monitor_pos[i][1]),
-                        "width": int(monitor_pos[i][2]),
-                        "height": int(monitor_pos[i][3]),
-                        "is_primary": (i == 0)  # First monitor is primary
-                    })
+            monitors = [
+                {
+                    "left": left,
+                    "bottom": bottom,
+                    "width": width,
+                    "height": height,
+                    "is_primary": (i == 0)  # First monitor is primary
+                }
+                for i, (left, bottom, width, height)
+                in enumerate(self._get_screen_geometry(refresh)["monitors"])
+            ]
 
             return {
                 "success": True,
@@ -703,18 +2707,25 @@ class MATLABEngineWrapper:
                 "error": f"Failed to get monitor info: {str(e)}"
             }
 
-    def _position_figures_tile(self, monitor_index: int = 0) -> Dict[str, Any]:
+    def _position_figures_tile(
+        self, monitor_index: int = 0, refresh: bool = False
+    ) -> Dict[str, Any]:
         """Position figures in a tile pattern on specified monitor.
 
         Args:
             monitor_index: Which monitor to use (0 = primary)
+            refresh: Re-query open figures and screen geometry instead of using the
+                values recorded by the last execute
 
         Returns:
             Dict with positioning results
         """
+        if self.offscreen_figures:
+            return {"success": True, "figures_positioned": 0, "skipped": "offscreen mode"}
+
         try:
             # Get monitor info
-            monitor_info = self._get_monitor_info()
+            monitor_info = self._get_monitor_info(refresh)
             if not monitor_info["success"]:
                 return monitor_info
 
@@ -725,7 +2736,7 @@ class MATLABEngineWrapper:
             monitor = monitors[monitor_index]
 
             # Get figures
-            fig_handles = self._get_figure_handles()
+            fig_handles = self._positioning_targets(refresh)
             if not fig_handles:
                 return {"success": True, "figures_positioned": 0}
 
@@ -744,19 +2755,20 @@ class MATLABEngineWrapper:
             fig_height = usable_height // rows
 
             # Position figures in grid
-            for i, fig_handle in enumerate(fig_handles):
+            positions = []
+            for i in range(num_figs):
                 row = i // cols
                 col = i % cols
 
                 x = monitor["left"] + margin + col * (fig_width + margin)
                 y = monitor["bottom"] + monitor["height"] - (row + 1) * (fig_height + margin) - 100
+                positions.append([x, y, fig_width, fig_height])
 
-                position_cmd = f"set({fig_handle}, 'Position', [{x}, {y}, {fig_width}, {fig_height}]);"
-                self.engine.eval(position_cmd, nargout=0)
+            positioned_count = self._set_figure_positions(fig_handles, positions)
 
             return {
                 "success": True,
-                "figures_positioned": num_figs,
+                "figures_positioned": positioned_count,
                 "strategy": "tile",
                 "monitor": monitor_index
             }
@@ -767,73 +2779,81 @@ class MATLABEngineWrapper:
                 "error": f"Failed to tile figures: {str(e)}"
             }
 
-    def _check_matlab_warnings(self) -> Dict[str, Any]:
-        """Check for MATLAB warnings using lastwarn.
+    def _check_matlab_warnings(
+        self,
+        stderr: str,
+        last_warning: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Collect the warnings raised during an execution.
+
+        mcp_execute runs the code with warning verbose and backtrace on, so each warning is
+        printed as "Warning: <message>", its identifier and its "In ..." stack lines. All
+        warnings of the run are parsed from the captured stderr; lastwarn (reported by the
+        same call) covers runs without output capture and fills in a missing identifier.
+
+        Args:
+            stderr: Captured stderr of the execution
+            last_warning: Struct (dict) with message and identifier from lastwarn
 
         Returns:
             Dict containing:
-                - warnings: list of warning dicts with message and ID
+                - warnings: list of warning dicts with message, ID, stack and severity
                 - has_critical: bool - whether any critical warnings found
                 - issues: list of issue dicts for validation system
         """
-        try:
-            # Get last warning message and ID
-            self.engine.eval("[warnMsg, warnId] = lastwarn;", nargout=0)
-
-            # Access workspace variables directly (they should exist after eval)
-            try:
-                warn_msg = self.engine.workspace["warnMsg"]
-                warn_id = self.engine.workspace["warnId"]
-            except (KeyError, TypeError):
-                # Variables not found or workspace access issue
-                warn_msg = ""
-                warn_id = ""
-
-            logger.debug(f"Warning check - Message: '{warn_msg}', ID: '{warn_id}'")
-
-            warnings = []
-            issues = []
-            has_critical = False
-
-            if warn_msg and warn_msg.strip():
-                # Categorize warning severity
-                severity, is_critical = self._classify_warning_severity(warn_msg, warn_id)
-
-                warning_entry = {
-                    "message": warn_msg,
-                    "id": warn_id,
-                    "severity": severity
-                }
-                warnings.append(warning_entry)
-
-                if is_critical:
-                    has_critical = True
-
-                # Create issue entry
-                issues.append({
-                    "type": "matlab_warning",
-                    "severity": severity,
-                    "message": warn_msg,
-                    "warning_id": warn_id
-                })
-
-            return {
-                "warnings": warnings,
-                "has_critical": has_critical,
-                "issues": issues
-            }
-
-        except Exception as e:
-            logger.warning(f"Failed to check MATLAB warnings: {e}", exc_info=True)
-            return {
-                "warnings": [],
-                "has_critical": False,
-                "issues": [{
-                    "type": "warning_check_failed",
-                    "severity": "info",
-                    "message": f"Could not check warnings: {str(e)}"
-                }]
-            }
+        parsed = []
+        current = None
+        for line in _HTML_TAG_RE.sub("", stderr or "").splitlines():
+            if line.startswith("Warning: "):
+                current = {"message": line[len("Warning: "):], "id": "", "stack": []}
+                parsed.append(current)
+            elif current is None:
+                continue
+            elif _WARNING_FRAME_RE.match(line):
+                current["stack"].append(_WARNING_FRAME_RE.match(line).group(1).strip())
+            elif (line.strip() and not current["stack"]
+                  and not _WARNING_ID_RE.search(current["message"])):
+                # Multi-line message; with verbose on it ends at the "(Type ...)" suffix
+                current["message"] += "\n" + line
+            else:
+                current = None
+
+        for warning in parsed:
+            match = _WARNING_ID_RE.search(warning["message"])
+            if match:
+                warning["id"] = match.group(1)
+                warning["message"] = _WARNING_ID_RE.sub("", warning["message"])
+            warning["message"] = warning["message"].strip()
+
+        last_message = (last_warning or {}).get("message", "").strip()
+        last_id = (last_warning or {}).get("identifier", "")
+        if last_message:
+            if not parsed:
+                parsed.append({"message": last_message, "id": last_id, "stack": []})
+            elif not parsed[-1]["id"] and parsed[-1]["message"] == last_message:
+                parsed[-1]["id"] = last_id
+
+        warnings = []
+        issues = []
+        has_critical = False
+        for warning in parsed:
+            severity, is_critical = self._classify_warning_severity(
+                warning["message"], warning["id"]
+            )
+            has_critical = has_critical or is_critical
+            warnings.append(dict(warning, severity=severity))
+            issues.append({
+                "type": "matlab_warning",
+                "severity": severity,
+                "message": warning["message"],
+                "warning_id": warning["id"]
+            })
+
+        return {
+            "warnings": warnings,
+            "has_critical": has_critical,
+            "issues": issues
+        }
 
     def _classify_warning_severity(self, warn_msg: str, warn_id: str) -> tuple:
         """Classify warning severity based on message and ID.
@@ -850,41 +2870,12 @@ class MATLABEngineWrapper:
         warn_msg_lower = warn_msg.lower()
 
         # Critical warnings that indicate results are likely invalid
-        critical_keywords = [
-            "singular",
-            "rank deficient",
-            "badly scaled",
-            "ill-conditioned",
-            "not positive definite"
-        ]
-
-        critical_ids = [
-            "MATLAB:singularMatrix",
-            "MATLAB:nearlySingularMatrix",
-            "MATLAB:illConditionedMatrix",
-            "MATLAB:rankDeficientMatrix"
-        ]
-
-        # Check for critical conditions
-        for keyword in critical_keywords:
-            if keyword in warn_msg_lower:
-                return ("critical", True)
-
-        if warn_id in critical_ids:
+        if warn_id in _CRITICAL_WARNING_IDS or _CRITICAL_WARNING_RE.search(warn_msg_lower):
             return ("critical", True)
 
         # Non-critical but important warnings
-        warning_keywords = [
-            "divide by zero",
-            "imaginary parts",
-            "negative",
-            "overflow",
-            "underflow"
-        ]
-
-        for keyword in warning_keywords:
-            if keyword in warn_msg_lower:
-                return ("warning", False)
+        if _WARNING_RE.search(warn_msg_lower):
+            return ("warning", False)
 
         # Default to info level
         return ("info", False)
@@ -893,7 +2884,7 @@ class MATLABEngineWrapper:
         """Check if a figure contains actual plot content or is blank.
 
         Args:
-            fig_handle: MATLAB figure handle
+            fig_handle: MATLAB figure handle (figure number)
 
         Returns:
             Dict containing:
@@ -905,83 +2896,11 @@ class MATLABEngineWrapper:
                 - issues: list of issues found
         """
         try:
-            # Check if figure has any axes
-            self.engine.eval(
-                f"axesHandles = findobj({fig_handle}, 'type', 'axes');",
-                nargout=0
-            )
-            axes_handles = self.engine.workspace["axesHandles"] if "axesHandles" in self.engine.workspace else []
-
-            # Convert to list
-            if not hasattr(axes_handles, '__iter__'):
-                axes_handles = [axes_handles] if axes_handles else []
-
-            has_axes = len(axes_handles) > 0
-
-            if not has_axes:
-                return {
-                    "is_valid": False,
-                    "has_axes": False,
-                    "axes_count": 0,
-                    "plot_object_count": 0,
-                    "details": {},
-                    "issues": ["Figure has no axes"]
-                }
-
-            # Check each axes for plot objects
-            total_plot_objects = 0
-            axes_details = []
-            axes_issues = []
-
-            for i, ax_handle in enumerate(axes_handles):
-                # Count children in this axes
-                children_count = self.engine.eval(
-                    f"numel(get({ax_handle}, 'Children'))",
-                    nargout=1
-                )
-
-                # Get types of plot objects
-                self.engine.eval(
-                    f"""
-                    ch = get({ax_handle}, 'Children');
-                    if isempty(ch)
-                        types = {{}};
-                    else
-                        types = get(ch, 'Type');
-                        if ~iscell(types)
-                            types = {{types}};
-                        end
-                    end
-                    """,
-                    nargout=0
-                )
-                plot_types_list = self.engine.workspace["types"] if "types" in self.engine.workspace else []
-
-                axes_info = {
-                    "axes_index": i,
-                    "children_count": int(children_count),
-                    "plot_types": list(plot_types_list) if plot_types_list else []
-                }
-                axes_details.append(axes_info)
-
-                total_plot_objects += int(children_count)
-
-                # Check if axes is empty
-                if int(children_count) == 0:
-                    axes_issues.append(f"Axes {i+1} is empty (no plot objects)")
-
-            # Determine if figure is valid
-            # A figure is valid if it has at least one axes with at least one plot object
-            is_valid = total_plot_objects > 0
-
-            return {
-                "is_valid": is_valid,
-                "has_axes": True,
-                "axes_count": len(axes_handles),
-                "plot_object_count": total_plot_objects,
-                "details": axes_details,
-                "issues": axes_issues if not is_valid else []
-            }
+            summary = self.engine.mcp_figure_summary(float(fig_handle), nargout=1)
+            validations = self._decode_figure_summary(summary)
+            if not validations:
+                raise ValueError(f"Figure {fig_handle} not found")
+            return validations[0]
 
         except Exception as e:
             return {
@@ -993,9 +2912,84 @@ class MATLABEngineWrapper:
                 "issues": [f"Could not validate figure: {str(e)}"]
             }
 
-    def _check_workspace_health(self) -> Dict[str, Any]:
+    def _decode_error_stack(self, stack: Optional[Dict[str, Any]]) -> list:
+        """Convert the column struct of error stack frames from mcp_execute into dicts.
+
+        Args:
+            stack: Struct (dict) with file, name and line columns, or None
+
+        Returns:
+            List of frames (file, name, line), innermost first
+        """
+        if not stack:
+            return []
+        files = to_list(stack.get("file"))
+        names = to_list(stack.get("name"))
+        lines = to_list(stack.get("line"))
+        return [
+            {"file": file, "name": name, "line": int(line)}
+            for file, name, line in zip(files, names, lines)
+        ]
+
+    def _decode_figure_summary(self, summary: Optional[Dict[str, Any]]) -> list:
+        """Convert the column struct from mcp_figure_summary into per-figure validation dicts.
+
+        Args:
+            summary: Struct (dict) returned by mcp_figure_summary, or None
+
+        Returns:
+            List of validation dicts in the _validate_figure_content format
+        """
+        if not summary:
+            return []
+
+        numbers = to_list(summary.get("number"))
+        axes_counts = to_list(summary.get("axes_count"))
+        plot_counts = to_list(summary.get("plot_object_count"))
+        blank_flags = to_list(summary.get("is_blank"))
+        child_counts = summary.get("axes_child_counts") or []
+        axes_types = summary.get("axes_types") or []
+
+        validations = []
+        for i, number in enumerate(numbers):
+            counts = [int(c) for c in to_list(child_counts[i])]
+            types = [t.split(",") if t else [] for t in to_list(axes_types[i])]
+
+            details = [
+                {"axes_index": a, "children_count": count, "plot_types": types[a]}
+                for a, count in enumerate(counts)
+            ]
+
+            issues = []
+            if not counts:
+                issues.append("Figure has no axes")
+            elif blank_flags[i]:
+                issues = [
+                    f"Axes {a + 1} is empty (no plot objects)"
+                    for a, count in enumerate(counts) if count == 0
+                ]
+
+            validations.append({
+                "figure": float(number),
+                "is_valid": not bool(blank_flags[i]),
+                "has_axes": int(axes_counts[i]) > 0,
+                "axes_count": int(axes_counts[i]),
+                "plot_object_count": int(plot_counts[i]),
+                "details": details,
+                "issues": issues
+            })
+        return validations
+
+    def _check_workspace_health(self, health: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Check workspace for common problematic values (NaN, Inf, empty arrays).
 
+        All variables are scanned by mcp_workspace_health in one evaluation; large arrays are
+        sampled (MATLAB_HEALTH_MAX_ELEMENTS). During execute the same report is produced for
+        the variables the run created or modified and passed in directly.
+
+        Args:
+            health: Struct (dict) from mcp_workspace_health, or None to scan all variables now
+
         Returns:
             Dict containing:
                 - has_issues: bool
@@ -1004,71 +2998,56 @@ class MATLABEngineWrapper:
                 - variables_checked: int
         """
         try:
-            # Get list of variables in workspace
-            var_names_result = self.engine.eval("who()", nargout=1)
-            var_names = list(var_names_result) if var_names_result else []
+            if health is None:
+                health = self.engine.mcp_workspace_health(
+                    "all", float(self.health_max_elements), nargout=1
+                )
+
+            names = to_list(health.get("name"))
+            nan_counts = to_list(health.get("nan_count"))
+            inf_counts = to_list(health.get("inf_count"))
+            empty_flags = to_list(health.get("is_empty"))
+            sampled_flags = to_list(health.get("sampled"))
 
             issues = []
-            has_critical = False
+            for i, var_name in enumerate(names):
+                note = " (sampled)" if sampled_flags[i] else ""
+
+                if nan_counts[i]:
+                    issues.append({
+                        "type": "nan_detected",
+                        "severity": "warning",
+                        "message": (f"Variable '{var_name}' contains "
+                                    f"{int(nan_counts[i])} NaN value(s){note}"),
+                        "variable": var_name
+                    })
 
-            # Check a subset of variables (don't check everything to avoid performance issues)
-            # Focus on recently created/modified variables
-            for var_name in var_names[:10]:  # Limit to first 10 variables
-                try:
-                    # Check if variable contains NaN
-                    has_nan = self.engine.eval(
-                        f"any(isnan({var_name})(:))",
-                        nargout=1
-                    )
-
-                    # Check if variable contains Inf
-                    has_inf = self.engine.eval(
-                        f"any(isinf({var_name})(:))",
-                        nargout=1
-                    )
-
-                    # Check if variable is empty
-                    is_empty = self.engine.eval(
-                        f"isempty({var_name})",
-                        nargout=1
-                    )
-
-                    if has_nan:
-                        issues.append({
-                            "type": "nan_detected",
-                            "severity": "warning",
-                            "message": f"Variable '{var_name}' contains NaN values",
-                            "variable": var_name
-                        })
-
-                    if has_inf:
-                        issues.append({
-                            "type": "inf_detected",
-                            "severity": "warning",
-                            "message": f"Variable '{var_name}' contains Inf values",
-                            "variable": var_name
-                        })
-
-                    if is_empty:
-                        issues.append({
-                            "type": "empty_variable",
-                            "severity": "info",
-                            "message": f"Variable '{var_name}' is empty",
-                            "variable": var_name
-                        })
-
-                except Exception:
-                    # Skip variables that can't be checked (might be non-numeric types)
-                    continue
+                if inf_counts[i]:
+                    issues.append({
+                        "type": "inf_detected",
+                        "severity": "warning",
+                        "message": (f"Variable '{var_name}' contains "
+                                    f"{int(inf_counts[i])} Inf value(s){note}"),
+                        "variable": var_name
+                    })
+
+                if empty_flags[i]:
+                    issues.append({
+                        "type": "empty_variable",
+                        "severity": "info",
+                        "message": f"Variable '{var_name}' is empty",
+                        "variable": var_name
+                    })
 
             return {
                 "has_issues": len(issues) > 0,
-                "has_critical": has_critical,
+                "has_critical": False,
                 "issues": issues,
-                "variables_checked": len(var_names)
+                "variables_checked": len(names)
             }
 
-        except Exception:
+        except Exception as e:
+            logger.warning(f"Workspace health check failed: {e}")
             return {
                 "has_issues": False,
                 "has_critical": False,
@@ -1082,63 +3061,47 @@ class MATLABEngineWrapper:
         figures_created: int = 0,
         validation: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
-        """Automatically save a script to the scripts directory with metadata.
+        """Save a script to the content-addressed store and log it in the session log.
+
+        Identical code is stored once; the session log records every save with its
+        metadata. Files are written by the store's background writer.
 
         Args:
             code: MATLAB code to save
             figures_created: Number of figures created by this script
-            validation: Validation results to include in header
+            validation: Validation results to record in the session log
 
         Returns:
-            Dict with save status and file path
+            Dict with save status, file path and code hash
         """
-        from datetime import datetime
-
         try:
-            # Create scripts subdirectory
-            scripts_dir = os.path.join(self.workspace_dir, "scripts")
-            os.makedirs(scripts_dir, exist_ok=True)
-
-            # Generate filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"script_{timestamp}.m"
-            filepath = os.path.join(scripts_dir, filename)
-
-            # Build comprehensive header
-            header_lines = [
-                "% Auto-saved MATLAB script",
-                f"% Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                f"% Figures created: {figures_created}",
-                f"% Project: {self.current_project or 'None'}",
-            ]
-
-            # Add validation info if available
+            root = os.path.join(self.workspace_dir, "scripts")
+            store = self._script_stores.get(root)
+            if store is None:
+                store = self._script_stores[root] = ScriptStore(root)
+
+            metadata = {
+                "execution": self._execution_count,
+                "figures_created": figures_created,
+                "project": self.current_project
+            }
             if validation:
                 if validation.get("warnings"):
-                    header_lines.append("%")
-                    header_lines.append("% MATLAB Warnings:")
-                    for warn in validation["warnings"]:
-                        header_lines.append(f"%   - {warn['message']}")
-
+                    metadata["warnings"] = [warn["message"] for warn in validation["warnings"]]
                 if validation.get("issues"):
-                    header_lines.append("%")
-                    header_lines.append("% Issues detected:")
-                    for issue in validation["issues"]:
-                        severity = issue.get("severity", "info").upper()
-                        header_lines.append(f"%   [{severity}] {issue['message']}")
-
-            header_lines.append("%")
-            header_lines.append("")
-            header = "\n".join(header_lines) + "\n"
-
-            with open(filepath, 'w') as f:
-                f.write(header)
-                f.write(code)
+                    metadata["issues"] = [
+                        f"[{issue.get('severity', 'info').upper()}] {issue['message']}"
+                        for issue in validation["issues"]
+                    ]
 
+            saved = store.save(code, metadata)
             return {
                 "success": True,
-                "path": filepath,
-                "message": f"Script auto-saved to {filepath}"
+                "path": saved["path"],
+                "hash": saved["hash"],
+                "duplicate": saved["duplicate"],
+                "session_log": store.session_log,
+                "message": f"Script auto-saved to {saved['path']}"
             }
 
         except Exception as e:
@@ -1157,14 +3120,8 @@ class MATLABEngineWrapper:
             Dict with status and project directory path
         """
         try:
-            # Get user's Documents folder
-            if os.name == 'nt':  # Windows
-                documents = os.path.join(os.environ.get('USERPROFILE', ''), 'Documents')
-            else:  # macOS/Linux
-                documents = os.path.join(os.path.expanduser('~'), 'Documents')
-
             # Create MATLAB_Projects folder if it doesn't exist
-            matlab_projects_dir = os.path.join(documents, 'MATLAB_Projects')
+            matlab_projects_dir = self._projects_dir()
             os.makedirs(matlab_projects_dir, exist_ok=True)
 
             # Create project-specific directory
@@ -1209,38 +3166,45 @@ class MATLABEngineWrapper:
                 "workspace_dir": self.workspace_dir
             }
 
+    def _projects_dir(self) -> str:
+        """Path of Documents/MATLAB_Projects for the current user."""
+        if os.name == 'nt':  # Windows
+            documents = os.path.join(os.environ.get('USERPROFILE', ''), 'Documents')
+        else:  # macOS/Linux
+            documents = os.path.join(os.path.expanduser('~'), 'Documents')
+        return os.path.join(documents, 'MATLAB_Projects')
+
     def list_projects(self) -> Dict[str, Any]:
         """List all available projects in Documents/MATLAB_Projects.
 
+        Answered from the project index, which only rescans directories that changed.
+
         Returns:
-            Dict with list of projects
+            Dict with list of projects and a summary per project (bytes, file_count,
+            counts by kind, last_activity)
         """
         try:
-            # Get user's Documents folder
-            if os.name == 'nt':  # Windows
-                documents = os.path.join(os.environ.get('USERPROFILE', ''), 'Documents')
-            else:  # macOS/Linux
-                documents = os.path.join(os.path.expanduser('~'), 'Documents')
-
-            matlab_projects_dir = os.path.join(documents, 'MATLAB_Projects')
+            matlab_projects_dir = self._projects_dir()
+            projects = self.project_index.projects()
 
             # Check if projects directory exists
-            if not os.path.exists(matlab_projects_dir):
+            if not projects and not os.path.isdir(matlab_projects_dir):
                 return {
                     "success": True,
                     "projects": [],
                     "message": "No projects found. Create one with set_project."
                 }
 
-            # List all subdirectories
-            projects = [
-                d for d in os.listdir(matlab_projects_dir)
-                if os.path.isdir(os.path.join(matlab_projects_dir, d))
-            ]
+            summaries = {}
+            for project in projects:
+                tree = self.project_index.tree(os.path.join(matlab_projects_dir, project))
+                if tree is not None:
+                    summaries[project] = tree["summary"]
 
             return {
                 "success": True,
                 "projects": projects,
+                "summaries": summaries,
                 "projects_dir": matlab_projects_dir,
                 "current_project": self.current_project
             }
@@ -1249,3 +3213,97 @@ class MATLABEngineWrapper:
                 "success": False,
                 "error": f"Failed to list projects: {str(e)}"
             }
+
+    def list_project_files(
+        self,
+        project: Optional[str] = None,
+        kind: Optional[str] = None,
+        pattern: Optional[str] = None,
+        sort_by: str = "recent",
+        limit: int = 50,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """List the files of a project from the project index.
+
+        Args:
+            project: Project name (default: the current project, or the workspace
+                directory if no project is set)
+            kind: Only files of this kind (script, figure, data, other)
+            pattern: Wildcard pattern on the file name, e.g. '*.mat'
+            sort_by: 'recent' (default), 'name' or 'size' (largest first)
+            limit: Maximum number of files to return
+            offset: Number of matching files to skip (for paging)
+
+        Returns:
+            Dict with directory, summary, files (path, name, kind, bytes, modified)
+            and matched_count
+        """
+        try:
+            if project:
+                directory = os.path.join(self._projects_dir(), project)
+            else:
+                directory = self.workspace_dir
+            tree = self.project_index.tree(directory)
+            if tree is None:
+                return {"success": False, "error": f"Directory not found: {directory}"}
+
+            records = tree["by_kind"].get(kind, []) if kind else tree["files"]
+            records = filter_files(records, pattern=pattern)
+            if sort_by == "name":
+                records = sorted(records, key=lambda record: record["path"].lower())
+            elif sort_by == "size":
+                records = sorted(records, key=lambda record: record["bytes"], reverse=True)
+
+            return {
+                "success": True,
+                "directory": os.path.abspath(directory),
+                "summary": tree["summary"],
+                "matched_count": len(records),
+                "files": records[offset:offset + limit]
+            }
+        except Exception as e:
+            return {"success": False, "error": f"Failed to list project files: {str(e)}"}
+
+    def search_project_files(
+        self,
+        query: str,
+        project: Optional[str] = None,
+        kind: Optional[str] = None,
+        limit: int = 50
+    ) -> Dict[str, Any]:
+        """Search file paths across projects using the project index.
+
+        Args:
+            query: Case-insensitive substring of the file path, or a wildcard
+                pattern on the file name if it contains * or ?
+            project: Only search this project (default: all projects)
+            kind: Only files of this kind (script, figure, data, other)
+            limit: Maximum number of files to return
+
+        Returns:
+            Dict with matches (project plus file record, newest first) and matched_count
+        """
+        try:
+            projects = [project] if project else self.project_index.projects()
+            is_pattern = "*" in query or "?" in query
+            matches = []
+            for name in projects:
+                tree = self.project_index.tree(os.path.join(self._projects_dir(), name))
+                if tree is None:
+                    continue
+                records = tree["by_kind"].get(kind, []) if kind else tree["files"]
+                found = filter_files(
+                    records,
+                    pattern=query if is_pattern else None,
+                    query=None if is_pattern else query
+                )
+                matches.extend(dict(record, project=name) for record in found)
+
+            matches.sort(key=lambda record: record["modified"], reverse=True)
+            return {
+                "success": True,
+                "matched_count": len(matches),
+                "matches": matches[:limit]
+            }
+        except Exception as e:
+            return {"success": False, "error": f"Failed to search project files: {str(e)}"}
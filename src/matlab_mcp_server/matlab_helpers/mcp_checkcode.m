@@ -0,0 +1,45 @@
+function info = mcp_checkcode(code)
+%MCP_CHECKCODE Run the Code Analyzer on a piece of code.
+%   INFO = MCP_CHECKCODE(CODE) writes CODE to a temporary script, runs
+%   CHECKCODE on it and returns a scalar struct of columns, one entry per
+%   message: line, column (start column), id, message and is_error.
+%
+%   is_error marks messages CODEISSUES (R2022b+) reports with severity
+%   "error", i.e. code that cannot run. It does not depend on the language
+%   of the message text; on older releases it is all false and the caller
+%   classifies by id.
+
+    file = [tempname '.m'];
+    fid = fopen(file, 'w');
+    fwrite(fid, char(code));
+    fclose(fid);
+    cleanup = onCleanup(@() delete(file));
+
+    messages = checkcode(file, '-id', '-struct');
+    messages = messages(:)';
+
+    info = struct();
+    info.line = double([messages.line]);
+    info.column = zeros(1, numel(messages));
+    for k = 1:numel(messages)
+        info.column(k) = double(messages(k).column(1));
+    end
+    info.id = {messages.id};
+    info.message = {messages.message};
+    info.is_error = false(1, numel(messages));
+
+    if ~isempty(messages) && exist('codeIssues', 'file')
+        try
+            issues = codeIssues(file).Issues;
+            errors = issues.Severity == "error";
+            error_ids = string(issues.CheckID(errors));
+            error_lines = double(issues.LineStart(errors, 1));
+            for k = 1:numel(messages)
+                info.is_error(k) = any(error_ids == string(messages(k).id) ...
+                    & error_lines == info.line(k));
+            end
+        catch
+            % Keep the id-based classification of the caller
+        end
+    end
+end
@@ -0,0 +1,76 @@
+function res = mcp_close_figures(numbers, opts)
+%MCP_CLOSE_FIGURES Close figures, optionally exporting them first.
+%   RES = MCP_CLOSE_FIGURES(NUMBERS, OPTS) closes the figures with the given
+%   numbers, all figures if NUMBERS is 'all', or applies the retention
+%   policy if NUMBERS is 'lru': least recently used figures are closed until
+%   at most OPTS.keep remain. Figures that do not exist are ignored.
+%
+%   OPTS fields (all optional):
+%     keep           - 'lru' mode: number of figures to keep open
+%     lru            - figure numbers ordered least recently used first;
+%                      open figures missing from it count as oldest
+%     protect        - figure numbers 'lru' mode never closes
+%     export_pattern - if set, export each figure with MCP_EXPORT_FIGURES
+%                      first ('{n}' is replaced by the figure number);
+%                      figures whose export fails are left open
+%     format, dpi    - export format (default 'png') and resolution
+%
+%   RES has fields closed (numbers of the closed figures), open (numbers
+%   still open afterwards) and, when exporting, exports (MCP_EXPORT_FIGURES
+%   columns).
+
+    if nargin < 2 || ~isstruct(opts)
+        opts = struct();
+    end
+
+    listing = mcp_figure_numbers();
+    open_numbers = listing.numbers;
+    if ischar(numbers) && strcmp(numbers, 'all')
+        victims = open_numbers;
+    elseif ischar(numbers) && strcmp(numbers, 'lru')
+        victims = lru_victims(open_numbers, opts);
+    else
+        victims = intersect(open_numbers, double(numbers));
+    end
+
+    res = struct();
+    if ~isempty(victims) && isfield(opts, 'export_pattern') && ~isempty(opts.export_pattern)
+        fmt = 'png';
+        if isfield(opts, 'format') && ~isempty(opts.format)
+            fmt = char(opts.format);
+        end
+        dpi = 150;
+        if isfield(opts, 'dpi') && ~isempty(opts.dpi)
+            dpi = double(opts.dpi);
+        end
+        res.exports = mcp_export_figures(victims, opts.export_pattern, fmt, dpi, struct());
+        victims = res.exports.number(cellfun(@isempty, res.exports.error));
+    end
+
+    for n = reshape(victims, 1, [])
+        close(findobj(groot, '-depth', 1, 'Type', 'figure', 'Number', n));
+    end
+    res.closed = reshape(victims, 1, []);
+    res.open = setdiff(open_numbers, victims);
+end
+
+function victims = lru_victims(open_numbers, opts)
+    keep = 0;
+    if isfield(opts, 'keep') && ~isempty(opts.keep)
+        keep = double(opts.keep);
+    end
+    lru = zeros(1, 0);
+    if isfield(opts, 'lru')
+        lru = reshape(double(opts.lru), 1, []);
+    end
+    protect = zeros(1, 0);
+    if isfield(opts, 'protect')
+        protect = reshape(double(opts.protect), 1, []);
+    end
+
+    % Oldest first: figures unknown to the caller, then the caller's order
+    order = [setdiff(open_numbers, lru), lru(ismember(lru, open_numbers))];
+    candidates = order(~ismember(order, protect));
+    excess = numel(open_numbers) - keep;
+    victims = candidates(1:min(max(excess, 0), numel(candidates)));
+end
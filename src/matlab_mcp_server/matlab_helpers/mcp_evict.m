@@ -0,0 +1,26 @@
+function res = mcp_evict(names, checkpoint_file)
+%MCP_EVICT Clear base workspace variables, optionally saving them first.
+%   RES = MCP_EVICT(NAMES, CHECKPOINT_FILE) clears the variables listed in
+%   the cell array NAMES from the base workspace. When CHECKPOINT_FILE is
+%   non-empty the variables are saved to that MAT-file (v7.3, so arrays
+%   over 2 GB are supported) before being cleared.
+
+    names = cellstr(names);
+    res = struct('ok', true, 'error_message', '', 'checkpoint_file', '');
+
+    try
+        if nargin > 1 && ~isempty(checkpoint_file)
+            saved = struct();
+            for k = 1:numel(names)
+                saved.(names{k}) = evalin('base', names{k});
+            end
+            save(checkpoint_file, '-struct', 'saved', '-v7.3');
+            clear saved
+            res.checkpoint_file = checkpoint_file;
+        end
+        evalin('base', ['clear ' strjoin(names, ' ')]);
+    catch err
+        res.ok = false;
+        res.error_message = err.message;
+    end
+end
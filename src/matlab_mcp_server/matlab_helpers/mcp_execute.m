@@ -0,0 +1,253 @@
+function res = mcp_execute(code, opts)
+%MCP_EXECUTE Run user code in the base workspace with fused bookkeeping.
+%   RES = MCP_EXECUTE(CODE, OPTS) evaluates CODE in the base workspace and
+%   returns everything the server needs to know about the run in a single
+%   struct, so no extra engine round trips are needed afterwards. Errors
+%   raised by CODE are caught and reported in RES instead of being thrown.
+%
+%   OPTS fields (all optional):
+%     track_workspace   - compare whos snapshots taken before and after the
+%                         run and report the delta (default true)
+%     compare_max_bytes - variables up to this size are also compared by
+%                         value, which catches edits that keep class, size
+%                         and bytes unchanged (default 65536)
+%     compare_names     - only these variables (the ones the code can assign)
+%                         are compared by value; 'all' compares every
+%                         variable, up to compare_max_vars (default 'all')
+%     compare_max_vars  - cap on variables compared by value (default 256);
+%                         compare_names variables that were not compared are
+%                         listed in delta.unverified
+%     track_figures     - record open figure numbers before and after the
+%                         run and report which ones are new (default true)
+%     known_figures     - with track_figures false: the figures the caller
+%                         believes are open. If the figure count changed
+%                         anyway, figures are tracked against this list
+%                         (figures_fallback is set)
+%     known_current     - with known_figures: the expected current figure;
+%                         a different current figure also triggers tracking
+%     validate_figures  - include an MCP_FIGURE_SUMMARY of the new figures
+%                         (default false)
+%     thumbnail_dpi     - if > 0, render a low-resolution preview of each new
+%                         figure with MCP_RENDER_RGB (default 0)
+%     thumbnail_max_pixels - pixel cap for the previews (default 40000)
+%     report_screen     - include MCP_SCREEN_GEOMETRY so the server notices
+%                         display changes without asking (default false)
+%     max_open_figures  - if > 0, close least recently used figures with
+%                         MCP_CLOSE_FIGURES until at most this many are open;
+%                         new figures and the current figure are kept
+%                         (default 0)
+%     figure_lru        - figure numbers ordered least recently used first
+%     close_export      - struct with export_pattern, format and dpi to
+%                         export figures before they are closed
+%     health_check      - 'all' or 'modified' (created or modified by the
+%                         run, needs track_workspace) adds an
+%                         MCP_WORKSPACE_HEALTH report as health; 'off' skips
+%                         it (default 'off')
+%     health_max_elements - sample size for large arrays (default 100000)
+%     capture_warnings  - print warnings with their identifier (verbose)
+%                         and stack (backtrace) so every warning of the run
+%                         can be parsed from the captured output, and report
+%                         LASTWARN as last_warning (default true)
+%
+%   RES.timings holds the seconds spent on the code, on workspace
+%   bookkeeping and on figure bookkeeping.
+
+    if nargin < 2 || ~isstruct(opts)
+        opts = struct();
+    end
+    track_workspace = get_opt(opts, 'track_workspace', true);
+    track_figures = get_opt(opts, 'track_figures', true);
+    timings = struct('code', 0, 'workspace', 0, 'figures', 0);
+
+    t = tic;
+    if track_workspace
+        [before, values, captured, wanted] = snapshot(get_opt(opts, 'compare_max_bytes', 65536), ...
+            get_opt(opts, 'compare_names', 'all'), get_opt(opts, 'compare_max_vars', 256));
+    end
+    timings.workspace = toc(t);
+    t = tic;
+    if track_figures
+        listing = mcp_figure_numbers();
+        figures_before = listing.numbers;
+    end
+    timings.figures = toc(t);
+
+    capture_warnings = get_opt(opts, 'capture_warnings', true);
+    if capture_warnings
+        warning_state = [warning('query', 'verbose'), warning('query', 'backtrace')];
+        warning('on', 'verbose');
+        warning('on', 'backtrace');
+        lastwarn('');
+    end
+
+    res = struct('ok', true, 'error_message', '', 'error_identifier', '', 'error_report', '');
+    t = tic;
+    try
+        evalin('base', code);
+    catch err
+        res.ok = false;
+        res.error_message = err.message;
+        res.error_identifier = err.identifier;
+        res.error_report = getReport(err, 'basic', 'hyperlinks', 'off');
+        res.error_stack = error_stack(err);
+    end
+    timings.code = toc(t);
+
+    if capture_warnings
+        warning(warning_state);
+        [message, identifier] = lastwarn;
+        res.last_warning = struct('message', message, 'identifier', identifier);
+    end
+
+    t = tic;
+    if track_workspace
+        res.delta = workspace_delta(before, values, captured, wanted);
+    end
+    health_check = char(get_opt(opts, 'health_check', 'off'));
+    if ~strcmp(health_check, 'off')
+        max_elements = get_opt(opts, 'health_max_elements', 100000);
+        if strcmp(health_check, 'modified') && track_workspace
+            names = [res.delta.created.name, res.delta.modified.name];
+            res.health = mcp_workspace_health(names, max_elements);
+        else
+            res.health = mcp_workspace_health('all', max_elements);
+        end
+    end
+    timings.workspace = timings.workspace + toc(t);
+
+    t = tic;
+    if ~track_figures && isfield(opts, 'known_figures')
+        % The caller expected no graphics; a changed figure count or current figure proves otherwise
+        known = reshape(double(opts.known_figures), 1, []);
+        listing = mcp_figure_numbers();
+        current = reshape(listing.current, 1, []);
+        expected = reshape(double(get_opt(opts, 'known_current', current)), 1, []);
+        if numel(listing.numbers) ~= numel(known) || ~isequal(current, expected)
+            track_figures = true;
+            figures_before = known;
+            res.figures_fallback = true;
+        end
+    end
+    if track_figures
+        listing = mcp_figure_numbers();
+        figures_after = listing.numbers;
+        current = listing.current;
+        res.figures = struct();
+        res.figures.new = setdiff(figures_after, figures_before);
+        max_open = get_opt(opts, 'max_open_figures', 0);
+        if max_open > 0 && numel(figures_after) > max_open
+            close_opts = get_opt(opts, 'close_export', struct());
+            close_opts.keep = max_open;
+            close_opts.lru = get_opt(opts, 'figure_lru', zeros(1, 0));
+            close_opts.protect = [res.figures.new, current];
+            res.figures.closed = mcp_close_figures('lru', close_opts);
+            figures_after = res.figures.closed.open;
+        end
+        res.figures.open = figures_after;
+        if get_opt(opts, 'validate_figures', false) && ~isempty(res.figures.new)
+            res.figures.summary = mcp_figure_summary(res.figures.new);
+        end
+        if get_opt(opts, 'report_screen', false)
+            res.figures.screen = mcp_screen_geometry();
+        end
+        thumbnail_dpi = get_opt(opts, 'thumbnail_dpi', 0);
+        if thumbnail_dpi > 0 && ~isempty(res.figures.new)
+            res.figures.thumbnails = thumbnails(res.figures.new, thumbnail_dpi, ...
+                get_opt(opts, 'thumbnail_max_pixels', 40000));
+        end
+        res.figures.current = current;
+    end
+    timings.figures = timings.figures + toc(t);
+    res.timings = timings;
+end
+
+function info = thumbnails(numbers, dpi, max_pixels)
+    % Column struct of previews; figures that fail to render are skipped.
+    info = struct('number', zeros(1, 0), 'width', zeros(1, 0), ...
+        'height', zeros(1, 0), 'dpi', zeros(1, 0), 'fingerprint', {{}}, 'data', {{}});
+    for n = numbers
+        try
+            img = mcp_render_rgb(n, dpi, max_pixels, struct('fingerprint', true));
+        catch
+            continue
+        end
+        info.number(end + 1) = n;
+        info.width(end + 1) = img.width;
+        info.height(end + 1) = img.height;
+        info.dpi(end + 1) = img.dpi;
+        info.fingerprint{end + 1} = img.fingerprint;
+        info.data{end + 1} = img.data;
+    end
+end
+
+function value = get_opt(opts, name, default)
+    if isfield(opts, name) && ~isempty(opts.(name))
+        value = opts.(name);
+    else
+        value = default;
+    end
+end
+
+function stack = error_stack(err)
+    % Frames of functions called by the user code (the code itself runs in
+    % evalin and has no frame); frames of this helper are dropped.
+    frames = err.stack(:)';
+    frames = frames(~strcmp({frames.name}, 'mcp_execute'));
+    stack = struct('file', {{frames.file}}, 'name', {{frames.name}}, ...
+        'line', double([frames.line]));
+end
+
+function [s, values, captured, wanted] = snapshot(max_bytes, names, max_vars)
+    % Values are held as copy-on-write references, so keeping them costs
+    % nothing unless the user code modifies the variable in place. Only
+    % variables the code can assign need a value comparison.
+    s = evalin('base', 'whos');
+    values = cell(size(s));
+    captured = false(size(s));
+    wanted = true(size(s));
+    if ~(ischar(names) && strcmp(names, 'all'))
+        if isempty(names)
+            names = {};
+        end
+        wanted = reshape(ismember({s.name}, cellstr(names)), size(s));
+    end
+    candidates = find(wanted & reshape([s.bytes] <= max_bytes, size(s)));
+    for k = reshape(candidates(1:min(end, max_vars)), 1, [])
+        values{k} = evalin('base', s(k).name);
+        captured(k) = true;
+    end
+end
+
+function delta = workspace_delta(before, values, captured, wanted)
+    after = evalin('base', 'whos');
+    names_before = {before.name};
+    names_after = {after.name};
+
+    [common, loc] = ismember(names_after, names_before);
+    modified = false(size(after));
+    for k = reshape(find(common), 1, [])
+        b = before(loc(k));
+        a = after(k);
+        if ~strcmp(a.class, b.class) || ~isequal(a.size, b.size) || a.bytes ~= b.bytes ...
+                || a.complex ~= b.complex || a.sparse ~= b.sparse || a.global ~= b.global
+            modified(k) = true;
+        elseif captured(loc(k))
+            try
+                modified(k) = ~isequaln(values{loc(k)}, evalin('base', a.name));
+            catch
+                modified(k) = true;
+            end
+        end
+    end
+
+    delta = struct();
+    delta.created = mcp_whos_columns(after(~common));
+    delta.modified = mcp_whos_columns(after(modified));
+    delta.deleted = mcp_whos_columns(before(~ismember(names_before, names_after)));
+    % Variables the code may have edited in place without the edit being
+    % seen (too large or too many to compare by value)
+    unverified = common & ~reshape(modified, 1, []);
+    unverified(common) = unverified(common) & reshape(wanted(loc(common)) ...
+        & ~captured(loc(common)), 1, []);
+    delta.unverified = names_after(unverified);
+end
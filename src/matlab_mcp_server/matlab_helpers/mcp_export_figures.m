@@ -0,0 +1,101 @@
+function info = mcp_export_figures(numbers, path_pattern, fmt, dpi, opts)
+%MCP_EXPORT_FIGURES Export several figures to files in one evaluation.
+%   INFO = MCP_EXPORT_FIGURES(NUMBERS, PATH_PATTERN, FMT, DPI, OPTS) exports
+%   the figures with the given numbers (all open figures if NUMBERS is
+%   empty, the current figure if NUMBERS is 'current') to files in format FMT.
+%   Every '{n}' in PATH_PATTERN is replaced by the figure number. Raster
+%   formats use DPI; vector formats are exported as vector content.
+%
+%   OPTS fields (all optional):
+%     fingerprint        - compute MCP_FIGURE_FINGERPRINT for each figure
+%                          (default false)
+%     known_fingerprints - cell of fingerprints the caller already holds an
+%                          export for; matching figures are not rendered
+%     max_points         - if > 0, line and scatter objects with more points
+%                          are decimated by MCP_REDUCE_FIGURE for the export
+%                          and restored afterwards (default 0)
+%
+%   INFO is a scalar struct of columns, one entry per figure: number, path,
+%   bytes (file size), error (empty when the export succeeded), fingerprint
+%   (empty unless requested), cached (true if the render was skipped), and
+%   points/kept (line and scatter points before and after reduction).
+
+    if nargin < 5 || ~isstruct(opts)
+        opts = struct();
+    end
+    use_fingerprint = isfield(opts, 'fingerprint') && opts.fingerprint;
+    known = {};
+    if isfield(opts, 'known_fingerprints')
+        known = cellstr(opts.known_fingerprints);
+    end
+    max_points = 0;
+    if isfield(opts, 'max_points') && ~isempty(opts.max_points)
+        max_points = double(opts.max_points);
+    end
+
+    if ischar(numbers) && strcmp(numbers, 'current')
+        figs = mcp_find_figure([]);
+    elseif isempty(numbers)
+        figs = findobj(groot, '-depth', 1, 'Type', 'figure');
+        figs = figs(~arrayfun(@(f) isempty(f.Number), figs));
+        [~, order] = sort(arrayfun(@(f) double(f.Number), figs));
+        figs = figs(order);
+    else
+        figs = gobjects(0);
+        for n = reshape(double(numbers), 1, [])
+            figs = [figs; mcp_find_figure(n)]; %#ok<AGROW>
+        end
+    end
+
+    count = numel(figs);
+    info = struct();
+    info.number = zeros(1, count);
+    info.path = cell(1, count);
+    info.bytes = zeros(1, count);
+    info.error = repmat({''}, 1, count);
+    info.fingerprint = repmat({''}, 1, count);
+    info.cached = false(1, count);
+    info.points = zeros(1, count);
+    info.kept = zeros(1, count);
+
+    for k = 1:count
+        fig = figs(k);
+        if isempty(fig.Number)
+            info.number(k) = NaN;
+        else
+            info.number(k) = double(fig.Number);
+        end
+        info.path{k} = strrep(char(path_pattern), '{n}', sprintf('%d', info.number(k)));
+        try
+            if use_fingerprint
+                info.fingerprint{k} = mcp_figure_fingerprint(fig);
+                if any(strcmp(info.fingerprint{k}, known))
+                    info.cached(k) = true;
+                    continue
+                end
+            end
+            [undo, stats] = mcp_reduce_figure(fig, max_points);
+            info.points(k) = stats.points;
+            info.kept(k) = stats.kept;
+            try
+                mcp_export_file(fig, info.path{k}, char(fmt), double(dpi));
+            catch err
+                restore(undo);
+                rethrow(err);
+            end
+            restore(undo);
+            listing = dir(info.path{k});
+            info.bytes(k) = listing.bytes;
+        catch err
+            info.error{k} = err.message;
+        end
+    end
+end
+
+function restore(undo)
+    for k = 1:numel(undo)
+        if isvalid(undo(k).handle)
+            set(undo(k).handle, undo(k).values{:});
+        end
+    end
+end
@@ -0,0 +1,25 @@
+function mcp_export_file(fig, path, fmt, dpi)
+%MCP_EXPORT_FILE Export one figure to a file.
+%   MCP_EXPORT_FILE(FIG, PATH, FMT, DPI) uses EXPORTGRAPHICS (raster formats
+%   at DPI, other formats as vector content) and falls back to PRINT for
+%   older MATLAB versions and formats EXPORTGRAPHICS does not support.
+
+    try
+        % exportgraphics (R2020a+)
+        if any(strcmp(fmt, {'png', 'jpg', 'tiff'}))
+            exportgraphics(fig, path, 'Resolution', dpi);
+        else
+            exportgraphics(fig, path, 'ContentType', 'vector');
+        end
+    catch
+        % Fallback to print for older MATLAB versions and formats
+        % exportgraphics does not support (e.g. svg)
+        devices = struct('jpg', 'jpeg', 'eps', 'epsc');
+        if isfield(devices, fmt)
+            device = devices.(fmt);
+        else
+            device = fmt;
+        end
+        print(fig, ['-d' device], sprintf('-r%d', round(dpi)), path);
+    end
+end
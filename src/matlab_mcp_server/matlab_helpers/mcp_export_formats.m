@@ -0,0 +1,95 @@
+function info = mcp_export_formats(number, paths, formats, dpis, opts)
+%MCP_EXPORT_FORMATS Export one figure to several formats in one evaluation.
+%   INFO = MCP_EXPORT_FORMATS(NUMBER, PATHS, FORMATS, DPIS, OPTS) writes
+%   figure NUMBER (the current figure if NUMBER is empty) to PATHS{k} in
+%   format FORMATS{k} at resolution DPIS(k). All outputs are rendered with
+%   MCP_EXPORT_FILE, the path EXPORT_FIGURE uses, so cropping and padding
+%   match. Raster outputs (png, jpg, tiff) that share a resolution are
+%   rendered once, as PNG, and the other raster files are encoded from it.
+%
+%   OPTS fields (all optional):
+%     max_points - decimate line and scatter data once for all outputs with
+%                  MCP_REDUCE_FIGURE and restore it afterwards (default 0)
+%
+%   INFO is a scalar struct with the figure number, points and kept (as in
+%   MCP_EXPORT_FIGURES) and one column entry per output: path, format, dpi,
+%   bytes and error (empty when the output was written).
+
+    if nargin < 5 || ~isstruct(opts)
+        opts = struct();
+    end
+    max_points = 0;
+    if isfield(opts, 'max_points') && ~isempty(opts.max_points)
+        max_points = double(opts.max_points);
+    end
+
+    fig = mcp_find_figure(number);
+    paths = reshape(cellstr(paths), 1, []);
+    formats = reshape(cellstr(formats), 1, []);
+    dpis = reshape(double(dpis), 1, []);
+    count = numel(paths);
+
+    info = struct();
+    info.number = double(fig.Number);
+    info.path = paths;
+    info.format = formats;
+    info.dpi = dpis;
+    info.bytes = zeros(1, count);
+    info.error = repmat({''}, 1, count);
+
+    [undo, stats] = mcp_reduce_figure(fig, max_points);
+    info.points = stats.points;
+    info.kept = stats.kept;
+    cleanup = onCleanup(@() restore(undo));
+
+    raster = ismember(formats, {'png', 'jpg', 'tiff'});
+    for dpi = unique(dpis(raster))
+        targets = find(raster & dpis == dpi);
+        % Render losslessly once; a requested PNG serves as the master
+        master = targets(find(strcmp(formats(targets), 'png'), 1));
+        if isempty(master)
+            master_path = [tempname '.png'];
+        else
+            master_path = paths{master};
+        end
+        try
+            mcp_export_file(fig, master_path, 'png', dpi);
+            frame = imread(master_path);
+            for k = setdiff(targets, master)
+                try
+                    imwrite(frame, paths{k}, formats{k});
+                catch err
+                    info.error{k} = err.message;
+                end
+            end
+        catch err
+            info.error(targets) = {err.message};
+        end
+        if isempty(master) && exist(master_path, 'file')
+            delete(master_path);
+        end
+    end
+
+    for k = find(~raster)
+        try
+            mcp_export_file(fig, paths{k}, formats{k}, dpis(k));
+        catch err
+            info.error{k} = err.message;
+        end
+    end
+
+    for k = 1:count
+        if isempty(info.error{k})
+            listing = dir(paths{k});
+            info.bytes(k) = listing.bytes;
+        end
+    end
+end
+
+function restore(undo)
+    for k = 1:numel(undo)
+        if isvalid(undo(k).handle)
+            set(undo(k).handle, undo(k).values{:});
+        end
+    end
+end
@@ -0,0 +1,175 @@
+function data = mcp_figure_data(number, max_points)
+%MCP_FIGURE_DATA Numeric data behind the plots of a figure.
+%   DATA = MCP_FIGURE_DATA(NUMBER, MAX_POINTS) walks the axes of figure
+%   NUMBER (the current figure if NUMBER is empty) and returns their labels,
+%   limits and plotted objects in one struct:
+%
+%     data.number, data.name
+%     data.axes - cell array, one struct per axes with title, xlabel,
+%                 ylabel, zlabel, xlim, ylim, zlim and objects
+%
+%   Each object struct has type, display_name, points (number of data
+%   points before downsampling), kept (after downsampling) and the arrays
+%   x, y, z and c with their shapes x_size, y_size, z_size and c_size.
+%   Arrays are flattened in row-major order into double row vectors, so
+%   they cross the engine boundary as single numeric buffers.
+%
+%   Line-like objects (line, scatter, bar, stair, stem, errorbar, area) are
+%   downsampled to at most MAX_POINTS points by uniform index selection
+%   that keeps both end points; surfaces and images are decimated with the
+%   same stride along both dimensions. MAX_POINTS = 0 disables this.
+
+    if nargin < 2 || isempty(max_points)
+        max_points = 0;
+    end
+    max_points = double(max_points);
+
+    fig = mcp_find_figure(number);
+
+    data = struct();
+    data.number = double(fig.Number);
+    data.name = char(fig.Name);
+    data.axes = {};
+
+    axes_list = flipud(findobj(fig, 'Type', 'axes'));
+    for k = 1:numel(axes_list)
+        ax = axes_list(k);
+        info = struct();
+        info.title = text_of(ax.Title);
+        info.xlabel = text_of(ax.XLabel);
+        info.ylabel = text_of(ax.YLabel);
+        info.zlabel = text_of(ax.ZLabel);
+        info.xlim = numeric(ax.XLim);
+        info.ylim = numeric(ax.YLim);
+        info.zlim = numeric(ax.ZLim);
+        info.objects = {};
+
+        children = flipud(ax.Children);
+        for j = 1:numel(children)
+            obj = describe(children(j), max_points);
+            if ~isempty(obj)
+                info.objects{end + 1} = obj;
+            end
+        end
+        data.axes{end + 1} = info;
+    end
+end
+
+function obj = describe(h, max_points)
+    obj = [];
+    type = get(h, 'Type');
+    switch type
+        case {'line', 'scatter', 'bar', 'stair', 'stem', 'errorbar', 'area'}
+            x = numeric(h.XData);
+            y = numeric(h.YData);
+            z = zeros(1, 0);
+            if isprop(h, 'ZData')
+                z = numeric(h.ZData);
+            end
+            c = zeros(1, 0);
+            if strcmp(type, 'scatter')
+                c = numeric(h.CData);
+            end
+            n = max(numel(x), numel(y));
+            idx = 1:n;
+            if max_points > 0 && n > max_points
+                idx = unique(round(linspace(1, n, max_points)));
+            end
+            x = take_points(x, idx, n);
+            y = take_points(y, idx, n);
+            z = take_points(z, idx, n);
+            c = take_points(c, idx, n);
+            kept = numel(idx);
+        case 'surface'
+            z = numeric(h.ZData);
+            n = numel(z);
+            step = stride(n, max_points);
+            z = z(1:step:end, 1:step:end);
+            x = take_grid(numeric(h.XData), step);
+            y = take_grid(numeric(h.YData), step);
+            c = numeric(h.CData);
+            if size(c, 1) > 1 && size(c, 2) > 1
+                c = c(1:step:end, 1:step:end, :);
+            end
+            kept = numel(z);
+        case 'image'
+            c = numeric(h.CData);
+            n = size(c, 1) * size(c, 2);
+            step = stride(n, max_points);
+            c = c(1:step:end, 1:step:end, :);
+            x = numeric(h.XData);
+            y = numeric(h.YData);
+            z = zeros(1, 0);
+            kept = size(c, 1) * size(c, 2);
+        otherwise
+            return
+    end
+
+    obj = struct();
+    obj.type = type;
+    obj.display_name = '';
+    if isprop(h, 'DisplayName')
+        obj.display_name = char(h.DisplayName);
+    end
+    obj.points = n;
+    obj.kept = kept;
+    [obj.x, obj.x_size] = flatten(x);
+    [obj.y, obj.y_size] = flatten(y);
+    [obj.z, obj.z_size] = flatten(z);
+    [obj.c, obj.c_size] = flatten(c);
+end
+
+function v = take_points(v, idx, n)
+    % Per-point arrays are vectors or N-by-3 color rows; anything else is
+    % a scalar property value and is passed through unchanged.
+    if isvector(v) && numel(v) == n
+        v = v(idx);
+    elseif size(v, 1) == n
+        v = v(idx, :);
+    end
+end
+
+function v = take_grid(v, step)
+    % Surface X/Y data is either a full grid or a vector along one dimension.
+    if size(v, 1) > 1 && size(v, 2) > 1
+        v = v(1:step:end, 1:step:end);
+    elseif ~isempty(v)
+        v = v(1:step:end);
+    end
+end
+
+function step = stride(n, max_points)
+    step = 1;
+    if max_points > 0 && n > max_points
+        step = ceil(sqrt(n / max_points));
+    end
+end
+
+function [flat, shape] = flatten(v)
+    shape = size(v);
+    flat = reshape(permute(v, ndims(v):-1:1), 1, []);
+end
+
+function v = numeric(v)
+    % Non-numeric rulers (datetime, duration, categorical) are converted to
+    % plain numbers: seconds since the epoch, seconds, and category codes.
+    if isnumeric(v) || islogical(v)
+        v = double(v);
+    elseif isa(v, 'datetime')
+        v = posixtime(v);
+    elseif isa(v, 'duration')
+        v = seconds(v);
+    elseif isa(v, 'categorical')
+        v = double(v);
+    else
+        v = zeros(1, 0);
+    end
+end
+
+function s = text_of(h)
+    s = h.String;
+    if iscell(s) || isstring(s) || size(s, 1) > 1
+        s = strjoin(cellstr(s), newline);
+    end
+    s = char(s);
+end
@@ -0,0 +1,60 @@
+function fp = mcp_figure_fingerprint(fig)
+%MCP_FIGURE_FINGERPRINT Cheap content fingerprint of a figure.
+%   FP = MCP_FIGURE_FINGERPRINT(FIG) returns a short string that changes
+%   whenever the data or the main appearance properties of any object in
+%   FIG change. Each property value is reduced to a few moments (count,
+%   NaN count, sum, index-weighted sums), so the cost is a few passes over
+%   the plotted data rather than a render.
+
+    props = {'XData', 'YData', 'ZData', 'CData', 'String', 'Position', ...
+        'Color', 'LineWidth', 'LineStyle', 'Marker', 'MarkerSize', ...
+        'FaceColor', 'EdgeColor', 'FaceAlpha', 'XLim', 'YLim', 'ZLim', ...
+        'CLim', 'View', 'Visible', 'Colormap', 'FontSize', 'Text', 'Value'};
+
+    objs = findall(fig);
+    parts = cell(1, numel(objs));
+    for k = 1:numel(objs)
+        obj = objs(k);
+        d = digest(double(class(obj)));
+        for p = 1:numel(props)
+            if isprop(obj, props{p})
+                try
+                    d = [d, digest(get(obj, props{p}))]; %#ok<AGROW>
+                catch
+                    % Some properties are not readable on every object
+                end
+            end
+        end
+        parts{k} = d;
+    end
+
+    fp = sprintf('%.17g_', digest([parts{:}]));
+    fp = fp(1:end-1);
+end
+
+function d = digest(v)
+    if iscell(v)
+        parts = cellfun(@digest, v, 'UniformOutput', false);
+        v = [numel(v), parts{:}];
+    elseif isstring(v)
+        v = double(char(strjoin(v(:)', char(10))));
+    elseif ischar(v) || islogical(v)
+        v = double(v);
+    elseif isdatetime(v)
+        v = posixtime(v);
+    elseif isduration(v)
+        v = seconds(v);
+    elseif iscategorical(v)
+        v = double(v);
+    elseif ~isnumeric(v)
+        % Handles and other objects: only their count is fingerprinted
+        v = numel(v);
+    end
+
+    v = full(double(real(v(:))));
+    n = numel(v);
+    idx = (1:n)';
+    missing = isnan(v);
+    v(missing) = 0;
+    d = [n, nnz(missing), sum(v), sum(v .* idx), sum(v .* sin(idx))];
+end
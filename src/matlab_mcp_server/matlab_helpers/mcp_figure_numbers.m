@@ -0,0 +1,24 @@
+function info = mcp_figure_numbers()
+%MCP_FIGURE_NUMBERS Numbers of the open figures and the current figure.
+%   INFO = MCP_FIGURE_NUMBERS() returns a struct with the sorted numbers
+%   of the open figures and the number of the current figure (empty if
+%   none). Figures without an integer handle have no Number and are not
+%   listed. No variables are created in the base workspace.
+
+    figs = get(groot, 'Children');
+    numbers = zeros(1, 0);
+    for k = 1:numel(figs)
+        if isprop(figs(k), 'Number') && ~isempty(figs(k).Number)
+            numbers(end + 1) = double(figs(k).Number); %#ok<AGROW>
+        end
+    end
+
+    info = struct();
+    info.numbers = sort(numbers);
+    current = get(groot, 'CurrentFigure');
+    if isempty(current) || isempty(current.Number)
+        info.current = [];
+    else
+        info.current = double(current.Number);
+    end
+end
@@ -0,0 +1,58 @@
+function info = mcp_figure_summary(numbers)
+%MCP_FIGURE_SUMMARY Content summary of figures in a single evaluation.
+%   INFO = MCP_FIGURE_SUMMARY(NUMBERS) inspects the figures with the given
+%   figure numbers (all open figures if NUMBERS is empty or omitted) and
+%   returns a scalar struct of columns, one entry per figure:
+%     number            - figure number
+%     axes_count        - number of axes in the figure
+%     plot_object_count - total children across all axes
+%     is_blank          - true if no axes holds any plot object
+%     axes_child_counts - cell of per-axes child counts
+%     axes_types        - cell of per-axes comma-separated child types
+
+    if nargin < 1 || isempty(numbers)
+        figs = findobj(groot, '-depth', 1, 'Type', 'figure');
+    else
+        figs = gobjects(0);
+        for n = reshape(double(numbers), 1, [])
+            fig = findobj(groot, '-depth', 1, 'Type', 'figure', 'Number', n);
+            figs = [figs; fig(:)]; %#ok<AGROW>
+        end
+    end
+
+    count = numel(figs);
+    info = struct();
+    info.number = zeros(1, count);
+    info.axes_count = zeros(1, count);
+    info.plot_object_count = zeros(1, count);
+    info.is_blank = true(1, count);
+    info.axes_child_counts = cell(1, count);
+    info.axes_types = cell(1, count);
+
+    for k = 1:count
+        fig = figs(k);
+        axes_handles = findobj(fig, 'Type', 'axes');
+        child_counts = zeros(1, numel(axes_handles));
+        types = cell(1, numel(axes_handles));
+        for a = 1:numel(axes_handles)
+            children = axes_handles(a).Children;
+            child_counts(a) = numel(children);
+            if isempty(children)
+                types{a} = '';
+            else
+                types{a} = strjoin(reshape(cellstr(get(children, 'Type')), 1, []), ',');
+            end
+        end
+
+        if isempty(fig.Number)
+            info.number(k) = NaN;
+        else
+            info.number(k) = double(fig.Number);
+        end
+        info.axes_count(k) = numel(axes_handles);
+        info.plot_object_count(k) = sum(child_counts);
+        info.is_blank(k) = sum(child_counts) == 0;
+        info.axes_child_counts{k} = child_counts;
+        info.axes_types{k} = types;
+    end
+end
@@ -0,0 +1,19 @@
+function fig = mcp_find_figure(number)
+%MCP_FIND_FIGURE Look up a figure by number without creating one.
+%   FIG = MCP_FIND_FIGURE(NUMBER) returns the open figure with the given
+%   number, or the current figure if NUMBER is empty. Unlike FIGURE(N) and
+%   GCF this never creates a new, blank figure; it errors instead.
+
+    if nargin < 1 || isempty(number)
+        fig = get(groot, 'CurrentFigure');
+        if isempty(fig)
+            error('mcp:noFigure', 'No figure is open');
+        end
+    else
+        fig = findobj(groot, '-depth', 1, 'Type', 'figure', 'Number', double(number));
+        if isempty(fig)
+            error('mcp:noFigure', 'Figure %d does not exist', double(number));
+        end
+        fig = fig(1);
+    end
+end
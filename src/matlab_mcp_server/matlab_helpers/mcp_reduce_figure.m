@@ -0,0 +1,95 @@
+function [undo, stats] = mcp_reduce_figure(fig, max_points)
+%MCP_REDUCE_FIGURE Temporarily decimate large line and scatter objects.
+%   [UNDO, STATS] = MCP_REDUCE_FIGURE(FIG, MAX_POINTS) replaces the data of
+%   every line and scatter object in FIG that has more than MAX_POINTS
+%   points by a visually equivalent subset of at most MAX_POINTS points:
+%   the index range is split into buckets and the minimum and maximum of
+%   each bucket are kept (plus the first NaN, so gaps survive). Per-point scatter sizes and
+%   colors are subset along with the coordinates.
+%
+%   UNDO is a struct array with fields handle and values (a property/value
+%   cell); SET(UNDO(k).handle, UNDO(k).values{:}) restores the original
+%   data. STATS has fields points and kept, summed over all line and
+%   scatter objects, and reduced, the number of objects that were changed.
+
+    undo = struct('handle', {}, 'values', {});
+    stats = struct('points', 0, 'kept', 0, 'reduced', 0);
+
+    objs = findall(fig, 'Type', 'line', '-or', 'Type', 'scatter');
+    for k = 1:numel(objs)
+        h = objs(k);
+        y = h.YData;
+        n = numel(y);
+        stats.points = stats.points + n;
+        if max_points <= 0 || n <= max_points || ~isnumeric(y)
+            stats.kept = stats.kept + n;
+            continue
+        end
+
+        idx = minmax_indices(double(y), max_points);
+        names = {'XData', 'YData', 'ZData'};
+        if strcmp(h.Type, 'scatter')
+            names = [names, {'SizeData', 'CData'}]; %#ok<AGROW>
+        end
+
+        original = {};
+        reduced = {};
+        for name = names
+            value = h.(name{1});
+            original = [original, name, {value}]; %#ok<AGROW>
+            if isvector(value) && numel(value) == n
+                reduced = [reduced, name, {value(idx)}]; %#ok<AGROW>
+            elseif size(value, 1) == n
+                reduced = [reduced, name, {value(idx, :)}]; %#ok<AGROW>
+            end
+        end
+        % Restoring XData would otherwise leave XDataMode 'manual' on y-only plots
+        if isprop(h, 'XDataMode')
+            original = [original, {'XDataMode', h.XDataMode}]; %#ok<AGROW>
+        end
+
+        set(h, reduced{:});
+        undo(end + 1) = struct('handle', h, 'values', {original}); %#ok<AGROW>
+        stats.kept = stats.kept + numel(idx);
+        stats.reduced = stats.reduced + 1;
+    end
+end
+
+function idx = minmax_indices(y, max_points)
+    % Each bucket keeps its min and max, plus a gap marker if it has NaNs,
+    % and both end points are kept; the bucket count shrinks until the
+    % total fits max_points.
+    n = numel(y);
+    buckets = floor((max_points - 2) / 2);
+    while buckets >= 1
+        idx = bucket_picks(y, buckets);
+        if numel(idx) <= max_points
+            return
+        end
+        buckets = buckets - ceil((numel(idx) - max_points) / 2);
+    end
+    % Too few points allowed for buckets: evenly spaced samples
+    idx = unique(round(linspace(1, n, max(max_points, 1))));
+end
+
+function idx = bucket_picks(y, buckets)
+    n = numel(y);
+    edges = round(linspace(0, n, buckets + 1));
+    idx = zeros(1, 3 * buckets);
+    count = 0;
+    for b = 1:buckets
+        first = edges(b) + 1;
+        last = edges(b + 1);
+        if last < first
+            continue
+        end
+        segment = y(first:last);
+        [~, lo] = min(segment);
+        [~, hi] = max(segment);
+        gap = find(isnan(segment), 1);
+        picks = sort([lo, hi, gap]) + first - 1;
+        idx(count + 1:count + numel(picks)) = picks;
+        count = count + numel(picks);
+    end
+    idx = unique([1, idx(1:count), n]);
+end
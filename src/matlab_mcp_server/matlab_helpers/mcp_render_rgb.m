@@ -0,0 +1,54 @@
+function img = mcp_render_rgb(number, dpi, max_pixels, opts)
+%MCP_RENDER_RGB Render a figure to an RGB pixel buffer in memory.
+%   IMG = MCP_RENDER_RGB(NUMBER, DPI, MAX_PIXELS, OPTS) renders figure NUMBER
+%   (the current figure if NUMBER is empty) with print('-RGBImage') and
+%   returns a struct with fields width, height, dpi and data. DATA is a
+%   uint8 row vector of interleaved RGB bytes in row-major order, ready to
+%   be encoded by the server without touching the disk. The resolution is
+%   lowered so the image has at most MAX_PIXELS pixels.
+%
+%   OPTS accepts the same fingerprint/known_fingerprints fields as
+%   MCP_EXPORT_FIGURES. IMG.fingerprint is set when requested, and when it
+%   matches a known fingerprint IMG.cached is true and no data is rendered.
+
+    if nargin < 4 || ~isstruct(opts)
+        opts = struct();
+    end
+
+    fig = mcp_find_figure(number);
+
+    img = struct('width', 0, 'height', 0, 'dpi', 0, 'data', uint8([]), ...
+        'fingerprint', '', 'cached', false);
+    if isfield(opts, 'fingerprint') && opts.fingerprint
+        img.fingerprint = mcp_figure_fingerprint(fig);
+        if isfield(opts, 'known_fingerprints') ...
+                && any(strcmp(img.fingerprint, cellstr(opts.known_fingerprints)))
+            img.cached = true;
+            return
+        end
+    end
+
+    % Estimate the rendered size from the on-screen size and fit the DPI
+    pos = getpixelposition(fig);
+    inches = pos(3:4) / get(groot, 'ScreenPixelsPerInch');
+    dpi = double(dpi);
+    if nargin > 2 && ~isempty(max_pixels) && max_pixels > 0
+        dpi = min(dpi, floor(sqrt(double(max_pixels) / prod(inches))));
+    end
+    dpi = max(dpi, 10);
+
+    rgb = print(fig, '-RGBImage', sprintf('-r%d', round(dpi)));
+
+    % Guard against estimation error with a plain decimation
+    if nargin > 2 && ~isempty(max_pixels) && max_pixels > 0
+        step = ceil(sqrt(size(rgb, 1) * size(rgb, 2) / double(max_pixels)));
+        if step > 1
+            rgb = rgb(1:step:end, 1:step:end, :);
+        end
+    end
+
+    img.height = size(rgb, 1);
+    img.width = size(rgb, 2);
+    img.dpi = round(dpi);
+    img.data = reshape(permute(rgb, [3 2 1]), 1, []);
+end
@@ -0,0 +1,25 @@
+function info = mcp_render_snapshot(fig_file, path, fmt, dpi, opts)
+%MCP_RENDER_SNAPSHOT Export a figure saved by MCP_SAVE_SNAPSHOT.
+%   INFO = MCP_RENDER_SNAPSHOT(FIG_FILE, PATH, FMT, DPI, OPTS) opens the
+%   snapshot invisibly, exports it with MCP_EXPORT_FILE and closes it again.
+%   OPTS.max_points decimates line and scatter data first (see
+%   MCP_REDUCE_FIGURE); the snapshot is discarded afterwards, so nothing
+%   needs restoring. INFO has fields bytes, points and kept.
+
+    if nargin < 5 || ~isstruct(opts)
+        opts = struct();
+    end
+    max_points = 0;
+    if isfield(opts, 'max_points') && ~isempty(opts.max_points)
+        max_points = double(opts.max_points);
+    end
+
+    fig = openfig(fig_file, 'invisible');
+    cleanup = onCleanup(@() close(fig));
+
+    [~, stats] = mcp_reduce_figure(fig, max_points);
+    mcp_export_file(fig, char(path), char(fmt), double(dpi));
+
+    listing = dir(path);
+    info = struct('bytes', listing.bytes, 'points', stats.points, 'kept', stats.kept);
+end
@@ -0,0 +1,23 @@
+function saved_bytes = mcp_save_outputs(mat_file, names, max_bytes)
+%MCP_SAVE_OUTPUTS Save base workspace variables if they are small enough.
+%   SAVED_BYTES = MCP_SAVE_OUTPUTS(MAT_FILE, NAMES, MAX_BYTES) saves the
+%   variables in NAMES that exist in the base workspace to MAT_FILE when
+%   their total size is at most MAX_BYTES, and returns the size of the
+%   file. Nothing is written (and 0 is returned) when they are larger or
+%   none of them exists. Names that do not exist are ignored.
+
+    saved_bytes = 0;
+    if isempty(names)
+        return;
+    end
+    s = evalin('base', 'whos');
+    s = s(ismember({s.name}, cellstr(names)));
+    if isempty(s) || sum([s.bytes]) > max_bytes
+        return;
+    end
+
+    quoted = sprintf(', ''%s''', s.name);
+    evalin('base', sprintf('save(''%s''%s);', strrep(mat_file, '''', ''''''), quoted));
+    listing = dir(mat_file);
+    saved_bytes = double(listing.bytes);
+end
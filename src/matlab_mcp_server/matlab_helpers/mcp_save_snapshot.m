@@ -0,0 +1,11 @@
+function number = mcp_save_snapshot(number, fig_file)
+%MCP_SAVE_SNAPSHOT Save a figure to a .fig file for rendering elsewhere.
+%   NUMBER = MCP_SAVE_SNAPSHOT(NUMBER, FIG_FILE) saves figure NUMBER (the
+%   current figure if NUMBER is empty) in compact form and returns its
+%   number. Saving is fast compared to rendering, so the expensive export
+%   can run on another MATLAB session (see MCP_RENDER_SNAPSHOT).
+
+    fig = mcp_find_figure(number);
+    savefig(fig, fig_file, 'compact');
+    number = double(fig.Number);
+end
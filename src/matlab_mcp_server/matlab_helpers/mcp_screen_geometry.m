@@ -0,0 +1,11 @@
+function geometry = mcp_screen_geometry()
+%MCP_SCREEN_GEOMETRY Screen and monitor geometry in pixels.
+%   GEOMETRY = MCP_SCREEN_GEOMETRY() returns a struct with the primary
+%   screen size and the MonitorPositions matrix (one [left bottom width
+%   height] row per monitor), so the server can lay out figures without
+%   querying the screen again.
+
+    geometry = struct();
+    geometry.screen_size = double(get(groot, 'ScreenSize'));
+    geometry.monitors = double(get(groot, 'MonitorPositions'));
+end
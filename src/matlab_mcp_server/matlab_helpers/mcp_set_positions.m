@@ -0,0 +1,17 @@
+function count = mcp_set_positions(numbers, positions)
+%MCP_SET_POSITIONS Apply window positions to several figures at once.
+%   COUNT = MCP_SET_POSITIONS(NUMBERS, POSITIONS) sets the Position of the
+%   figure with number NUMBERS(k) to row k of the N-by-4 matrix POSITIONS
+%   ([left bottom width height], pixels). Figures that no longer exist are
+%   skipped; COUNT is the number of figures actually positioned.
+
+    count = 0;
+    for k = 1:numel(numbers)
+        fig = findobj(groot, '-depth', 1, 'Type', 'figure', 'Number', double(numbers(k)));
+        if isempty(fig)
+            continue
+        end
+        set(fig(1), 'Units', 'pixels', 'Position', double(positions(k, :)));
+        count = count + 1;
+    end
+end
@@ -0,0 +1,51 @@
+function info = mcp_whos(opts)
+%MCP_WHOS Structured listing of the base workspace for the MCP server.
+%   INFO = MCP_WHOS(OPTS) evaluates WHOS once in the base workspace and
+%   returns a scalar struct of column arrays (one entry per variable), so
+%   the whole listing crosses the engine boundary in a single transfer.
+%
+%   OPTS fields (all optional):
+%     pattern    - wildcard pattern on variable names, e.g. 'x*'
+%     class_name - only keep variables of this class
+%     min_bytes  - only keep variables of at least this many bytes
+%     sort_by    - 'name' (default) or 'bytes' (largest first)
+%     limit      - keep at most this many entries (0 = no limit)
+
+    if nargin < 1 || ~isstruct(opts)
+        opts = struct();
+    end
+
+    s = evalin('base', 'whos');
+    s = s(:)';
+
+    info = struct();
+    info.total_count = numel(s);
+    info.total_bytes = sum([s.bytes]);
+
+    keep = true(1, numel(s));
+    if isfield(opts, 'pattern') && ~isempty(opts.pattern)
+        expr = ['^' regexptranslate('wildcard', char(opts.pattern)) '$'];
+        keep = keep & ~cellfun(@isempty, regexp({s.name}, expr, 'once'));
+    end
+    if isfield(opts, 'class_name') && ~isempty(opts.class_name)
+        keep = keep & strcmp({s.class}, char(opts.class_name));
+    end
+    if isfield(opts, 'min_bytes') && ~isempty(opts.min_bytes)
+        keep = keep & ([s.bytes] >= double(opts.min_bytes));
+    end
+    s = s(keep);
+    info.matched_count = numel(s);
+
+    if isfield(opts, 'sort_by') && strcmp(char(opts.sort_by), 'bytes')
+        [~, order] = sort([s.bytes], 'descend');
+        s = s(order);
+    end
+    if isfield(opts, 'limit') && ~isempty(opts.limit) && double(opts.limit) > 0
+        s = s(1:min(numel(s), double(opts.limit)));
+    end
+
+    cols = mcp_whos_columns(s);
+    for f = fieldnames(cols)'
+        info.(f{1}) = cols.(f{1});
+    end
+end
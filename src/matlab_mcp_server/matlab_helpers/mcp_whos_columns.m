@@ -0,0 +1,21 @@
+function cols = mcp_whos_columns(s)
+%MCP_WHOS_COLUMNS Convert a WHOS struct array into a struct of columns.
+%   COLS = MCP_WHOS_COLUMNS(S) returns a scalar struct with one cell or
+%   vector field per WHOS attribute. Struct arrays cannot cross the engine
+%   boundary, but a scalar struct of columns can, in a single transfer.
+
+    s = s(:)';
+    cols = struct();
+    cols.name = {s.name};
+    cols.size = cellfun(@size_str, {s.size}, 'UniformOutput', false);
+    cols.bytes = double([s.bytes]);
+    cols.class = {s.class};
+    cols.complex = logical([s.complex]);
+    cols.sparse = logical([s.sparse]);
+    cols.global = logical([s.global]);
+end
+
+function str = size_str(sz)
+    str = sprintf('%dx', sz);
+    str = str(1:end-1);
+end
@@ -0,0 +1,49 @@
+function health = mcp_workspace_health(names, max_elements)
+%MCP_WORKSPACE_HEALTH NaN, Inf and empty counts for base workspace variables.
+%   HEALTH = MCP_WORKSPACE_HEALTH(NAMES, MAX_ELEMENTS) checks the variables
+%   in the cell array NAMES (all variables if NAMES is 'all') and returns a
+%   scalar struct of columns, one entry per variable: name, numel,
+%   nan_count, inf_count, is_empty and sampled. NaN and Inf are counted for
+%   floating-point arrays only. Arrays with more than MAX_ELEMENTS elements
+%   are checked on an evenly spaced sample of MAX_ELEMENTS elements, so the
+%   counts are lower bounds and sampled is true (MAX_ELEMENTS = 0 checks
+%   everything).
+
+    if nargin < 2 || isempty(max_elements)
+        max_elements = 0;
+    end
+    max_elements = double(max_elements);
+
+    existing = evalin('base', 'who');
+    if nargin < 1 || (ischar(names) && strcmp(names, 'all'))
+        names = existing;
+    else
+        names = intersect(cellstr(names), existing);
+    end
+    names = reshape(names, 1, []);
+
+    count = numel(names);
+    health = struct();
+    health.name = names;
+    health.numel = zeros(1, count);
+    health.nan_count = zeros(1, count);
+    health.inf_count = zeros(1, count);
+    health.is_empty = false(1, count);
+    health.sampled = false(1, count);
+
+    for k = 1:count
+        value = evalin('base', names{k});
+        n = numel(value);
+        health.numel(k) = n;
+        health.is_empty(k) = isempty(value);
+        if ~isfloat(value) || n == 0
+            continue
+        end
+        if max_elements > 0 && n > max_elements
+            value = value(round(linspace(1, n, max_elements)));
+            health.sampled(k) = true;
+        end
+        health.nan_count(k) = nnz(isnan(value));
+        health.inf_count(k) = nnz(isinf(value));
+    end
+end
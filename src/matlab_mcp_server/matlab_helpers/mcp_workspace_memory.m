@@ -0,0 +1,11 @@
+function info = mcp_workspace_memory()
+%MCP_WORKSPACE_MEMORY Memory accounting snapshot for the MCP server.
+%   INFO = MCP_WORKSPACE_MEMORY() returns the base workspace listing as
+%   columns (see MCP_WHOS_COLUMNS), the number of open figures and the
+%   process id of this MATLAB session, so the server can sample the OS
+%   resident set size without another engine call.
+
+    info = mcp_whos_columns(evalin('base', 'whos'));
+    info.figure_count = numel(findall(groot, 'Type', 'figure'));
+    info.pid = double(feature('getpid'));
+end
@@ -0,0 +1,43 @@
+"""Conversion of values returned by the MATLAB engine into plain Python values."""
+
+
+def to_list(value) -> list:
+    """Flatten a vector returned by the MATLAB engine into a Python list.
+
+    The engine hands 1x1 values back as plain Python scalars, vectors as
+    matlab arrays and cell arrays as lists; this normalizes all of them.
+    """
+    if value is None:
+        return []
+    if isinstance(value, (str, bytes, bool, int, float)):
+        return [value]
+
+    flat = []
+    for item in value:
+        if hasattr(item, '__iter__') and not isinstance(item, (str, bytes)):
+            flat.extend(to_list(item))
+        else:
+            flat.append(item)
+    return flat
+
+
+def matlab_bytes(value) -> bytes:
+    """Get the raw bytes of a uint8 vector returned by the MATLAB engine."""
+    if hasattr(value, "tomemoryview"):
+        # R2022a+ exposes the buffer directly - no per-element conversion
+        return value.tomemoryview().tobytes()
+    if hasattr(value, "_data"):
+        return bytes(value._data)
+    return bytes(int(v) for v in to_list(value))
+
+
+def matlab_floats(value) -> list:
+    """Get the elements of a double row vector returned by the MATLAB engine."""
+    if isinstance(value, (int, float)):
+        return [float(value)]
+    if hasattr(value, "tomemoryview"):
+        # Same zero-copy path as matlab_bytes; the buffer holds C doubles
+        return value.tomemoryview().cast("B").cast("d").tolist()
+    if hasattr(value, "_data"):
+        return list(value._data)
+    return [float(v) for v in to_list(value)]
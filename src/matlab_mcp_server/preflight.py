@@ -0,0 +1,148 @@
+"""Static preflight of submitted code on a helper MATLAB engine."""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Dict, Any, Optional
+
+import matlab.engine
+
+from matlab_mcp_server.matlab_values import to_list
+
+logger = logging.getLogger(__name__)
+
+# Code Analyzer message ids that mean the code cannot run at all. Messages are matched by
+# id (or by the severity mcp_checkcode reads from codeIssues), never by their text, which
+# is localized
+_SYNTAX_ERROR_IDS = frozenset({"SYNER"})
+
+# Messages that do not apply to interactively executed code: printing results is
+# intended, and assigned values stay in the workspace for later calls
+_IGNORED_LINT_IDS = frozenset({"NOPTS", "NOPRT", "NASGU"})
+
+
+class CodePreflight:
+    """Lint submitted code with checkcode before it reaches the main engine.
+
+    checkcode runs on a dedicated helper engine in its own worker thread, so a syntax error
+    is caught without occupying the engine the user computes on. Results are cached by a hash
+    of the code. The helper engine is started in the background on first use; until it is
+    ready, while an earlier check is still running, or if a check takes longer than the
+    timeout, the preflight is skipped rather than delaying the execution. A check that timed
+    out keeps running and its result is cached for the next call with the same code.
+    """
+
+    def __init__(self, helpers_dir: str, timeout: float = 5.0, cache_size: int = 256):
+        """Initialize the preflight (the helper engine is started lazily).
+
+        Args:
+            helpers_dir: Directory with the mcp_*.m helpers
+            timeout: Seconds to wait for a check before skipping it
+            cache_size: Number of checked code hashes to remember
+        """
+        self.helpers_dir = helpers_dir
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="matlab-preflight")
+        self._engine = None
+        self._starting = False
+        self._pending: Optional[Future] = None
+        self._lock = threading.Lock()
+
+    def check(self, code: str) -> Optional[Dict[str, Any]]:
+        """Lint code, from cache if it was checked before.
+
+        Args:
+            code: MATLAB code to check
+
+        Returns:
+            Dict with syntax_errors and lint (lists of line, column, id, message) and
+            cached, or None if the check was skipped
+        """
+        key = hashlib.sha1(code.encode("utf-8")).hexdigest()
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return dict(self._cache[key], cached=True)
+            if self._engine is None:
+                if not self._starting:
+                    self._starting = True
+                    self._executor.submit(self._start)
+                return None
+            if self._pending is not None and not self._pending.done():
+                # Checks never queue up behind a slow one
+                logger.info("Preflight check still running; skipping")
+                return None
+            self._pending = self._executor.submit(self._lint_and_cache, key, code)
+            pending = self._pending
+
+        try:
+            result = pending.result(timeout=self.timeout)
+        except TimeoutError:
+            logger.info("Preflight check timed out; skipping")
+            return None
+        except Exception as e:
+            logger.warning(f"Preflight check failed: {e}")
+            return None
+        return dict(result, cached=False)
+
+    def shutdown(self) -> None:
+        """Stop the helper engine."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        engine, self._engine = self._engine, None
+        if engine is not None:
+            try:
+                engine.quit()
+            except Exception as e:
+                logger.warning(f"Failed to stop preflight engine: {e}")
+
+    def _start(self) -> None:
+        """Start the helper engine (runs on the worker thread)."""
+        try:
+            logger.info("Starting preflight engine...")
+            engine = matlab.engine.start_matlab()
+            engine.addpath(self.helpers_dir, nargout=0)
+            with self._lock:
+                self._engine = engine
+            logger.info("Preflight engine ready")
+        except Exception as e:
+            logger.warning(f"Failed to start preflight engine; preflight disabled: {e}")
+
+    def _lint_and_cache(self, key: str, code: str) -> Dict[str, Any]:
+        """Lint code and cache the result under its hash (runs on the worker thread)."""
+        result = self._lint(code)
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _lint(self, code: str) -> Dict[str, Any]:
+        """Run mcp_checkcode and split its messages (runs on the worker thread)."""
+        info = self._engine.mcp_checkcode(code, nargout=1)
+
+        lines = to_list(info.get("line"))
+        columns = to_list(info.get("column"))
+        ids = to_list(info.get("id"))
+        messages = to_list(info.get("message"))
+        is_error = to_list(info.get("is_error"))
+
+        syntax_errors = []
+        lint = []
+        for i, message in enumerate(messages):
+            entry = {
+                "line": int(lines[i]),
+                "column": int(columns[i]),
+                "id": ids[i],
+                "message": message
+            }
+            if ids[i] in _SYNTAX_ERROR_IDS or (i < len(is_error) and is_error[i]):
+                syntax_errors.append(entry)
+            elif ids[i] not in _IGNORED_LINT_IDS:
+                lint.append(entry)
+
+        return {"syntax_errors": syntax_errors, "lint": lint}
+
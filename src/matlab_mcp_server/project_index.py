@@ -0,0 +1,182 @@
+"""Cached index of project directories built with os.scandir and invalidated by mtime."""
+
+import fnmatch
+import logging
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# File kinds reported per project, by extension
+_KINDS = {
+    "script": {".m", ".mlx"},
+    "figure": {
+        ".fig", ".png", ".jpg", ".jpeg", ".svg", ".pdf", ".eps", ".tif", ".tiff", ".gif", ".bmp"
+    },
+    "data": {
+        ".mat", ".csv", ".txt", ".xlsx", ".xls", ".json", ".h5", ".hdf5", ".nc", ".dat", ".parquet"
+    }
+}
+_KIND_BY_EXTENSION = {ext: kind for kind, extensions in _KINDS.items() for ext in extensions}
+
+
+class ProjectIndex:
+    """Index of the files in project directories.
+
+    Each directory is listed once with os.scandir and kept with its mtime. A directory is
+    listed again only when its mtime changes, which happens when entries are added,
+    removed or renamed in it. A tree is re-validated (one stat per directory) at most
+    every check_interval seconds, so repeated queries are answered from memory. Hidden
+    entries (server caches such as .figure_cache) are not indexed. A file rewritten in
+    place keeps its old size and time until its directory changes.
+    """
+
+    def __init__(self, root: str, check_interval: float = 1.0):
+        """Initialize an empty index.
+
+        Args:
+            root: Directory whose subdirectories are the projects
+            check_interval: Seconds during which a validated tree is trusted without stat calls
+        """
+        self.root = root
+        self.check_interval = check_interval
+        self._dirs: Dict[str, Dict[str, Any]] = {}
+        self._trees: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def projects(self) -> list:
+        """Names of the project directories, sorted."""
+        with self._lock:
+            listing = self._listing(self.root)
+        return sorted(listing["subdirs"]) if listing else []
+
+    def tree(self, path: str) -> Optional[Dict[str, Any]]:
+        """Summary and file records of a directory tree.
+
+        Args:
+            path: Directory to index (a project directory or the workspace)
+
+        Returns:
+            Dict with summary (bytes, file_count, counts by kind, last_activity,
+            directories) and files (records with path, name, kind, bytes, modified;
+            newest first) and by_kind, or None if the directory does not exist
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            tree = self._trees.get(path)
+            now = time.monotonic()
+            if tree is not None and now - tree["checked"] < self.check_interval:
+                return tree
+
+            stamp = []
+            listings = []
+            pending = [path]
+            while pending:
+                directory = pending.pop()
+                listing = self._listing(directory)
+                if listing is None:
+                    continue
+                stamp.append((directory, listing["mtime"]))
+                listings.append((directory, listing))
+                pending.extend(os.path.join(directory, name) for name in listing["subdirs"])
+
+            if not listings:
+                self._trees.pop(path, None)
+                return None
+            stamp = tuple(sorted(stamp))
+            if tree is None or tree["stamp"] != stamp:
+                tree = self._build_tree(path, listings)
+                tree["stamp"] = stamp
+                self._trees[path] = tree
+            tree["checked"] = now
+            return tree
+
+    def _listing(self, directory: str) -> Optional[Dict[str, Any]]:
+        """Cached scandir listing of one directory, refreshed when its mtime changes."""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            self._dirs.pop(directory, None)
+            return None
+
+        listing = self._dirs.get(directory)
+        if listing is not None and listing["mtime"] == mtime:
+            return listing
+
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        elif entry.is_file():
+                            st = entry.stat()
+                            files.append((entry.name, st.st_size, st.st_mtime))
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.warning(f"Failed to index {directory}: {e}")
+            return None
+
+        listing = {"mtime": mtime, "modified": mtime / 1e9, "files": files, "subdirs": subdirs}
+        self._dirs[directory] = listing
+        return listing
+
+    @staticmethod
+    def _build_tree(path: str, listings: list) -> Dict[str, Any]:
+        """Aggregate cached directory listings into a tree summary and sorted file lists."""
+        records = []
+        last_activity = 0.0
+        for directory, listing in listings:
+            relative = os.path.relpath(directory, path)
+            last_activity = max(last_activity, listing["modified"])
+            for name, size, modified in listing["files"]:
+                records.append({
+                    "path": name if relative == "." else os.path.join(relative, name),
+                    "name": name,
+                    "kind": _KIND_BY_EXTENSION.get(os.path.splitext(name)[1].lower(), "other"),
+                    "bytes": size,
+                    "modified": modified
+                })
+        records.sort(key=lambda record: record["modified"], reverse=True)
+
+        by_kind: Dict[str, list] = {}
+        for record in records:
+            by_kind.setdefault(record["kind"], []).append(record)
+
+        return {
+            "summary": {
+                "bytes": sum(record["bytes"] for record in records),
+                "file_count": len(records),
+                "counts": {kind: len(kind_records) for kind, kind_records in by_kind.items()},
+                "last_activity": max([last_activity] + [r["modified"] for r in records[:1]]),
+                "directories": len(listings)
+            },
+            "files": records,
+            "by_kind": by_kind
+        }
+
+
+def filter_files(records: list, pattern: Optional[str] = None, query: Optional[str] = None) -> list:
+    """Filter file records by a wildcard pattern on the name or a substring of the path.
+
+    Args:
+        records: File records from ProjectIndex.tree
+        pattern: Wildcard pattern matched against the file name (e.g. '*.mat')
+        query: Case-insensitive substring of the relative path
+
+    Returns:
+        Matching records in their original order
+    """
+    if pattern:
+        records = [r for r in records if fnmatch.fnmatch(r["name"].lower(), pattern.lower())]
+    if query:
+        query = query.lower()
+        records = [r for r in records if query in r["path"].lower()]
+    return records
@@ -0,0 +1,117 @@
+"""Content-addressed store of executed scripts with an append-only session log."""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ScriptStore:
+    """Deduplicated on-disk store of auto-saved scripts.
+
+    Each distinct piece of code is written once, to objects/script_<sha1>.m (a name MATLAB
+    can run, since it starts with a letter), and every save appends one JSON line (time,
+    hash, figures, warnings, ...) to the log of the current session under sessions/. All
+    file writes happen on a background writer thread, so saving never blocks the caller;
+    the object path is known before it is written.
+    """
+
+    def __init__(self, root: str):
+        """Initialize the store and start a new session log (files are created lazily).
+
+        Args:
+            root: Directory holding objects/ and sessions/
+        """
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.sessions_dir = os.path.join(root, "sessions")
+        self.session_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        self.session_log = os.path.join(self.sessions_dir, f"session_{self.session_id}.jsonl")
+
+        self._known: set = set()
+        self._queue: queue.Queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def object_path(self, digest: str) -> str:
+        """Path of the stored script for a code hash."""
+        return os.path.join(self.objects_dir, f"script_{digest}.m")
+
+    def save(self, code: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Queue code for storage and log the save in the session log.
+
+        Args:
+            code: MATLAB code to store
+            metadata: Extra fields for the session log entry (figures, warnings, ...)
+
+        Returns:
+            Dict with hash, path and duplicate (code was stored before in this process)
+        """
+        digest = hashlib.sha1(code.encode("utf-8")).hexdigest()
+        entry = dict(metadata or {}, time=time.time(), hash=digest)
+
+        with self._lock:
+            duplicate = digest in self._known
+            self._known.add(digest)
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="matlab-script-store", daemon=True
+                )
+                self._writer.start()
+
+        self._queue.put((None if duplicate else code, digest, entry))
+        return {"hash": digest, "path": self.object_path(digest), "duplicate": duplicate}
+
+    def flush(self) -> None:
+        """Block until every queued save has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write pending saves and stop the writer thread."""
+        with self._lock:
+            writer = self._writer
+            self._writer = None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
+
+    def _write_loop(self) -> None:
+        """Write queued objects and log entries until a None sentinel arrives."""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                code, digest, entry = item
+                if code is not None:
+                    self._write_object(code, digest)
+                self._append_log(entry)
+            except Exception as e:
+                logger.warning(f"Failed to store script: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write_object(self, code: str, digest: str) -> None:
+        """Write a script object unless a previous session already stored it."""
+        path = self.object_path(digest)
+        if os.path.exists(path):
+            return
+        os.makedirs(self.objects_dir, exist_ok=True)
+        # Write under a temporary name so a crash never leaves a truncated object
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(code)
+        os.replace(temp_path, path)
+
+    def _append_log(self, entry: Dict[str, Any]) -> None:
+        """Append one JSON line to the session log."""
+        os.makedirs(self.sessions_dir, exist_ok=True)
+        with open(self.session_log, "a") as f:
+            f.write(json.dumps(entry) + "\n")
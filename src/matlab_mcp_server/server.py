@@ -41,6 +41,9 @@ logger = logging.getLogger(__name__)
 
 # Now import everything else
 import asyncio
+import base64
+import json
+import math
 from typing import Any, Optional
 
 # Load environment variables
@@ -91,6 +94,76 @@ def get_matlab_engine() -> MATLABEngineWrapper:
     return thread_local.matlab_engine
 
 
+def format_bytes(num_bytes: int) -> str:
+    """Format a byte count with a binary unit suffix."""
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def format_workspace_delta(delta: dict) -> str:
+    """Format a workspace delta (created/modified/deleted records) for display."""
+    lines = ["Workspace changes:\n"]
+    for kind, marker in (("created", "+"), ("modified", "~"), ("deleted", "-")):
+        for record in delta.get(kind, []):
+            size = "x".join(str(d) for d in record["size"])
+            lines.append(
+                f"  {marker} {record['name']} ({record['class']} {size}, {record['bytes']} bytes)\n"
+            )
+    lines.append("\n")
+    return "".join(lines)
+
+
+def format_lint(messages: list) -> str:
+    """Format Code Analyzer messages (line, column, id, message) for display."""
+    lines = ["Code Analyzer:\n"]
+    for msg in messages:
+        lines.append(f"  L{msg['line']}:{msg['column']} {msg['message']} [{msg['id']}]\n")
+    lines.append("\n")
+    return "".join(lines)
+
+
+def format_instrumentation(instrumentation: dict) -> str:
+    """Format execute timings and the bookkeeping skipped by static analysis as one line."""
+    timings = instrumentation.get("timings_ms", {})
+    line = f"⏱️  {timings.get('total', 0):.0f} ms total, {timings.get('code', 0):.0f} ms in code"
+    if instrumentation.get("skipped"):
+        line += (f"; skipped {' and '.join(instrumentation['skipped'])} bookkeeping"
+                 f" (~{instrumentation.get('estimated_saved_ms', 0):.0f} ms saved)")
+    return line + "\n"
+
+
+def format_file_summary(summary: dict) -> str:
+    """Format a project index summary (size, counts by kind, last activity) as one line."""
+    counts = ", ".join(f"{n} {kind}" for kind, n in sorted(summary["counts"].items()))
+    last = datetime.fromtimestamp(summary["last_activity"]).strftime("%Y-%m-%d %H:%M")
+    line = f"{summary['file_count']} file(s), {format_bytes(summary['bytes'])}"
+    if counts:
+        line += f" ({counts})"
+    return line + f", last activity {last}"
+
+
+def format_file_record(record: dict, project: str = None) -> str:
+    """Format one project file record for display."""
+    modified = datetime.fromtimestamp(record["modified"]).strftime("%Y-%m-%d %H:%M")
+    prefix = f"{project}/" if project else ""
+    size = format_bytes(record["bytes"])
+    return f"  {prefix}{record['path']}  [{record['kind']}, {size}, {modified}]\n"
+
+
+def compact_numbers(value):
+    """Round floats to 6 significant digits and map NaN/Inf to null for compact JSON."""
+    if isinstance(value, float):
+        return float(f"{value:.6g}") if math.isfinite(value) else None
+    if isinstance(value, list):
+        return [compact_numbers(v) for v in value]
+    if isinstance(value, dict):
+        return {k: compact_numbers(v) for k, v in value.items()}
+    return value
+
+
 # Create MCP server instance
 app = Server("matlab-mcp-server")
 
@@ -105,12 +178,15 @@ async def list_tools() -> list[Tool]:
 
             IMPORTANT: When plots/figures are created, they will automatically pop up in MATLAB GUI windows
             for immediate user interaction. Figures are automatically positioned on-screen in a cascade pattern
-            to ensure they are visible and not off-screen.
+            to ensure they are visible and not off-screen. (If the server runs in offscreen mode,
+            figures are invisible and must be viewed with export_figure.)
 
             You do NOT need to manually export figures unless the user specifically requests saved image files.
             The figures will be displayed for the user to interact with directly in MATLAB.
 
-            Returns all debugging information and metadata about figures created.""",
+            Returns all debugging information, metadata about figures created, and the workspace
+            variables created, modified or deleted by the code (no need to call list_workspace
+            afterwards).""",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -148,10 +224,97 @@ async def list_tools() -> list[Tool]:
         ),
         Tool(
             name="list_workspace",
-            description="List all variables currently in the MATLAB workspace with their sizes and types.",
+            description=(
+                "List variables currently in the MATLAB workspace with their sizes, bytes, classes "
+                "and attributes. Supports filtering, sorting by size and top-N limits."
+            ),
             inputSchema={
                 "type": "object",
-                "properties": {}
+                "properties": {
+                    "pattern": {
+                        "type": "string",
+                        "description": (
+                            "Wildcard pattern on variable names, e.g. 'data*' (default: all "
+                            "variables)"
+                        )
+                    },
+                    "class_name": {
+                        "type": "string",
+                        "description": (
+                            "Only list variables of this MATLAB class, e.g. 'double' or 'struct'"
+                        )
+                    },
+                    "min_bytes": {
+                        "type": "integer",
+                        "description": "Only list variables using at least this many bytes"
+                    },
+                    "sort_by": {
+                        "type": "string",
+                        "enum": ["name", "bytes"],
+                        "description": (
+                            "Sort by name or by size in bytes, largest first (default: name)"
+                        ),
+                        "default": "name"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": (
+                            "Maximum number of variables to list (e.g. 10 with sort_by='bytes' for "
+                            "the largest)"
+                        )
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="workspace_memory",
+            description=(
+                "Report MATLAB workspace memory usage: total bytes, largest variables, "
+                "duplicate-looking arrays, open figure count and engine process RSS. In 'evict' "
+                "mode, clears the largest or least-recently-touched variables until a byte target "
+                "is met, optionally checkpointing them to a MAT-file first."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "mode": {
+                        "type": "string",
+                        "enum": ["report", "evict"],
+                        "description": (
+                            "Only report usage, or also evict variables (default: report)"
+                        ),
+                        "default": "report"
+                    },
+                    "top_n": {
+                        "type": "integer",
+                        "description": "Number of largest variables to report (default: 10)",
+                        "default": 10
+                    },
+                    "target_bytes": {
+                        "type": "integer",
+                        "description": (
+                            "Evict mode: clear variables until the workspace uses at most this "
+                            "many bytes"
+                        )
+                    },
+                    "policy": {
+                        "type": "string",
+                        "enum": ["largest", "lru"],
+                        "description": (
+                            "Evict mode: clear largest variables first, or least recently "
+                            "created/modified (default: largest)"
+                        ),
+                        "default": "largest"
+                    },
+                    "checkpoint": {
+                        "type": "boolean",
+                        "description": (
+                            "Evict mode: save evicted variables to a MAT-file before clearing "
+                            "(default: false)"
+                        ),
+                        "default": False
+                    }
+                }
             }
         ),
         Tool(
@@ -170,7 +333,11 @@ async def list_tools() -> list[Tool]:
         ),
         Tool(
             name="export_figure",
-            description="Export a MATLAB figure to PNG, SVG, PDF, or EPS format with configurable resolution.",
+            description=(
+                "Export a MATLAB figure to PNG, SVG, PDF, or EPS format with configurable "
+                "resolution. With inline=true the figure is rendered in memory and returned "
+                "directly as a PNG image (no file is written), sized to fit a byte budget."
+            ),
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -191,11 +358,88 @@ async def list_tools() -> list[Tool]:
                     "dpi": {
                         "type": "integer",
                         "description": "Resolution in DPI (uses MATLAB_FIGURE_DPI env var if omitted)"
+                    },
+                    "formats": {
+                        "type": "array",
+                        "items": {
+                            "type": "string",
+                            "enum": ["png", "svg", "pdf", "eps", "jpg", "tiff"]
+                        },
+                        "description": (
+                            "Export to several formats in one pass (e.g. ['png', 'pdf']); "
+                            "overrides format. filename is then used without its extension"
+                        )
+                    },
+                    "dpis": {
+                        "type": "array",
+                        "items": {"type": "integer"},
+                        "description": (
+                            "With formats: resolutions for the raster formats, one file per DPI "
+                            "(default: [dpi])"
+                        )
+                    },
+                    "background": {
+                        "type": "boolean",
+                        "description": (
+                            "Save a snapshot and render it on a separate export engine so MATLAB "
+                            "stays responsive; returns a job id to check with export_status "
+                            "(default: false)"
+                        ),
+                        "default": False
+                    },
+                    "inline": {
+                        "type": "boolean",
+                        "description": (
+                            "Return the figure as an inline PNG image instead of writing a file "
+                            "(default: false)"
+                        ),
+                        "default": False
+                    },
+                    "tier": {
+                        "type": "string",
+                        "enum": ["full", "preview"],
+                        "description": (
+                            "'preview' returns a small inline thumbnail (pre-rendered right after "
+                            "execution, so it is near-instant); 'full' renders at full resolution, "
+                            "reusing the last export if the figure is unchanged (default: full)"
+                        ),
+                        "default": "full"
+                    },
+                    "max_bytes": {
+                        "type": "integer",
+                        "description": (
+                            "Inline mode: byte budget for the PNG; resolution is reduced to fit "
+                            "(uses MATLAB_INLINE_IMAGE_MAX_BYTES if omitted)"
+                        )
+                    },
+                    "max_points": {
+                        "type": "integer",
+                        "description": (
+                            "File export: decimate line and scatter objects with more points than "
+                            "this (min/max per bucket, visually equivalent) for the export only; "
+                            "the figure's data is restored afterwards. 0 disables (uses "
+                            "MATLAB_EXPORT_MAX_POINTS if omitted)"
+                        )
                     }
                 },
                 "required": []
             }
         ),
+        Tool(
+            name="export_status",
+            description=(
+                "Check background figure exports started with export_figure(background=true)."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "Job id returned by export_figure (omit to list all jobs)"
+                    }
+                }
+            }
+        ),
         Tool(
             name="export_all_figures",
             description="Export all open MATLAB figures to files.",
@@ -215,6 +459,64 @@ async def list_tools() -> list[Tool]:
                 }
             }
         ),
+        Tool(
+            name="close_figures",
+            description=(
+                "Close MATLAB figures: specific ones, all of them, or the least recently used ones "
+                "beyond a number to keep. Figures can be exported to PNG before they are closed. "
+                "(Set MATLAB_MAX_OPEN_FIGURES to apply the keep policy automatically after every "
+                "execution.)"
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "figure_handles": {
+                        "type": "array",
+                        "items": {"type": "integer"},
+                        "description": "Figure numbers to close"
+                    },
+                    "keep": {
+                        "type": "integer",
+                        "description": (
+                            "If figure_handles is omitted: close least recently used figures until "
+                            "this many remain (the current figure is kept). Omit both to close all "
+                            "figures."
+                        )
+                    },
+                    "export": {
+                        "type": "boolean",
+                        "description": (
+                            "Export each figure to PNG before closing it (uses "
+                            "MATLAB_EXPORT_BEFORE_CLOSE if omitted)"
+                        )
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="get_figure_data",
+            description=(
+                "Get the numbers behind a MATLAB figure instead of an image: axes titles, labels "
+                "and limits, and the X/Y/Z/C data of line, scatter, bar, surface and image "
+                "objects. Large objects are downsampled before transfer."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "figure_handle": {
+                        "type": "integer",
+                        "description": "Figure handle number (omit for current figure)"
+                    },
+                    "max_points": {
+                        "type": "integer",
+                        "description": (
+                            "Downsample each object to at most this many points, 0 keeps all (uses "
+                            "MATLAB_FIGURE_DATA_MAX_POINTS if omitted)"
+                        )
+                    }
+                }
+            }
+        ),
         Tool(
             name="get_symbolic_latex",
             description="Convert a MATLAB symbolic expression to LaTeX format.",
@@ -271,12 +573,89 @@ async def list_tools() -> list[Tool]:
         ),
         Tool(
             name="list_projects",
-            description="List all available projects in Documents/MATLAB_Projects directory.",
+            description=(
+                "List all available projects in Documents/MATLAB_Projects directory, with size, "
+                "file counts by type and last activity."
+            ),
             inputSchema={
                 "type": "object",
                 "properties": {}
             }
         ),
+        Tool(
+            name="list_project_files",
+            description=(
+                "List the scripts, figures and data files of a project (newest first by default)."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "project": {
+                        "type": "string",
+                        "description": (
+                            "Project name (default: current project, or the workspace directory if "
+                            "none is set)"
+                        )
+                    },
+                    "kind": {
+                        "type": "string",
+                        "enum": ["script", "figure", "data", "other"],
+                        "description": "Only list files of this kind"
+                    },
+                    "pattern": {
+                        "type": "string",
+                        "description": "Wildcard pattern on the file name, e.g. '*.mat'"
+                    },
+                    "sort_by": {
+                        "type": "string",
+                        "enum": ["recent", "name", "size"],
+                        "description": "Sort order (default: recent)",
+                        "default": "recent"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of files to list (default: 50)",
+                        "default": 50
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Number of files to skip, for paging (default: 0)",
+                        "default": 0
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="search_project_files",
+            description="Find files by name or path across all projects (or one project).",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": (
+                            "Substring of the file path, or a wildcard pattern on the file name "
+                            "(e.g. 'result*.png')"
+                        )
+                    },
+                    "project": {
+                        "type": "string",
+                        "description": "Only search this project"
+                    },
+                    "kind": {
+                        "type": "string",
+                        "enum": ["script", "figure", "data", "other"],
+                        "description": "Only find files of this kind"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of files to return (default: 50)",
+                        "default": 50
+                    }
+                },
+                "required": ["query"]
+            }
+        ),
         Tool(
             name="position_all_figures",
             description="Reposition all open MATLAB figure windows on screen using specified strategy (cascade or tile). Useful if figures are off-screen or overlapping.",
@@ -292,6 +671,130 @@ async def list_tools() -> list[Tool]:
                 }
             }
         ),
+        Tool(
+            name="run_cells",
+            description="""Notebook-style incremental execution of a multi-step analysis split into
+            named cells.
+
+            Cells run in the order they were first added. Send only the cells you add or edit; each
+            call re-runs just the new or edited cells and the cells that depend on their outputs
+            (inferred from the variables each cell reads and writes). Unaffected cells are reused -
+            their variables are still in the workspace. Call with no cells to run whatever is out of
+            date and list all cells.""",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "cells": {
+                        "type": "array",
+                        "description": "Cells to add or replace, in order",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "name": {"type": "string", "description": "Cell name"},
+                                "code": {"type": "string", "description": "MATLAB code of the cell"}
+                            },
+                            "required": ["name", "code"]
+                        }
+                    },
+                    "remove": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Names of cells to remove"
+                    },
+                    "run": {
+                        "type": "boolean",
+                        "description": (
+                            "Run out-of-date cells (default: true); false only registers them"
+                        ),
+                        "default": True
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="replay_session",
+            description=(
+                "Rebuild the MATLAB workspace after an engine restart by replaying recorded "
+                "executions in order. Starts from the session's latest workspace checkpoint (if "
+                "any), skips runs that cannot assign variables or draw, and loads small cached "
+                "outputs instead of re-running code. Reports progress as it runs."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "session": {
+                        "type": "string",
+                        "description": (
+                            "Session id to replay (default: the most recent session; see "
+                            "search_history)"
+                        )
+                    },
+                    "project": {
+                        "type": "string",
+                        "description": (
+                            "Replay every recorded run of this project instead of a single session "
+                            "(checkpoints are not used)"
+                        )
+                    },
+                    "restart": {
+                        "type": "boolean",
+                        "description": (
+                            "Start from a fresh engine (default: true); false replays into the "
+                            "current workspace"
+                        ),
+                        "default": True
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="search_history",
+            description=(
+                "Search past executions (newest first) by code text, error/warning text, variable, "
+                "outcome, project or duration. Answers questions like which run produced a "
+                "variable, how long some code took last time, or which runs failed."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": (
+                            "Words that must all appear in the code or in the run's error/warnings"
+                        )
+                    },
+                    "variable": {
+                        "type": "string",
+                        "description": "Only runs that created or modified this variable"
+                    },
+                    "success": {
+                        "type": "boolean",
+                        "description": "Only successful (true) or failed (false) runs"
+                    },
+                    "project": {
+                        "type": "string",
+                        "description": "Only runs in this project"
+                    },
+                    "code": {
+                        "type": "string",
+                        "description": "Only runs of exactly this code"
+                    },
+                    "since_hours": {
+                        "type": "number",
+                        "description": "Only runs from the last this many hours"
+                    },
+                    "min_duration_ms": {
+                        "type": "number",
+                        "description": "Only runs that took at least this many milliseconds"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of runs to return (default: 20)",
+                        "default": 20
+                    }
+                }
+            }
+        ),
     ]
 
 
@@ -323,7 +826,6 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageConten
             logger.info(f"About to execute MATLAB code: {code[:50]}...")
             try:
                 # Use asyncio.to_thread for Python 3.9+ (cleaner than run_in_executor)
-                import asyncio
                 result = await asyncio.to_thread(
                     engine.execute,
                     code,
@@ -349,9 +851,13 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageConten
 
                 # Display validation issues if any
                 validation = result.get("validation", {})
-                if validation.get("issues"):
+                # Warnings are listed in full below
+                issues = [
+                    i for i in validation.get("issues", []) if i.get("type") != "matlab_warning"
+                ]
+                if issues:
                     output_parts.append("\n⚠️  Issues detected:\n")
-                    for issue in validation["issues"]:
+                    for issue in issues:
                         severity_emoji = {
                             "critical": "🔴",
                             "warning": "⚠️ ",
@@ -361,18 +867,29 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageConten
                     output_parts.append("\n")
 
                 # Display MATLAB warnings
-                if validation.get("warnings"):
+                if result.get("warnings"):
                     output_parts.append("MATLAB Warnings:\n")
-                    for warn in validation["warnings"]:
-                        output_parts.append(f"  • {warn['message']}\n")
+                    for warn in result["warnings"]:
+                        marker = "🔴" if warn.get("severity") == "critical" else "•"
+                        output_parts.append(f"  {marker} {warn['message']}\n")
                         if warn.get("id"):
                             output_parts.append(f"    (ID: {warn['id']})\n")
+                        if warn.get("stack"):
+                            output_parts.append(f"    In {warn['stack'][0]}\n")
                     output_parts.append("\n")
 
                 # Display figure information if figures were created
                 if result.get("figures_created", 0) > 0:
                     fig_count = result["figures_created"]
-                    output_parts.append(f"📊 {fig_count} figure(s) created and displayed in MATLAB GUI\n")
+                    if engine.offscreen_figures:
+                        output_parts.append(
+                            f"📊 {fig_count} figure(s) created offscreen "
+                            "(use export_figure to view)\n"
+                        )
+                    else:
+                        output_parts.append(
+                            f"📊 {fig_count} figure(s) created and displayed in MATLAB GUI\n"
+                        )
 
                     # Report on figure validation
                     fig_validations = validation.get("figures", [])
@@ -386,10 +903,32 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageConten
                             plot_count = fig_val.get("plot_object_count", 0)
                             output_parts.append(f"   ✓ Figure {i} contains {plot_count} plot object(s)\n")
 
+                    if result.get("figure_previews"):
+                        output_parts.append(
+                            "   Preview thumbnails ready (export_figure with tier='preview')\n"
+                        )
+
                     if result.get("figures_positioned"):
                         output_parts.append(f"   Positioned {result['figures_positioned']} figure(s) on screen\n")
                     output_parts.append("\n")
 
+                if result.get("figures_closed"):
+                    closed = ", ".join(str(int(n)) for n in result["figures_closed"])
+                    output_parts.append(
+                        f"🗂️  Closed least recently used figure(s) {closed} "
+                        "(MATLAB_MAX_OPEN_FIGURES)\n"
+                    )
+                    for path in result.get("closed_figure_exports", []):
+                        output_parts.append(f"   Exported before closing: {path}\n")
+                    output_parts.append("\n")
+
+                # Display workspace changes
+                if result.get("workspace_delta"):
+                    output_parts.append(format_workspace_delta(result["workspace_delta"]))
+
+                if result.get("lint"):
+                    output_parts.append(format_lint(result["lint"]))
+
                 # Display script save info
                 if result.get("script_saved"):
                     output_parts.append(f"💾 Script saved: {result['script_saved']}\n\n")
@@ -403,9 +942,16 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageConten
                 if not result.get("stdout") and not result.get("stderr") and result.get("figures_created", 0) == 0:
                     output_parts.append("(No output produced)\n")
 
+                if result.get("instrumentation"):
+                    output_parts.append("\n" + format_instrumentation(result["instrumentation"]))
+
             else:
                 output_parts.append("✗ Execution failed\n")
                 output_parts.append(f"Error: {result.get('error', 'Unknown error')}\n")
+                if result.get("error_report") and result["error_report"] != result.get("error"):
+                    output_parts.append(f"{result['error_report']}\n")
+                for frame in result.get("error_stack", []):
+                    output_parts.append(f"  In {frame['name']} (line {frame['line']})\n")
 
                 # Display validation issues that caused failure
                 validation = result.get("validation", {})
@@ -415,6 +961,18 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageConten
                         if issue.get("severity") == "critical":
                             output_parts.append(f"  🔴 {issue['message']}\n")
 
+                if result.get("syntax_errors"):
+                    output_parts.append(
+                        "(Rejected by the Code Analyzer preflight - the code was not run)\n"
+                    )
+                    output_parts.append("\n" + format_lint(result["syntax_errors"]))
+
+                if result.get("workspace_delta"):
+                    output_parts.append("\n" + format_workspace_delta(result["workspace_delta"]))
+
+                if result.get("lint"):
+                    output_parts.append("\n" + format_lint(result["lint"]))
+
                 if result.get("stdout"):
                     output_parts.append(f"\nOutput before error:\n{result['stdout']}\n")
 
@@ -440,14 +998,79 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageConten
 
         elif name == "list_workspace":
             # Direct synchronous call
-            result = engine.list_workspace()
+            result = engine.list_workspace(
+                pattern=arguments.get("pattern"),
+                class_name=arguments.get("class_name"),
+                min_bytes=arguments.get("min_bytes"),
+                sort_by=arguments.get("sort_by", "name"),
+                limit=arguments.get("limit")
+            )
 
             if result["success"]:
                 output = "MATLAB Workspace Variables:\n\n"
-                output += result["details"] if result["details"] else "Workspace is empty"
+                if result["details"]:
+                    output += result["details"]
+                elif result["total_count"]:
+                    output += "No variables match the given filters"
+                else:
+                    output += "Workspace is empty"
 
-                if result["variables"]:
-                    output += f"\n\nVariable names: {', '.join(result['variables'])}"
+                output += (
+                    f"\n\nShowing {len(result['records'])} of {result['matched_count']} matching "
+                    f"({result['total_count']} total, {result['total_bytes']} bytes)"
+                )
+            else:
+                output = f"Error: {result['error']}"
+
+            return [TextContent(type="text", text=output)]
+
+        elif name == "workspace_memory":
+            mode = arguments.get("mode", "report")
+            result = engine.workspace_memory(
+                mode=mode,
+                top_n=arguments.get("top_n", 10),
+                target_bytes=arguments.get("target_bytes"),
+                policy=arguments.get("policy", "largest"),
+                checkpoint=arguments.get("checkpoint", False)
+            )
+
+            if result["success"]:
+                output = "MATLAB Workspace Memory:\n\n"
+                total = format_bytes(result["total_bytes"])
+                output += f"Total: {total} in {result['variable_count']} variable(s)\n"
+                output += f"Open figures: {result['figure_count']}\n"
+                if result["engine_rss_bytes"] is not None:
+                    rss = format_bytes(result["engine_rss_bytes"])
+                    output += f"Engine process RSS: {rss} (pid {result['engine_pid']})\n"
+                else:
+                    output += f"Engine process RSS: unavailable (pid {result['engine_pid']})\n"
+
+                if result["top_variables"]:
+                    output += "\nLargest variables:\n"
+                    for i, var in enumerate(result["top_variables"], 1):
+                        size = "x".join(str(d) for d in var["size"])
+                        output += (
+                            f"  {i}. {var['name']} ({var['class']} {size}): "
+                            f"{format_bytes(var['bytes'])}\n"
+                        )
+
+                if result["duplicates"]:
+                    output += "\nDuplicate-looking arrays (same class, size and bytes):\n"
+                    for dup in result["duplicates"]:
+                        output += (
+                            f"  • {', '.join(dup['variables'])} "
+                            f"({dup['class']}, {format_bytes(dup['bytes'])} each)\n"
+                        )
+
+                if mode == "evict":
+                    if result["evicted"]:
+                        output += f"\nEvicted {len(result['evicted'])} variable(s): "
+                        output += ", ".join(var["name"] for var in result["evicted"])
+                        output += f"\nWorkspace now uses {format_bytes(result['bytes_after'])}\n"
+                        if result.get("checkpoint_file"):
+                            output += f"Checkpoint saved: {result['checkpoint_file']}\n"
+                    else:
+                        output += "\nWorkspace is already within the target; nothing evicted\n"
             else:
                 output = f"Error: {result['error']}"
 
@@ -474,72 +1097,238 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageConten
             format_type = arguments.get("format", "png")
             dpi = arguments.get("dpi")
 
+            tier = arguments.get("tier", "full")
+
+            if tier == "preview" or arguments.get("inline", False):
+                if tier == "preview":
+                    result = engine.render_figure_preview(figure_handle=figure_handle)
+                else:
+                    result = engine.render_figure_image(
+                        figure_handle=figure_handle,
+                        dpi=dpi,
+                        max_bytes=arguments.get("max_bytes")
+                    )
+
+                if not result["success"]:
+                    return [TextContent(type="text", text=f"Error: {result['error']}")]
+
+                label = "Figure preview" if tier == "preview" else "Figure rendered inline"
+                summary = (
+                    f"{label}: {result['width']}x{result['height']} px "
+                    f"at {result['dpi']} DPI, {format_bytes(result['bytes'])}"
+                )
+                if tier == "preview":
+                    summary += "\nUse tier='full' for the full-resolution render."
+                return [
+                    TextContent(type="text", text=summary),
+                    ImageContent(
+                        type="image",
+                        data=base64.b64encode(result["data"]).decode("ascii"),
+                        mimeType=result["mime_type"]
+                    )
+                ]
+
+            if arguments.get("background", False):
+                result = engine.export_figure_background(
+                    figure_handle=figure_handle,
+                    filename=filename,
+                    format=format_type,
+                    dpi=dpi,
+                    max_points=arguments.get("max_points")
+                )
+
+                if result["success"]:
+                    output = f"Background export started (job {result['job_id']}):\n"
+                    output += f"Figure {int(result['figure'])} -> {result['path']}\n"
+                    output += "Check progress with export_status."
+                else:
+                    output = f"Error: {result['error']}"
+
+                return [TextContent(type="text", text=output)]
+
+            if arguments.get("formats"):
+                result = engine.export_figure_formats(
+                    figure_handle=figure_handle,
+                    formats=arguments["formats"],
+                    dpis=arguments.get("dpis") or ([dpi] if dpi else None),
+                    filename=filename,
+                    max_points=arguments.get("max_points")
+                )
+
+                if result["success"]:
+                    output = (
+                        f"Figure {int(result['figure'])} exported to "
+                        f"{result['exported']} file(s):\n"
+                    )
+                    for export in result["exports"]:
+                        label = export["format"]
+                        if export["format"] in ("png", "jpg", "tiff"):
+                            label += f" @ {export['dpi']} DPI"
+                        if export["error"]:
+                            output += f"  ✗ {label}: {export['error']}\n"
+                        else:
+                            size = format_bytes(export["bytes"])
+                            output += f"  ✓ {label}: {export['path']} ({size})\n"
+                    if result.get("points_kept") is not None:
+                        output += (
+                            f"Data reduced for export: {result['points']} -> "
+                            f"{result['points_kept']} points"
+                        )
+                else:
+                    output = f"Error: {result['error']}"
+
+                return [TextContent(type="text", text=output)]
+
             # Direct synchronous call
             result = engine.export_figure(
                 figure_handle=figure_handle,
                 filename=filename,
                 format=format_type,
-                dpi=dpi
+                dpi=dpi,
+                max_points=arguments.get("max_points")
             )
 
             if result["success"]:
                 output = "Figure exported successfully:\n"
                 output += f"Path: {result['path']}\n"
                 output += f"Format: {result['format']}"
-
-                # If it's an image format, we could optionally return the image
-                # For now, just return the path
+                if result.get("points_kept") is not None:
+                    output += (
+                        f"\nData reduced for export: {result['points']} -> "
+                        f"{result['points_kept']} points"
+                    )
+                if result.get("cached"):
+                    output += "\n(Figure unchanged since last export - served from cache)"
             else:
                 output = f"Error: {result['error']}"
 
             return [TextContent(type="text", text=output)]
 
+        elif name == "export_status":
+            job_id = arguments.get("job_id")
+            result = engine.export_job_status(job_id)
+
+            if not result["success"]:
+                output = f"Error: {result['error']}"
+            else:
+                jobs = [result] if job_id else result["jobs"]
+                if not jobs:
+                    output = "No background exports"
+                else:
+                    lines = []
+                    for job in jobs:
+                        line = (
+                            f"{job['job_id']}: {job['status']} - "
+                            f"figure {int(job['figure'])} -> {job['path']}"
+                        )
+                        if job["status"] == "done":
+                            elapsed = job["finished"] - job["started"]
+                            line += f" ({format_bytes(job['bytes'])}, {elapsed:.1f}s)"
+                        elif job["status"] == "failed":
+                            line += f"\n  Error: {job['error']}"
+                        lines.append(line)
+                    output = "\n".join(lines)
+
+            return [TextContent(type="text", text=output)]
+
         elif name == "export_all_figures":
             format_type = arguments.get("format", "png")
             dpi = arguments.get("dpi")
 
-            # Get list of open figures
-            fig_result = engine.execute(
-                "fig_handles = get(groot, 'Children');",
-                capture_output=False
-            )
-
-            if not fig_result["success"]:
-                return [TextContent(type="text", text=f"Error getting figures: {fig_result['error']}")]
-
-            # Get figure handles as a list
-            try:
-                fig_handles = engine.get_variable("fig_handles")
-                if not fig_handles["success"] or not fig_handles.get("value"):
-                    return [TextContent(type="text", text="No figures are currently open")]
-
-                # Export each figure
-                results = []
-                handles = fig_handles["value"]
-
-                # Handle both single figure and multiple figures
-                if not hasattr(handles, '__iter__'):
-                    handles = [handles]
-
-                for i, handle in enumerate(handles):
-                    result = engine.export_figure(
-                        figure_handle=int(handle),
-                        filename=None,
+            # Progress is only reported if the client asked for it; exports then run
+            # in batches so a notification can be sent between engine calls
+            meta = app.request_context.meta
+            progress_token = meta.progressToken if meta else None
+
+            if progress_token is None:
+                result = engine.export_figures(format=format_type, dpi=dpi)
+                if not result["success"]:
+                    return [TextContent(
+                        type="text", text=f"Error exporting figures: {result['error']}"
+                    )]
+                exports = result["exports"]
+            else:
+                listing = await asyncio.to_thread(engine.list_figure_numbers)
+                if not listing["success"]:
+                    return [TextContent(
+                        type="text", text=f"Error exporting figures: {listing['error']}"
+                    )]
+                handles = listing["figures"]
+                exports = []
+                batch_size = 5
+                for start in range(0, len(handles), batch_size):
+                    batch = handles[start:start + batch_size]
+                    result = await asyncio.to_thread(
+                        engine.export_figures,
+                        figure_handles=batch,
                         format=format_type,
                         dpi=dpi
                     )
-                    results.append(result)
+                    if not result["success"]:
+                        return [TextContent(
+                            type="text", text=f"Error exporting figures: {result['error']}"
+                        )]
+                    exports.extend(result["exports"])
+                    await app.request_context.session.send_progress_notification(
+                        progress_token, len(exports), len(handles)
+                    )
 
-                # Format output
-                output = f"Exported {len(results)} figure(s):\n\n"
-                for i, result in enumerate(results, 1):
-                    if result["success"]:
-                        output += f"{i}. {result['path']}\n"
-                    else:
-                        output += f"{i}. Error: {result['error']}\n"
+            if not exports:
+                return [TextContent(type="text", text="No figures are currently open")]
 
-            except Exception as e:
-                output = f"Error exporting figures: {str(e)}"
+            # Format output
+            output = f"Exported {len(exports)} figure(s):\n\n"
+            for i, export in enumerate(exports, 1):
+                if export["error"]:
+                    output += f"{i}. Figure {int(export['figure'])}: Error: {export['error']}\n"
+                else:
+                    cached = ", unchanged - served from cache" if export["cached"] else ""
+                    output += f"{i}. {export['path']} ({format_bytes(export['bytes'])}{cached})\n"
+
+            return [TextContent(type="text", text=output)]
+
+        elif name == "close_figures":
+            result = engine.close_figures(
+                figure_handles=arguments.get("figure_handles"),
+                keep=arguments.get("keep"),
+                export=arguments.get("export")
+            )
+
+            if result["success"]:
+                if result["closed"]:
+                    output = f"✓ Closed {len(result['closed'])} figure(s): "
+                    output += ", ".join(str(int(n)) for n in result["closed"])
+                else:
+                    output = "No figures closed"
+                for path in result["exported"]:
+                    output += f"\n  Exported: {path}"
+                output += f"\n{len(result['open'])} figure(s) still open"
+            else:
+                output = f"Error: {result['error']}"
+
+            return [TextContent(type="text", text=output)]
+
+        elif name == "get_figure_data":
+            result = engine.get_figure_data(
+                figure_handle=arguments.get("figure_handle"),
+                max_points=arguments.get("max_points")
+            )
+
+            if result["success"]:
+                output = f"Figure {result['figure']}"
+                if result["name"]:
+                    output += f" ({result['name']})"
+                output += f": {len(result['axes'])} axes\n"
+                for ax in result["axes"]:
+                    for obj in ax["objects"]:
+                        if obj["kept"] < obj["points"]:
+                            output += (
+                                f"  {obj['type']} {obj['display_name']}: downsampled "
+                                f"{obj['points']} -> {obj['kept']} points\n"
+                            )
+                output += "\n" + json.dumps(compact_numbers(result["axes"]), separators=(",", ":"))
+            else:
+                output = f"Error: {result['error']}"
 
             return [TextContent(type="text", text=output)]
 
@@ -606,6 +1395,9 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageConten
                     for i, proj in enumerate(result["projects"], 1):
                         marker = " (current)" if proj == result.get("current_project") else ""
                         output += f"{i}. {proj}{marker}\n"
+                        summary = result["summaries"].get(proj)
+                        if summary:
+                            output += f"   {format_file_summary(summary)}\n"
                 else:
                     output = result.get("message", "No projects found")
             else:
@@ -613,15 +1405,65 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageConten
 
             return [TextContent(type="text", text=output)]
 
+        elif name == "list_project_files":
+            result = engine.list_project_files(
+                project=arguments.get("project"),
+                kind=arguments.get("kind"),
+                pattern=arguments.get("pattern"),
+                sort_by=arguments.get("sort_by", "recent"),
+                limit=arguments.get("limit", 50),
+                offset=arguments.get("offset", 0)
+            )
+
+            if result["success"]:
+                output = f"{result['directory']}\n{format_file_summary(result['summary'])}\n\n"
+                if result["files"]:
+                    offset = arguments.get("offset", 0)
+                    last = offset + len(result["files"])
+                    output += f"Files {offset + 1}-{last} of {result['matched_count']}:\n"
+                    for record in result["files"]:
+                        output += format_file_record(record)
+                else:
+                    output += "No matching files\n"
+            else:
+                output = f"Error: {result['error']}"
+
+            return [TextContent(type="text", text=output)]
+
+        elif name == "search_project_files":
+            result = engine.search_project_files(
+                arguments["query"],
+                project=arguments.get("project"),
+                kind=arguments.get("kind"),
+                limit=arguments.get("limit", 50)
+            )
+
+            if result["success"]:
+                if result["matches"]:
+                    output = f"{result['matched_count']} matching file(s)"
+                    if result["matched_count"] > len(result["matches"]):
+                        output += f" (showing {len(result['matches'])})"
+                    output += ":\n"
+                    for record in result["matches"]:
+                        output += format_file_record(record, project=record["project"])
+                else:
+                    output = "No matching files"
+            else:
+                output = f"Error: {result['error']}"
+
+            return [TextContent(type="text", text=output)]
+
         elif name == "position_all_figures":
             strategy = arguments.get("strategy", "cascade")
 
             if strategy == "tile":
-                result = engine._position_figures_tile()
+                result = engine._position_figures_tile(refresh=True)
             else:
-                result = engine._position_figures_cascade()
+                result = engine._position_figures_cascade(refresh=True)
 
-            if result["success"]:
+            if result.get("skipped"):
+                output = f"Figures were not repositioned ({result['skipped']})"
+            elif result["success"]:
                 fig_count = result.get("figures_positioned", 0)
                 output = f"✓ Repositioned {fig_count} figure(s) using {strategy} strategy"
             else:
@@ -629,6 +1471,141 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageConten
 
             return [TextContent(type="text", text=output)]
 
+        elif name == "run_cells":
+            result = await asyncio.to_thread(
+                engine.run_cells,
+                cells=arguments.get("cells"),
+                remove=arguments.get("remove"),
+                run=arguments.get("run", True)
+            )
+
+            if "cells" not in result:
+                output = f"Error: {result['error']}"
+            elif not result["cells"]:
+                output = "No cells registered"
+            else:
+                markers = {"ran": "✓", "failed": "✗", "reused": "↺", "stale": "…"}
+                lines = [f"{result['executed']} cell(s) executed, {result['reused']} reused\n"]
+                for cell in result["cells"]:
+                    line = f"{markers[cell['status']]} {cell['name']} ({cell['status']}"
+                    if cell["duration_ms"] is not None:
+                        line += f", {cell['duration_ms']:.0f} ms"
+                    line += ")"
+                    if cell["inputs"]:
+                        line += f"  reads: {', '.join(cell['inputs'])}"
+                    if cell["writes"]:
+                        line += f"  writes: {', '.join(cell['writes'])}"
+                    lines.append(line)
+                    if cell.get("error"):
+                        lines.append(f"    Error: {cell['error']}")
+                    if cell.get("output"):
+                        lines.append("    " + cell["output"].rstrip().replace("\n", "\n    "))
+                    if cell.get("figures_created"):
+                        lines.append(f"    📊 {cell['figures_created']} figure(s) created")
+                if result.get("error"):
+                    lines.append(f"\n{result['error']}")
+                output = "\n".join(lines)
+
+            return [TextContent(type="text", text=output)]
+
+        elif name == "replay_session":
+            # Progress is sent from the replay thread back through the event loop
+            meta = app.request_context.meta
+            progress_token = meta.progressToken if meta else None
+            progress = None
+            if progress_token is not None:
+                loop = asyncio.get_running_loop()
+                session = app.request_context.session
+
+                def progress(done: int, total: int, message: str) -> None:
+                    asyncio.run_coroutine_threadsafe(
+                        session.send_progress_notification(progress_token, done, total), loop
+                    )
+                    logger.info(f"Replay {done}/{total}: {message}")
+
+            result = await asyncio.to_thread(
+                engine.replay_session,
+                session=arguments.get("session"),
+                project=arguments.get("project"),
+                restart=arguments.get("restart", True),
+                progress=progress
+            )
+
+            if "runs_recorded" not in result:
+                output = f"Error: {result['error']}"
+            else:
+                if result["project"]:
+                    source = f"project '{result['project']}'"
+                else:
+                    source = f"session {result['session']}"
+                status = "✓ Replayed" if result["success"] else "⚠️  Replayed with errors"
+                output = (
+                    f"{status} {source} in {result['elapsed']:.1f}s "
+                    f"({result['runs_recorded']} recorded run(s))\n"
+                )
+                if result["checkpoint"]:
+                    after_run = result["checkpoint"]["after_run"]
+                    output += (f"  Restored checkpoint after run #{after_run}"
+                               f" ({result['runs_before_checkpoint']} run(s) not replayed)\n")
+                output += f"  Executed: {result['executed']}\n"
+                output += f"  Loaded from result cache: {result['loaded']}\n"
+                output += f"  Skipped (failed or no effect): {result['skipped']}\n"
+                for failure in result["failures"]:
+                    output += f"  ✗ Run #{failure['run']}: {failure['error']}\n"
+
+            return [TextContent(type="text", text=output)]
+
+        elif name == "search_history":
+            result = engine.search_history(
+                query=arguments.get("query"),
+                variable=arguments.get("variable"),
+                success=arguments.get("success"),
+                project=arguments.get("project"),
+                code=arguments.get("code"),
+                since_hours=arguments.get("since_hours"),
+                min_duration_ms=arguments.get("min_duration_ms"),
+                limit=arguments.get("limit", 20)
+            )
+
+            if not result["success"]:
+                output = f"Error: {result['error']}"
+            elif not result["runs"]:
+                output = f"No matching runs ({result['total_runs']} recorded)"
+            else:
+                lines = [
+                    f"{len(result['runs'])} matching run(s) of "
+                    f"{result['total_runs']} recorded:\n"
+                ]
+                for run in result["runs"]:
+                    when = datetime.fromtimestamp(run["time"]).strftime("%Y-%m-%d %H:%M:%S")
+                    status = "✓" if run["success"] else "✗"
+                    if run["duration_ms"] is not None:
+                        duration = f"{run['duration_ms']:.0f} ms"
+                    else:
+                        duration = "n/a"
+                    lines.append(f"#{run['id']} {status} {when}  {duration}"
+                                 f"  [{run['code_hash'][:8]}]"
+                                 f"  session: {run['session']}"
+                                 + (f"  project: {run['project']}" if run["project"] else ""))
+                    code_lines = run["code"].strip().splitlines() or [""]
+                    more = " ..." if len(code_lines) > 1 else ""
+                    lines.append(f"  {code_lines[0][:100]}{more}")
+                    details = run["details"]
+                    changed = details.get("workspace_delta", {})
+                    variables = changed.get("created", []) + changed.get("modified", [])
+                    if variables:
+                        lines.append(f"  Variables: {', '.join(variables)}")
+                    if details.get("new_figure_handles"):
+                        numbers = ", ".join(str(int(n)) for n in details["new_figure_handles"])
+                        lines.append(f"  Figures: {numbers}")
+                    if run["error"]:
+                        lines.append(f"  Error: {run['error']}")
+                    for warn in details.get("warnings", []):
+                        lines.append(f"  Warning: {warn['message']}")
+                output = "\n".join(lines)
+
+            return [TextContent(type="text", text=output)]
+
         else:
             return [TextContent(
                 type="text",